@@ -100,7 +100,8 @@ async def get_services():
         # AI 분석 테이블에서 프로젝트 정보 가져오기
         ai_analyses = {}
         try:
-            ai_response = ai_analysis_table.scan()
+            # project_info 만 사용 (specs 본문은 가져오지 않음)
+            ai_response = ai_analysis_table.scan(ProjectionExpression="analysis_id, project_info")
             for item in ai_response.get('Items', []):
                 analysis_id = item.get('analysis_id')
                 if analysis_id:
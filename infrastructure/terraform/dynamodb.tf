@@ -123,6 +123,31 @@ resource "aws_dynamodb_table" "ai_analysis" {
   }
 }
 
+# DynamoDB Table for port / ALB listener priority reservations
+# Items: port#<n>, priority#<n> (owner = repository) and repository#<owner/repo>
+resource "aws_dynamodb_table" "resource_allocations" {
+  name         = "${var.app_name}-resource-allocations"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "resource"
+
+  attribute {
+    name = "resource"
+    type = "S"
+  }
+
+  point_in_time_recovery {
+    enabled = true
+  }
+
+  server_side_encryption {
+    enabled = true
+  }
+
+  tags = {
+    Name = "${var.app_name}-resource-allocations"
+  }
+}
+
 # DynamoDB Table for Deployment History (for Garden Exhibition)
 resource "aws_dynamodb_table" "deployment_history" {
   name           = "${var.app_name}-deployment-history"
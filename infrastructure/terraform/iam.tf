@@ -210,19 +210,39 @@ resource "aws_iam_role_policy" "lambda_analyzer_policy" {
         Resource = [
           aws_dynamodb_table.garden_state.arn,
           aws_dynamodb_table.ai_analysis.arn,
+          "${aws_dynamodb_table.ai_analysis.arn}/index/*",
           aws_dynamodb_table.deployment_history.arn,
           aws_dynamodb_table.deployment_logs.arn,
           "${aws_dynamodb_table.deployment_logs.arn}/index/*"
         ]
       },
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:PutItem",
+          "dynamodb:GetItem",
+          "dynamodb:DeleteItem"
+        ]
+        Resource = aws_dynamodb_table.resource_allocations.arn
+      },
       {
         Effect = "Allow"
         Action = [
           "s3:GetObject",
-          "s3:PutObject"
+          "s3:PutObject",
+          "s3:DeleteObject"
         ]
         Resource = "arn:aws:s3:::${var.app_name}-artifacts-*/*"
       },
+      {
+        # Task right-sizing: utilization of the services tagged with the analyzed repository
+        Effect = "Allow"
+        Action = [
+          "cloudwatch:GetMetricData",
+          "tag:GetResources"
+        ]
+        Resource = "*"
+      },
       {
         Effect = "Allow"
         Action = [
@@ -20,6 +20,11 @@ resource "aws_lambda_function" "ai_analyzer" {
       DEPLOYMENT_TABLE     = aws_dynamodb_table.deployment_history.name
       S3_BUCKET            = var.artifacts_bucket_name
       ENVIRONMENT          = var.environment
+
+      PORT_ALLOCATION_TABLE = aws_dynamodb_table.resource_allocations.name
+
+      # Task right-sizing reads the user apps' Container Insights metrics from this cluster
+      USER_APP_CLUSTER = var.user_app_ecs_cluster_name
     }
   }
 
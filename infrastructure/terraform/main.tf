@@ -205,4 +205,58 @@ resource "aws_s3_bucket_lifecycle_configuration" "artifacts" {
       noncurrent_days = 30
     }
   }
+
+  # GitHub API response cache written by the AI analyzer (services/github_cache.py)
+  rule {
+    id     = "expire-github-cache"
+    status = "Enabled"
+
+    filter {
+      prefix = "github-cache/"
+    }
+
+    expiration {
+      days = 14
+    }
+
+    noncurrent_version_expiration {
+      noncurrent_days = 1
+    }
+  }
+
+  # LLM response cache (services/llm_cache.py); entries also carry their own TTL
+  rule {
+    id     = "expire-llm-cache"
+    status = "Enabled"
+
+    filter {
+      prefix = "llm-cache/"
+    }
+
+    expiration {
+      days = 7
+    }
+
+    noncurrent_version_expiration {
+      noncurrent_days = 1
+    }
+  }
+
+  # Offloaded analysis specs (services/result_store.py); outlive the 30-day item TTL by a day
+  rule {
+    id     = "expire-analysis-results"
+    status = "Enabled"
+
+    filter {
+      prefix = "analysis-results/"
+    }
+
+    expiration {
+      days = 31
+    }
+
+    noncurrent_version_expiration {
+      noncurrent_days = 1
+    }
+  }
 }
@@ -18,10 +18,12 @@ locals {
   # Path prefix for ALB routing (e.g., "app/deployment-12345")
   user_app_path_prefix = local.create_user_app ? var.user_app_path_prefix : ""
 
-  # Calculate deterministic priority for ALB listener rule
+  # Priority for ALB listener rule
   # Reserved low priorities in platform: 40 (dashboard), 50 (api), 100 (health)
-  # Use a higher range (1000–50000) to avoid collisions with reserved rules
+  # Prefer the priority reserved by the AI analyzer's allocator (collision-free);
+  # otherwise derive a deterministic one in the higher range (1000–50000)
   user_app_priority = local.create_user_app ? (
+    var.user_app_listener_priority > 0 ? var.user_app_listener_priority :
     1000 + (parseint(substr(md5(local.sanitized_app_name), 0, 8), 16) % 40000)
   ) : 0
 }
@@ -315,6 +315,12 @@ variable "user_app_port" {
   default     = 8000
 }
 
+variable "user_app_listener_priority" {
+  description = "ALB listener rule priority reserved by the AI analyzer (0 = derive from app name)"
+  type        = number
+  default     = 0
+}
+
 variable "user_app_cpu" {
   description = "CPU units for user app container (256, 512, 1024, 2048, 4096)"
   type        = number
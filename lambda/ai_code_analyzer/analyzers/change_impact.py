@@ -0,0 +1,129 @@
+"""
+Change impact analysis
+두 commit 사이에 바뀐 파일 목록으로 어떤 spec 을 다시 만들어야 하는지 판단합니다.
+대부분의 push 는 애플리케이션 코드만 바꾸므로 이전 분석의 project_info / spec 을 그대로
+재사용할 수 있고, 배포 형태 (언어, framework, entrypoint, port, package manager,
+runtime) 가 바뀐 경우에만 해당 spec 을 다시 생성합니다.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+from analyzers.project_detector import IGNORED_DIRS, LOCKFILES, MANIFESTS, NODE_ENTRYPOINTS, PYTHON_ENTRYPOINTS
+
+RUNTIME_FILES = {"runtime.txt", ".python-version", ".nvmrc", ".tool-versions", "tsconfig.json"}
+ENTRYPOINT_NAMES = (
+    {path.rpartition("/")[2] for path in PYTHON_ENTRYPOINTS + NODE_ENTRYPOINTS}
+    | {"manage.py", "main.go", "main.rs", "Procfile", "next.config.js"}
+)
+PORT_CONFIG_FILES = {".env.example", "application.properties", "application.yml", "application.yaml"}
+
+# Category -> specs built from what the category describes
+# (terraform_tfvars is re-rendered for every analysis anyway)
+CATEGORY_SPECS = {
+    "docker": ["dockerfile"],
+    "manifest": ["dockerfile", "buildspec"],
+    "lockfile": ["dockerfile", "buildspec"],
+    "runtime": ["dockerfile", "buildspec"],
+    "entrypoint": ["dockerfile", "appspec", "terraform_ecs"],
+    "port_config": ["dockerfile", "appspec", "terraform_ecs"],
+}
+
+# Detected fields that determine the generated specs
+SHAPE_FIELDS = (
+    "primary_language", "primary_framework", "runtime", "package_managers",
+    "entrypoint", "start_script", "app_server", "app_root", "app_port",
+)
+# A different value here means a different project: nothing can be reused
+IDENTITY_FIELDS = ("primary_language", "primary_framework", "app_root")
+# Other shape fields -> specs rendered from them (whichever file the change came from)
+FIELD_SPECS = {
+    "runtime": ["dockerfile", "buildspec"],
+    "package_managers": ["dockerfile", "buildspec"],
+    "entrypoint": ["dockerfile", "appspec", "terraform_ecs"],
+    "start_script": ["dockerfile", "appspec", "terraform_ecs"],
+    "app_server": ["dockerfile", "appspec", "terraform_ecs"],
+    "app_port": ["dockerfile", "appspec", "terraform_ecs"],
+}
+
+# GitHub's compare API lists at most this many files; a full list means it was cut off
+MAX_COMPARE_FILES = 300
+
+
+def classify_path(path: str) -> Optional[str]:
+    """Deployment-relevant category of a repository path, None for application code"""
+    directory, _, name = path.rpartition("/")
+    if directory and not IGNORED_DIRS.isdisjoint(directory.split("/")):
+        return None
+    lowered = name.lower()
+    if lowered.startswith(("dockerfile", "docker-compose")) or lowered.endswith(".dockerfile") \
+            or lowered == ".dockerignore":
+        return "docker"
+    if name in MANIFESTS:
+        return "manifest"
+    if name in LOCKFILES:
+        return "lockfile"
+    if name in RUNTIME_FILES:
+        return "runtime"
+    if name in PORT_CONFIG_FILES:
+        return "port_config"
+    if name in ENTRYPOINT_NAMES:
+        return "entrypoint"
+    return None
+
+
+def changed_paths(compare_files: Iterable[Dict[str, Any]]) -> List[str]:
+    """Paths touched by a GitHub compare response (both sides of a rename)"""
+    paths = []
+    for entry in compare_files:
+        paths.append(entry["filename"])
+        if entry.get("previous_filename"):
+            paths.append(entry["previous_filename"])
+    return paths
+
+
+def deployment_shape(project_info: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fields of a local detection (detect_project) that the specs depend on"""
+    info = project_info or {}
+    shape = {field: info.get(field) for field in SHAPE_FIELDS}
+    shape["package_managers"] = sorted(shape["package_managers"] or [])
+    return shape
+
+
+def assess(
+    paths: Iterable[str],
+    previous_shape: Optional[Dict[str, Any]],
+    current_shape: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Decide what a change needs:
+      "reuse"      - no deployment-relevant change, previous specs stand as they are
+      "regenerate" - only "specs" need generating again
+      "full"       - a different project (or unknown previous shape), analyze from scratch
+    Manifest / entrypoint / config edits only count when they changed the
+    detected shape; Dockerfile edits always do (the project analysis samples it).
+    A changed shape field regenerates its specs even when the file it was
+    detected in (e.g. a port in src/settings.py) is not a classified path.
+    """
+    relevant = {path: category for path in paths if (category := classify_path(path))}
+    shape_changes = sorted(
+        field for field in SHAPE_FIELDS
+        if previous_shape is not None and previous_shape.get(field) != current_shape.get(field)
+    )
+
+    if previous_shape is None and set(relevant.values()) - {"docker"}:
+        mode, specs = "full", []
+    elif any(field in IDENTITY_FIELDS for field in shape_changes):
+        mode, specs = "full", []
+    else:
+        categories = {category for category in relevant.values() if category == "docker" or shape_changes}
+        specs = sorted(
+            {spec for category in categories for spec in CATEGORY_SPECS[category]}
+            | {spec for field in shape_changes for spec in FIELD_SPECS.get(field, [])}
+        )
+        mode = "regenerate" if specs else "reuse"
+
+    return {
+        "mode": mode,
+        "specs": specs,
+        "relevant_paths": relevant,
+        "shape_changes": shape_changes,
+    }
@@ -0,0 +1,547 @@
+"""
+Local project detector
+파일 트리를 한 번만 훑어서 index 를 만들고, 발견한 manifest 를 파싱해서
+언어/프레임워크/entrypoint/port 를 판별합니다 (GPT 호출 없음).
+"""
+import json
+import re
+import tomllib
+import xml.etree.ElementTree as ET
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Manifest file name -> ecosystem
+MANIFESTS = {
+    "package.json": "node",
+    "requirements.txt": "python",
+    "pyproject.toml": "python",
+    "Pipfile": "python",
+    "go.mod": "go",
+    "Cargo.toml": "rust",
+    "pom.xml": "java",
+    "build.gradle": "java",
+    "build.gradle.kts": "java",
+    "Gemfile": "ruby",
+    "composer.json": "php",
+}
+
+# Lockfile -> package manager
+LOCKFILES = {
+    "package-lock.json": "npm",
+    "yarn.lock": "yarn",
+    "pnpm-lock.yaml": "pnpm",
+    "poetry.lock": "poetry",
+    "Pipfile.lock": "pipenv",
+    "uv.lock": "uv",
+    "go.sum": "go modules",
+    "Cargo.lock": "cargo",
+}
+
+# Other file names worth indexing (entrypoints, port configuration)
+INDEXED_NAMES = {
+    "main.py", "app.py", "server.py", "wsgi.py", "asgi.py", "manage.py",
+    "server.js", "index.js", "app.js", "main.js", "server.ts", "index.ts", "main.ts",
+    "main.go", "main.rs", "Dockerfile", "tsconfig.json", "next.config.js",
+    "application.properties", "application.yml", ".env.example", "Procfile",
+    "runtime.txt", ".python-version", ".nvmrc",
+}
+
+# Directories that never contain the deployable app's own manifests
+IGNORED_DIRS = {
+    "node_modules", ".git", "vendor", "dist", "build", "__pycache__",
+    ".venv", "venv", "target", ".next", "site-packages",
+}
+
+EXTENSION_LANGUAGES = {
+    ".py": "Python", ".js": "JavaScript", ".jsx": "JavaScript", ".mjs": "JavaScript",
+    ".ts": "TypeScript", ".tsx": "TypeScript", ".go": "Go", ".rs": "Rust",
+    ".java": "Java", ".kt": "Kotlin", ".rb": "Ruby", ".php": "PHP",
+}
+
+# dependency name -> (framework, default port, app_type)
+PYTHON_FRAMEWORKS = {
+    "fastapi": ("FastAPI", 8000, "web-api"),
+    "streamlit": ("Streamlit", 8501, "frontend"),
+    "django": ("Django", 8000, "monolith"),
+    "flask": ("Flask", 5000, "web-api"),
+}
+NODE_FRAMEWORKS = {
+    "next": ("Next.js", 3000, "frontend"),
+    "@nestjs/core": ("NestJS", 3000, "web-api"),
+    "express": ("Express", 3000, "web-api"),
+    "fastify": ("Fastify", 3000, "web-api"),
+    "koa": ("Koa", 3000, "web-api"),
+}
+GO_FRAMEWORKS = {
+    "github.com/gin-gonic/gin": "Gin",
+    "github.com/labstack/echo": "Echo",
+    "github.com/gofiber/fiber": "Fiber",
+    "github.com/go-chi/chi": "Chi",
+}
+RUST_FRAMEWORKS = {"actix-web": "Actix Web", "axum": "Axum", "rocket": "Rocket", "warp": "Warp"}
+
+DATABASE_DEPENDENCIES = {
+    "psycopg2": "postgres", "psycopg2-binary": "postgres", "psycopg": "postgres", "asyncpg": "postgres",
+    "pg": "postgres", "pymysql": "mysql", "mysqlclient": "mysql", "mysql2": "mysql",
+    "pymongo": "mongodb", "motor": "mongodb", "mongoose": "mongodb", "mongodb": "mongodb",
+    "redis": "redis", "ioredis": "redis",
+}
+
+PYTHON_ENTRYPOINTS = ["main.py", "app.py", "server.py", "app/main.py", "src/main.py", "asgi.py", "wsgi.py"]
+NODE_ENTRYPOINTS = ["server.js", "index.js", "app.js", "main.js", "src/server.js", "src/index.js",
+                    "server.ts", "index.ts", "src/main.ts", "src/index.ts"]
+
+_REQUIREMENT_NAME = re.compile(r"^\s*([A-Za-z0-9_.\-]+)")
+_PORT_PATTERNS = [
+    re.compile(r"\bport\s*[=:]\s*(\d{4,5})\b", re.IGNORECASE),
+    re.compile(r"\.listen\(\s*(\d{4,5})"),
+    re.compile(r"PORT\s*(?:\|\||\?\?|or|,)\s*['\"]?(\d{4,5})"),
+    re.compile(r"^\s*EXPOSE\s+(\d{4,5})", re.MULTILINE),
+    re.compile(r"server\.port\s*[=:]\s*(\d{4,5})"),
+    re.compile(r"[\"']:(\d{4,5})[\"']"),
+]
+
+CONFIDENCE_LEVELS = [(0.8, "high"), (0.5, "medium"), (0.0, "low")]
+
+
+INDEXED_FILE_NAMES = frozenset(MANIFESTS) | frozenset(LOCKFILES) | INDEXED_NAMES
+
+_SOURCE_EXTENSION = re.compile(
+    "(" + "|".join(re.escape(ext) for ext in EXTENSION_LANGUAGES) + r")$",
+    re.MULTILINE,
+)
+
+
+class RepoIndex:
+    """
+    Single pass over the file tree.
+    Only manifests, lockfiles and well-known entrypoint/config names are kept
+    per path; source files are counted by extension with one regex over the
+    joined tree, so memory stays flat on 100k-file monorepos.
+    """
+
+    def __init__(self, file_list: List[str]):
+        self.file_count = len(file_list)
+        self.paths: Dict[str, List[str]] = {}
+        self.extension_counts: Counter = Counter(_SOURCE_EXTENSION.findall("\n".join(file_list)))
+
+        for path in file_list:
+            directory, _, name = path.rpartition("/")
+            if name not in INDEXED_FILE_NAMES:
+                continue
+            if directory and not IGNORED_DIRS.isdisjoint(directory.split("/")):
+                continue
+            self.paths.setdefault(name, []).append(path)
+
+        # Shallowest path first
+        for found in self.paths.values():
+            found.sort(key=lambda p: (p.count("/"), p))
+
+    def find(self, name: str, root: str = "") -> Optional[str]:
+        """Path of name directly under root (\"\" = repository root)"""
+        target = f"{root}/{name}" if root else name
+        for path in self.paths.get(name, ()):
+            if path == target:
+                return path
+        return None
+
+    def has(self, name: str, root: str = "") -> bool:
+        return self.find(name, root) is not None
+
+    def first_existing(self, candidates: List[str], root: str = "") -> Optional[str]:
+        """First candidate (relative to root) that exists; returns path relative to root"""
+        for candidate in candidates:
+            directory, _, name = candidate.rpartition("/")
+            full_root = "/".join(part for part in (root, directory) if part)
+            if self.has(name, full_root):
+                return candidate
+        return None
+
+    def languages(self) -> List[str]:
+        """Languages ordered by file count"""
+        counts = Counter()
+        for extension, count in self.extension_counts.items():
+            language = EXTENSION_LANGUAGES.get(extension)
+            if language:
+                counts[language] += count
+        return [language for language, _ in counts.most_common()]
+
+
+def _base_project_info() -> Dict[str, Any]:
+    return {
+        "languages": [],
+        "primary_language": "Unknown",
+        "frameworks": [],
+        "primary_framework": None,
+        "build_tools": [],
+        "package_managers": [],
+        "runtime": "Unknown",
+        "app_type": "web-api",
+        "app_port": 8000,
+        "database_needed": False,
+        "database_type": "none",
+        "external_services": [],
+        "containerizable": True,
+        "deployment_complexity": "moderate",
+        "confidence": "low",
+        "confidence_score": 0.0,
+        "notes": "Detected locally from repository manifests",
+        "entrypoint": None,
+        "app_server": None,
+        "app_root": "",
+    }
+
+
+def _requirement_names(requirements: str) -> List[str]:
+    names = []
+    for line in requirements.splitlines():
+        line = line.strip()
+        if not line or line.startswith(("#", "-")):
+            continue
+        match = _REQUIREMENT_NAME.match(line)
+        if match:
+            names.append(match.group(1).lower().replace("_", "-"))
+    return names
+
+
+def _load_toml(content: Optional[str]) -> Dict[str, Any]:
+    if not content:
+        return {}
+    try:
+        return tomllib.loads(content)
+    except tomllib.TOMLDecodeError:
+        return {}
+
+
+def _find_port(contents: List[str]) -> Optional[int]:
+    for content in contents:
+        for pattern in _PORT_PATTERNS:
+            match = pattern.search(content)
+            if match:
+                port = int(match.group(1))
+                if 1024 <= port <= 65535:
+                    return port
+    return None
+
+
+def _sample(samples: Dict[str, str], root: str, name: str) -> Optional[str]:
+    return samples.get(f"{root}/{name}" if root else name)
+
+
+def _detect_databases(info: Dict[str, Any], dependencies: set) -> None:
+    for dependency in dependencies:
+        database = DATABASE_DEPENDENCIES.get(dependency)
+        if database:
+            info["database_needed"] = True
+            info["database_type"] = database
+            return
+
+
+def _detect_python(info, index: RepoIndex, samples, root) -> Tuple[bool, Optional[int]]:
+    info.update({"primary_language": "Python", "runtime": "Python 3.11"})
+
+    dependencies = set()
+    parsed = False
+
+    requirements = _sample(samples, root, "requirements.txt")
+    if requirements is not None:
+        dependencies.update(_requirement_names(requirements))
+        parsed = True
+
+    pyproject = _load_toml(_sample(samples, root, "pyproject.toml"))
+    if pyproject:
+        parsed = True
+        project = pyproject.get("project", {})
+        dependencies.update(_requirement_names("\n".join(project.get("dependencies", []))))
+        poetry = pyproject.get("tool", {}).get("poetry", {})
+        dependencies.update(name.lower() for name in poetry.get("dependencies", {}) if name != "python")
+        requires_python = project.get("requires-python") or poetry.get("dependencies", {}).get("python", "")
+        version = re.search(r"3\.(\d+)", str(requires_python))
+        if version:
+            info["runtime"] = f"Python 3.{version.group(1)}"
+        if poetry:
+            info["package_managers"].append("poetry")
+
+    pipfile = _load_toml(_sample(samples, root, "Pipfile"))
+    if pipfile:
+        parsed = True
+        dependencies.update(name.lower() for name in pipfile.get("packages", {}))
+
+    for lockfile in ("poetry.lock", "Pipfile.lock", "uv.lock"):
+        if index.has(lockfile, root) and LOCKFILES[lockfile] not in info["package_managers"]:
+            info["package_managers"].append(LOCKFILES[lockfile])
+    if not info["package_managers"] and index.has("Pipfile", root):
+        info["package_managers"].append("pipenv")
+    if not info["package_managers"]:
+        info["package_managers"].append("pip")
+
+    default_port = None
+    for dependency, (framework, port, app_type) in PYTHON_FRAMEWORKS.items():
+        if dependency in dependencies:
+            info["frameworks"].append(framework)
+            if default_port is None:
+                default_port, info["app_type"] = port, app_type
+    if not info["frameworks"] and index.has("manage.py", root):
+        info["frameworks"].append("Django")
+        default_port, info["app_type"] = 8000, "monolith"
+
+    # WSGI frameworks run under gunicorn, ASGI ones under uvicorn
+    wsgi = "Flask" in info["frameworks"] or "Django" in info["frameworks"]
+    for server in (("gunicorn", "uvicorn") if wsgi else ("uvicorn", "gunicorn")):
+        if server in dependencies:
+            info["app_server"] = server
+            break
+    _detect_databases(info, dependencies)
+
+    # Prefer the module that actually creates the app object
+    for path, content in samples.items():
+        if path.endswith(".py") and path.startswith(root) and re.search(r"\b(FastAPI|Flask)\(", content):
+            info["entrypoint"] = path[len(root) + 1:] if root else path
+            break
+    else:
+        candidates = ["manage.py"] + PYTHON_ENTRYPOINTS if "Django" in info["frameworks"] else PYTHON_ENTRYPOINTS
+        if "Streamlit" in info["frameworks"]:
+            candidates = ["app.py", "streamlit_app.py", "main.py"]
+        info["entrypoint"] = index.first_existing(candidates, root)
+
+    return parsed, default_port
+
+
+def _detect_node(info, index: RepoIndex, samples, root) -> Tuple[bool, Optional[int]]:
+    typescript = index.has("tsconfig.json", root)
+    info.update({
+        "primary_language": "TypeScript" if typescript else "JavaScript",
+        "runtime": "Node.js 20",
+    })
+
+    for lockfile in ("pnpm-lock.yaml", "yarn.lock", "package-lock.json"):
+        if index.has(lockfile, root):
+            info["package_managers"].append(LOCKFILES[lockfile])
+            break
+    else:
+        info["package_managers"].append("npm")
+
+    try:
+        package = json.loads(_sample(samples, root, "package.json") or "")
+    except ValueError:
+        info["entrypoint"] = index.first_existing(NODE_ENTRYPOINTS, root)
+        return False, None
+
+    dependencies = set(package.get("dependencies") or {})
+    dev_dependencies = set(package.get("devDependencies") or {})
+    if "typescript" in dev_dependencies | dependencies:
+        info["primary_language"] = "TypeScript"
+
+    default_port = None
+    for dependency, (framework, port, app_type) in NODE_FRAMEWORKS.items():
+        if dependency in dependencies:
+            info["frameworks"].append(framework)
+            if default_port is None:
+                default_port, info["app_type"] = port, app_type
+    _detect_databases(info, dependencies)
+
+    engines = str((package.get("engines") or {}).get("node", ""))
+    version = re.search(r"(\d{2})", engines)
+    if version:
+        info["runtime"] = f"Node.js {version.group(1)}"
+
+    scripts = package.get("scripts") or {}
+    if "start" in scripts:
+        info["start_script"] = scripts["start"]
+    if "build" in scripts:
+        info["build_tools"].append("npm run build")
+
+    main = package.get("main")
+    if main and index.first_existing([main], root):
+        info["entrypoint"] = main
+    else:
+        start = re.match(r"^\s*node\s+(\S+\.(?:js|mjs|cjs))", scripts.get("start", ""))
+        info["entrypoint"] = start.group(1) if start else index.first_existing(NODE_ENTRYPOINTS, root)
+
+    return True, default_port
+
+
+def _detect_go(info, index: RepoIndex, samples, root) -> Tuple[bool, Optional[int]]:
+    info.update({
+        "primary_language": "Go",
+        "runtime": "Go 1.21",
+        "package_managers": ["go modules"],
+        "entrypoint": index.first_existing(["main.go"], root),
+    })
+    if info["entrypoint"] is None:
+        for path in index.paths.get("main.go", ()):
+            if path.startswith(f"{root}/cmd/" if root else "cmd/"):
+                info["entrypoint"] = path[len(root) + 1:] if root else path
+                break
+
+    go_mod = _sample(samples, root, "go.mod")
+    if go_mod is None:
+        return False, 8080
+
+    version = re.search(r"^go\s+(\d+\.\d+)", go_mod, re.MULTILINE)
+    if version:
+        info["runtime"] = f"Go {version.group(1)}"
+    for module, framework in GO_FRAMEWORKS.items():
+        if module in go_mod:
+            info["frameworks"].append(framework)
+    return True, 8080
+
+
+def _detect_rust(info, index: RepoIndex, samples, root) -> Tuple[bool, Optional[int]]:
+    info.update({
+        "primary_language": "Rust",
+        "runtime": "Rust 1.75",
+        "package_managers": ["cargo"],
+        "build_tools": ["cargo"],
+        "entrypoint": index.first_existing(["src/main.rs"], root),
+    })
+
+    cargo = _load_toml(_sample(samples, root, "Cargo.toml"))
+    if not cargo:
+        return False, 8080
+
+    for crate, framework in RUST_FRAMEWORKS.items():
+        if crate in cargo.get("dependencies", {}):
+            info["frameworks"].append(framework)
+    binary = cargo.get("package", {}).get("name")
+    if binary:
+        info["binary_name"] = binary
+    return True, 8080
+
+
+def _detect_java(info, index: RepoIndex, samples, root) -> Tuple[bool, Optional[int]]:
+    maven = index.has("pom.xml", root)
+    info.update({
+        "primary_language": "Java",
+        "runtime": "Java 17",
+        "build_tools": ["Maven" if maven else "Gradle"],
+        "package_managers": ["maven" if maven else "gradle"],
+    })
+
+    parsed = False
+    pom = _sample(samples, root, "pom.xml")
+    if pom:
+        try:
+            tree = ET.fromstring(pom)
+            parsed = True
+            text = {element.tag.rsplit("}", 1)[-1]: element.text for element in tree.iter()}
+            artifacts = [element.text or "" for element in tree.iter() if element.tag.endswith("artifactId")]
+            if any(artifact.startswith("spring-boot-starter") for artifact in artifacts):
+                info["frameworks"].append("Spring Boot")
+            java_version = text.get("java.version") or text.get("maven.compiler.release")
+            if java_version:
+                info["runtime"] = f"Java {java_version.strip()}"
+        except ET.ParseError:
+            pass
+
+    gradle = _sample(samples, root, "build.gradle") or _sample(samples, root, "build.gradle.kts")
+    if gradle:
+        parsed = True
+        if "org.springframework.boot" in gradle:
+            info["frameworks"].append("Spring Boot")
+
+    return parsed, 8080
+
+
+def _detect_by_name(language: str, runtime: str, package_manager: str):
+    def detect(info, index, samples, root):
+        info.update({
+            "primary_language": language,
+            "runtime": runtime,
+            "package_managers": [package_manager],
+        })
+        return False, None
+    return detect
+
+
+ECOSYSTEM_DETECTORS = {
+    "python": _detect_python,
+    "node": _detect_node,
+    "go": _detect_go,
+    "rust": _detect_rust,
+    "java": _detect_java,
+    "ruby": _detect_by_name("Ruby", "Ruby 3.2", "bundler"),
+    "php": _detect_by_name("PHP", "PHP 8.2", "composer"),
+}
+
+
+def _select_manifest(index: RepoIndex, samples: Dict[str, str]) -> Optional[Tuple[str, str, str]]:
+    """
+    Pick (ecosystem, manifest path, app root).
+    Manifests whose content we actually have win, then the shallowest one;
+    at equal depth the MANIFESTS order decides.
+    """
+    best = None
+    for order, (name, ecosystem) in enumerate(MANIFESTS.items()):
+        for path in index.paths.get(name, ()):
+            key = (path not in samples, path.count("/"), order)
+            if best is None or key < best[0]:
+                best = (key, ecosystem, path)
+
+    if best is None:
+        return None
+    _, ecosystem, path = best
+    return ecosystem, path, path.rpartition("/")[0]
+
+
+def _complexity(info: Dict[str, Any], index: RepoIndex) -> str:
+    if info["primary_language"] in ("Java", "Rust") or index.file_count > 5000:
+        return "complex"
+    if info["database_needed"] or index.file_count > 500:
+        return "moderate"
+    return "simple"
+
+
+def detect_project(
+    file_list: List[str],
+    file_samples: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    Detect language/framework/entrypoint/port from the file tree and manifests.
+    Returns the GPT project_info schema plus "entrypoint", "app_root" and a
+    numeric "confidence_score" (0-1) behind the high/medium/low label.
+    """
+    index = RepoIndex(file_list or [])
+    samples = file_samples or {}
+    info = _base_project_info()
+    info["languages"] = index.languages()
+
+    selected = _select_manifest(index, samples)
+    if selected is None:
+        if info["languages"]:
+            info["primary_language"] = info["languages"][0]
+            info["confidence_score"] = 0.2
+        info["notes"] = "No manifest found; language guessed from file extensions"
+        return info
+
+    ecosystem, manifest_path, root = selected
+    info["app_root"] = root
+    parsed, default_port = ECOSYSTEM_DETECTORS[ecosystem](info, index, samples, root)
+
+    info["primary_framework"] = info["frameworks"][0] if info["frameworks"] else None
+    if info["primary_language"] not in info["languages"]:
+        info["languages"].insert(0, info["primary_language"])
+
+    port_sources = [samples[path] for path in samples if path.rpartition("/")[2] in INDEXED_NAMES]
+    evidence_port = _find_port(port_sources)
+    info["app_port"] = evidence_port or default_port or 8000
+    info["deployment_complexity"] = _complexity(info, index)
+
+    score = 0.4 if not root else 0.25
+    if parsed:
+        score += 0.2
+    if info["primary_framework"]:
+        score += 0.2
+    if info.get("entrypoint") or info.get("start_script"):
+        score += 0.1
+    if evidence_port:
+        score += 0.1
+    info["confidence_score"] = round(min(score, 1.0), 2)
+    info["confidence"] = next(label for threshold, label in CONFIDENCE_LEVELS if score >= threshold)
+
+    info["notes"] = (
+        f"Detected locally from {manifest_path}"
+        + ("" if parsed else " (file names only, manifest not read)")
+        + (f"; app lives in {root}/" if root else "")
+    )
+    return info
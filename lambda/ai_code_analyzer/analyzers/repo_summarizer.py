@@ -0,0 +1,369 @@
+"""
+Token-budgeted repository summarizer
+파일 트리 / README / file sample 을 글자 수로 자르는 대신, 배포에 중요한 파일을 우선순위로
+고르고 나머지 디렉토리는 "src/components/** (212 files)" 처럼 접어서 토큰 예산 안에 맞춥니다.
+토큰 수는 tokenizer 없이 로컬에서 추정합니다.
+"""
+import heapq
+import re
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from analyzers.project_detector import IGNORED_DIRS, INDEXED_NAMES, LOCKFILES, MANIFESTS
+
+# File name -> deployment relevance (higher is listed / sampled first)
+FILE_RELEVANCE = {
+    **{name: 90 for name in MANIFESTS},
+    **{name: 60 for name in LOCKFILES},
+    **{name: 70 for name in INDEXED_NAMES},
+    "Dockerfile": 100,
+    "docker-compose.yml": 95,
+    "docker-compose.yaml": 95,
+    "compose.yaml": 95,
+    "Procfile": 95,
+    ".dockerignore": 80,
+    "Makefile": 50,
+    "README.md": 40,
+}
+_SUFFIX_RELEVANCE = (
+    (".config.js", 55), (".config.ts", 55), (".config.mjs", 55), (".tf", 45), (".tfvars", 45),
+)
+_KEY_PREFIXES = ("Dockerfile", "README")
+_KEY_SUFFIXES = tuple(suffix for suffix, _ in _SUFFIX_RELEVANCE) + (".dockerfile",)
+DEPTH_PENALTY = 8
+# Share of the structure budget reserved for individually listed key files
+KEY_FILE_SHARE = 0.4
+# Largest share of the structure budget a single directory expansion may take
+EXPANSION_SHARE = 0.25
+
+# README sections that usually say how the app is built and started
+_README_KEYWORDS = re.compile(
+    r"install|setup|getting started|usage|run|start|deploy|docker|build|config|environment|env|port",
+    re.IGNORECASE,
+)
+_README_HEADING = re.compile(r"^#{1,6}\s", re.MULTILINE)
+
+_TOKEN_PIECE = re.compile(r"[A-Za-z]+|\d+| {2,}|\n|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate BPE token count without a tokenizer: word pieces of up to
+    6 letters, numbers in groups of 3, one token per newline / symbol /
+    non-ASCII character and per 4 spaces of indentation. Errs on the high
+    side for code, so budgets are not overrun.
+    """
+    if not text:
+        return 0
+    tokens = 0
+    for piece in _TOKEN_PIECE.findall(text):
+        first = piece[0]
+        if first.isascii() and first.isalpha():
+            tokens += (len(piece) + 5) // 6
+        elif first.isdigit():
+            tokens += (len(piece) + 2) // 3
+        elif first == " ":
+            tokens += (len(piece) + 3) // 4
+        else:
+            tokens += 1
+    return tokens
+
+
+def file_relevance(path: str) -> int:
+    """Deployment relevance of a path (0 = not a key file)"""
+    directory, _, name = path.rpartition("/")
+    score = FILE_RELEVANCE.get(name, 0)
+    if not score:
+        if name.startswith("Dockerfile") or name.endswith(".dockerfile"):
+            score = 100
+        elif name.startswith("README"):
+            score = 40
+        else:
+            score = next((value for suffix, value in _SUFFIX_RELEVANCE if name.endswith(suffix)), 0)
+            if not score:
+                return 0
+
+    parts = directory.split("/") if directory else []
+    if not IGNORED_DIRS.isdisjoint(parts):
+        return 0
+    return max(score - DEPTH_PENALTY * len(parts), 1)
+
+
+def allocate_budget(budget: int, demands: Dict[str, int], weights: Dict[str, float]) -> Dict[str, int]:
+    """
+    Split budget between parts by weight; whatever a part does not need
+    is redistributed to the others (so small repos never truncate).
+    """
+    allocation = {name: 0 for name in demands}
+    open_parts = {name for name, demand in demands.items() if demand > 0}
+    remaining = budget
+
+    while open_parts and remaining > 0:
+        total_weight = sum(weights.get(name, 1.0) for name in open_parts)
+        granted = 0
+        for name in sorted(open_parts):
+            share = int(remaining * weights.get(name, 1.0) / total_weight)
+            grant = min(share, demands[name] - allocation[name])
+            allocation[name] += grant
+            granted += grant
+            if allocation[name] >= demands[name]:
+                open_parts.discard(name)
+        remaining -= granted
+        if granted == 0:
+            break
+
+    return allocation
+
+
+def _truncate_lines(text: str, budget: int) -> Tuple[str, bool]:
+    """Longest head of text (whole lines) within budget tokens"""
+    if estimate_tokens(text) <= budget:
+        return text, False
+
+    lines = text.splitlines()
+    kept, used = [], 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            # A single long line (minified file, one-paragraph README) is cut mid-line
+            if budget - used > 16:
+                kept.append(_truncate_chars(line, budget - used - 1))
+            break
+        kept.append(line)
+        used += cost
+    omitted = len(lines) - len(kept)
+    return "\n".join(kept) + f"\n... ({omitted} more lines)", True
+
+
+def _truncate_chars(line: str, budget: int) -> str:
+    """Longest prefix of line within budget tokens (binary search)"""
+    lo, hi = 0, len(line)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(line[:mid]) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return line[:lo] + " ..."
+
+
+class _SortedTree:
+    """
+    Directory view over the sorted path list: everything under "dir/" is
+    the contiguous range ["dir/", "dir0"), so counts are two bisects and
+    listing a directory skips over each subdirectory in one step.
+    """
+
+    def __init__(self, paths: List[str]):
+        self.paths = sorted(paths)
+        # Extension per path (same order), so counting a range is a C-level Counter over a slice
+        names = [path.rpartition("/")[2] for path in self.paths]
+        self.extensions = [name.rpartition(".")[2] if "." in name[1:] else "" for name in names]
+
+    def _range(self, directory: str) -> Tuple[int, int]:
+        if not directory:
+            return 0, len(self.paths)
+        return bisect_left(self.paths, directory + "/"), bisect_left(self.paths, directory + "0")
+
+    def count(self, directory: str) -> int:
+        lo, hi = self._range(directory)
+        return hi - lo
+
+    def children(self, directory: str) -> Tuple[List[str], List[str]]:
+        """(files, subdirectories) directly inside directory"""
+        lo, hi = self._range(directory)
+        offset = len(directory) + 1 if directory else 0
+        files, dirs = [], []
+        idx = lo
+        while idx < hi:
+            path = self.paths[idx]
+            slash = path.find("/", offset)
+            if slash == -1:
+                files.append(path)
+                idx += 1
+            else:
+                child = path[:slash]
+                dirs.append(child)
+                idx = bisect_left(self.paths, child + "0", idx, hi)
+        return files, dirs
+
+    def collapsed_line(self, directory: str) -> str:
+        lo, hi = self._range(directory)
+        extensions = Counter(self.extensions[lo:hi])
+        extensions.pop("", None)
+        top = ", ".join(f".{ext} {n}" for ext, n in extensions.most_common(3))
+        noun = "file" if hi - lo == 1 else "files"
+        return f"{directory}/** ({hi - lo} {noun}{': ' + top if top else ''})"
+
+
+def render_file_tree(file_list: List[str], budget: int) -> Dict[str, Any]:
+    """
+    File structure within budget tokens.
+    Key files (manifests, Dockerfiles, entrypoints, ...) are always listed,
+    most relevant first; every directory starts collapsed and the biggest
+    ones are expanded while the budget allows. Vendored / build directories
+    (node_modules, dist, ...) are never expanded, and neither is a directory
+    that alone would take more than EXPANSION_SHARE of the budget.
+
+    Returns {"text", "tokens", "listed", "collapsed_dirs"}.
+    """
+    # Cheap name filter first; file_relevance only runs on candidate key files
+    candidates = [
+        path for path in file_list
+        if (name := path.rpartition("/")[2]) in FILE_RELEVANCE
+        or name.startswith(_KEY_PREFIXES) or name.endswith(_KEY_SUFFIXES)
+    ]
+    ranked = sorted(
+        ((score, path) for path in candidates if (score := file_relevance(path))),
+        key=lambda item: (-item[0], item[1]),
+    )
+    used = 0
+    lines: Dict[str, str] = {}
+    for _, path in ranked:
+        cost = estimate_tokens(path) + 1
+        if used + cost > budget * KEY_FILE_SHARE:
+            break
+        lines[path] = path
+        used += cost
+
+    tree = _SortedTree(file_list)
+    collapsed: Dict[str, str] = {}
+
+    def expansion(directory: str) -> Tuple[Dict[str, str], Dict[str, str], int]:
+        files, dirs = tree.children(directory)
+        new_lines = {path: path for path in files if path not in lines}
+        new_collapsed = {child: tree.collapsed_line(child) for child in dirs}
+        cost = sum(estimate_tokens(line) + 1 for line in new_lines.values())
+        cost += sum(estimate_tokens(line) + 1 for line in new_collapsed.values())
+        return new_lines, new_collapsed, cost
+
+    heap = [(0, "")]
+    while heap:
+        _, directory = heapq.heappop(heap)
+        if directory.rpartition("/")[2] in IGNORED_DIRS:
+            continue
+        new_lines, new_collapsed, cost = expansion(directory)
+        freed = estimate_tokens(collapsed[directory]) + 1 if directory else 0
+        if directory and (used + cost - freed > budget or cost > budget * EXPANSION_SHARE):
+            continue
+        collapsed.pop(directory, None)
+        lines.update(new_lines)
+        collapsed.update(new_collapsed)
+        used += cost - freed
+        for child in new_collapsed:
+            heapq.heappush(heap, (-tree.count(child), child))
+
+    entries = [(path, path) for path in lines]
+    entries += [(directory + "/", line) for directory, line in collapsed.items()]
+    text = "\n".join(line for _, line in sorted(entries))
+    return {
+        "text": text,
+        "tokens": estimate_tokens(text),
+        "listed": len(lines),
+        "collapsed_dirs": len(collapsed),
+    }
+
+
+def summarize_readme(readme_content: str, budget: int) -> str:
+    """
+    README within budget tokens: the intro plus the sections about
+    installing / running / deploying, in their original order.
+    """
+    if not readme_content:
+        return ""
+    if estimate_tokens(readme_content) <= budget:
+        return readme_content
+
+    starts = [0] + [m.start() for m in _README_HEADING.finditer(readme_content) if m.start() > 0]
+    sections = [readme_content[start:end].rstrip() for start, end in zip(starts, starts[1:] + [len(readme_content)])]
+
+    def priority(item: Tuple[int, str]) -> Tuple[int, int]:
+        index, section = item
+        heading = section.split("\n", 1)[0]
+        return (0 if index == 0 else 1 if _README_KEYWORDS.search(heading) else 2, index)
+
+    chosen, used = {}, 0
+    for index, section in sorted(enumerate(sections), key=priority):
+        cost = estimate_tokens(section) + 1
+        if used + cost <= budget:
+            chosen[index] = section
+            used += cost
+        elif index == 0 or not chosen:
+            chosen[index], _ = _truncate_lines(section, budget - used)
+            used = budget
+        if used >= budget:
+            break
+
+    omitted = len(sections) - len(chosen)
+    text = "\n\n".join(chosen[index] for index in sorted(chosen))
+    if omitted:
+        text += f"\n\n... ({omitted} more sections)"
+    return text
+
+
+def summarize_samples(file_samples: Dict[str, str], budget: int) -> Dict[str, str]:
+    """
+    File samples within budget tokens, most relevant first. Budget is
+    water-filled: small files stay whole, large ones split what is left.
+    """
+    ordered = sorted(file_samples.items(), key=lambda item: (-file_relevance(item[0]), item[0]))
+    demands = {name: estimate_tokens(content) + estimate_tokens(name) + 4 for name, content in ordered}
+    allocation = allocate_budget(budget, demands, {name: 1.0 for name in demands})
+
+    samples = {}
+    for name, content in ordered:
+        share = allocation[name] - estimate_tokens(name) - 4
+        if share <= 0:
+            continue
+        samples[name], _ = _truncate_lines(content, share)
+    return samples
+
+
+def summarize_repository(
+    file_list: List[str],
+    readme_content: Optional[str] = None,
+    file_samples: Optional[Dict[str, str]] = None,
+    budget: int = 6000,
+    weights: Optional[Dict[str, float]] = None
+) -> Dict[str, Any]:
+    """
+    Fit the file structure, README and file samples into budget tokens.
+    weights sets each part's share (default structure 0.35 / readme 0.25 /
+    samples 0.4); unused budget flows to the other parts.
+
+    Returns {"file_structure", "readme", "samples", "tokens": {part: n}}.
+    """
+    weights = weights or {"structure": 0.35, "readme": 0.25, "samples": 0.4}
+    file_samples = file_samples or {}
+    demands = {
+        # Upper bound (~3 chars per token); the rendered tree reports its real size
+        "structure": sum(map(len, file_list)) // 3 + len(file_list) if weights.get("structure") else 0,
+        "readme": estimate_tokens(readme_content or "") if weights.get("readme") else 0,
+        "samples": sum(estimate_tokens(c) + estimate_tokens(n) + 4 for n, c in file_samples.items())
+        if weights.get("samples") else 0,
+    }
+    allocation = allocate_budget(budget, demands, weights)
+
+    # A collapsed tree usually needs less than its share; the rest goes to README / samples
+    tree = render_file_tree(file_list, allocation["structure"]) if demands["structure"] else None
+    if tree:
+        allocation.update(allocate_budget(
+            budget - tree["tokens"],
+            {"readme": demands["readme"], "samples": demands["samples"]},
+            weights
+        ))
+    readme = summarize_readme(readme_content or "", allocation["readme"]) if demands["readme"] else ""
+    samples = summarize_samples(file_samples, allocation["samples"]) if demands["samples"] else {}
+
+    return {
+        "file_structure": tree["text"] if tree else "",
+        "readme": readme,
+        "samples": samples,
+        "tokens": {
+            "structure": tree["tokens"] if tree else 0,
+            "readme": estimate_tokens(readme),
+            "samples": sum(estimate_tokens(content) for content in samples.values()),
+        },
+        "files_listed": tree["listed"] if tree else 0,
+    }
@@ -0,0 +1,122 @@
+"""
+Streaming spec section parser
+GPT 응답을 스트리밍으로 받으면서 ---DOCKERFILE--- 등의 섹션이 끝나는 즉시 넘겨줍니다.
+"""
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Response delimiter -> spec name
+SPEC_SECTIONS = {
+    "DOCKERFILE": "dockerfile",
+    "TERRAFORM": "terraform_ecs",
+    "APPSPEC": "appspec",
+    "BUILDSPEC": "buildspec",
+    "RECOMMENDATIONS": "recommendations",
+}
+
+END_MARKER = "---"
+
+
+def extract_section(content: str, delimiter: str) -> str:
+    """Extract content between ---DELIMITER--- markers"""
+    start_marker = f"---{delimiter}---"
+
+    start_idx = content.find(start_marker)
+    if start_idx == -1:
+        return ""
+
+    start_idx += len(start_marker)
+    end_idx = content.find(END_MARKER, start_idx)
+
+    if end_idx == -1:
+        return content[start_idx:].strip()
+
+    return content[start_idx:end_idx].strip()
+
+
+class SpecSectionStream:
+    """
+    Tracks ---SECTION--- markers while a completion is streamed in.
+
+    A section is emitted as soon as the first "---" after its start marker
+    arrives. From that point on extract_section() over the full response
+    can no longer change, so streamed and buffered parsing always agree.
+    """
+
+    def __init__(
+        self,
+        on_section: Optional[Callable[[str, str], None]] = None,
+        sections: Optional[Dict[str, str]] = None
+    ):
+        self._on_section = on_section
+        self._buffer = ""
+        self._pending = dict(sections or SPEC_SECTIONS)
+        # delimiter -> [content start index or None, next scan position]
+        self._scan = {delimiter: [None, 0] for delimiter in self._pending}
+        self._started = time.monotonic()
+        self.first_byte_latency: Optional[float] = None
+        self.section_latency: Dict[str, float] = {}
+        self.total_latency: Optional[float] = None
+
+    @property
+    def text(self) -> str:
+        return self._buffer
+
+    def feed(self, chunk: str) -> None:
+        """Append a streamed content delta and emit any completed sections"""
+        if not chunk:
+            return
+        if self.first_byte_latency is None:
+            self.first_byte_latency = time.monotonic() - self._started
+
+        self._buffer += chunk
+        if "-" in chunk:
+            self._emit_completed()
+
+    def close(self) -> str:
+        """Emit sections that run to the end of the response; returns the full text"""
+        self._emit_completed()
+        for delimiter in list(self._pending):
+            if self._scan[delimiter][0] is not None:
+                self._emit(delimiter, extract_section(self._buffer, delimiter))
+        self.total_latency = time.monotonic() - self._started
+        return self._buffer
+
+    def metrics(self) -> Dict[str, Any]:
+        """First-byte, per-section and total latency in milliseconds"""
+        def ms(seconds):
+            return round(seconds * 1000, 1) if seconds is not None else None
+
+        return {
+            "first_byte_ms": ms(self.first_byte_latency),
+            "total_ms": ms(self.total_latency),
+            "response_chars": len(self._buffer),
+            "sections_ms": {name: ms(latency) for name, latency in self.section_latency.items()},
+        }
+
+    def _emit_completed(self) -> None:
+        buffer_len = len(self._buffer)
+        for delimiter in list(self._pending):
+            state = self._scan[delimiter]
+
+            if state[0] is None:
+                marker = f"---{delimiter}---"
+                idx = self._buffer.find(marker, state[1])
+                if idx == -1:
+                    # Keep a marker-length tail so split markers are still found
+                    state[1] = max(0, buffer_len - len(marker) + 1)
+                    continue
+                state[0] = state[1] = idx + len(marker)
+
+            end_idx = self._buffer.find(END_MARKER, state[1])
+            if end_idx == -1:
+                state[1] = max(state[0], buffer_len - len(END_MARKER) + 1)
+                continue
+
+            self._emit(delimiter, self._buffer[state[0]:end_idx].strip())
+
+    def _emit(self, delimiter: str, content: str) -> None:
+        spec_name = self._pending.pop(delimiter)
+        self.section_latency[spec_name] = time.monotonic() - self._started
+        if content and self._on_section:
+            self._on_section(spec_name, content)
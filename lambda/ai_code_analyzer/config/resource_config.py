@@ -8,18 +8,12 @@ Terraform 담당자가 이 파일만 수정하면 Lambda가 자동으로 반영
 # terraform/ecs.tf 에서 사용하는 값과 동기화해야 합니다
 # ===================================================================
 
-# CPU 할당 (단위: vCPU)
-CPU_MAPPING = {
-    "simple": 256,      # 0.25 vCPU - 간단한 API, static site
-    "moderate": 512,    # 0.5 vCPU - 일반 웹앱, FastAPI, Express
-    "complex": 1024     # 1 vCPU - 컴파일 언어, 데이터 처리
-}
-
-# 메모리 할당 (단위: MB)
-MEMORY_MAPPING = {
-    "simple": 512,      # 512 MB
-    "moderate": 1024,   # 1 GB
-    "complex": 2048     # 2 GB
+# 사용량 sample 이 아직 없는 서비스의 시작 크기 (CPU 단위 / 메모리 MB)
+# 배포 후에는 관측한 사용량으로 다시 계산합니다 (SIZING_CONFIG, services/task_sizing.py)
+STARTING_TASK_SIZES = {
+    "simple": {"cpu": 256, "memory": 512},      # 간단한 API, static site
+    "moderate": {"cpu": 512, "memory": 1024},   # 일반 웹앱, FastAPI, Express
+    "complex": {"cpu": 1024, "memory": 2048}    # 컴파일 언어, 데이터 처리
 }
 
 # 기본 복잡도 (unknown일 경우)
@@ -37,6 +31,19 @@ SCALING_CONFIG = {
     "memory_target_value": 80    # Memory 80% 도달 시 scale out
 }
 
+# ===================================================================
+# Task right-sizing 설정
+# ===================================================================
+
+SIZING_CONFIG = {
+    # Task 하나가 scale out 기준 아래에 머무르도록 크기를 고릅니다
+    "cpu_target_percent": SCALING_CONFIG["cpu_target_value"],
+    "memory_target_percent": SCALING_CONFIG["memory_target_value"],
+    "cpu_percentile": 95,
+    "min_samples": 12,           # 5분 period 기준 1시간 이상 관측된 경우만
+    "lookback_days": 14
+}
+
 # ===================================================================
 # Health Check 설정
 # ===================================================================
@@ -59,11 +66,10 @@ DEPLOYMENT_CONFIG = {
 }
 
 
-def get_cpu(complexity: str) -> int:
-    """복잡도에 따른 CPU 할당"""
-    return CPU_MAPPING.get(complexity, CPU_MAPPING[DEFAULT_COMPLEXITY])
-
-
-def get_memory(complexity: str) -> int:
-    """복잡도에 따른 메모리 할당"""
-    return MEMORY_MAPPING.get(complexity, MEMORY_MAPPING[DEFAULT_COMPLEXITY])
+def get_task_size(project_info: dict) -> dict:
+    """관측한 사용량으로 고른 크기 (project_info["task_size"]), 없으면 복잡도별 시작 크기"""
+    observed = project_info.get("task_size")
+    if observed:
+        return {"cpu": observed["cpu"], "memory": observed["memory"]}
+    complexity = project_info.get("deployment_complexity", DEFAULT_COMPLEXITY)
+    return dict(STARTING_TASK_SIZES.get(complexity, STARTING_TASK_SIZES[DEFAULT_COMPLEXITY]))
@@ -51,24 +51,34 @@ def get_build_command(project_info: Dict[str, Any]) -> str:
     return "[\"echo\", \"No build required\"]"
 
 
+def _python_module(entrypoint: str) -> str:
+    """app/main.py -> app.main"""
+    return entrypoint[:-3].replace("/", ".") if entrypoint.endswith(".py") else entrypoint
+
+
 def get_start_command(project_info: Dict[str, Any]) -> str:
     """언어/프레임워크에 따라 시작 명령어 결정"""
     primary_lang = project_info.get("primary_language", "").lower()
     frameworks = [f.lower() for f in project_info.get("frameworks", [])]
     port = project_info.get("app_port", 8000)
+    # 로컬 감지기가 찾은 entrypoint 가 있으면 우선 사용
+    entrypoint = project_info.get("entrypoint")
 
     # Python
     if "python" in primary_lang:
         # Streamlit 특수 처리
         if any("streamlit" in f for f in frameworks):
-            return f"[\"streamlit\", \"run\", \"app.py\", \"--server.port={port}\", \"--server.address=0.0.0.0\", \"--server.headless=true\"]"
+            script = entrypoint or "app.py"
+            return f"[\"streamlit\", \"run\", \"{script}\", \"--server.port={port}\", \"--server.address=0.0.0.0\", \"--server.headless=true\"]"
         elif any("fastapi" in f for f in frameworks):
+            module = _python_module(entrypoint) if entrypoint else "app.main"
             # Use shell form to allow env expansion for BASE_URL_PATH and PORT
-            return "[\"/bin/sh\", \"-lc\", \"uvicorn app.main:app --host 0.0.0.0 --port ${PORT:-8000} --root-path ${BASE_URL_PATH:-/}\"]"
+            return f"[\"/bin/sh\", \"-lc\", \"uvicorn {module}:app --host 0.0.0.0 --port ${{PORT:-{port}}} --root-path ${{BASE_URL_PATH:-/}}\"]"
         elif any("django" in f for f in frameworks):
             return "[\"gunicorn\", \"myproject.wsgi:application\", \"--bind\", \"0.0.0.0:8000\"]"
         elif any("flask" in f for f in frameworks):
-            return "[\"gunicorn\", \"app:app\", \"--bind\", \"0.0.0.0:8000\"]"
+            module = _python_module(entrypoint) if entrypoint else "app"
+            return f"[\"gunicorn\", \"{module}:app\", \"--bind\", \"0.0.0.0:{port}\"]"
         return "[\"python\", \"app.py\"]"
 
     # JavaScript/TypeScript
@@ -76,7 +86,9 @@ def get_start_command(project_info: Dict[str, Any]) -> str:
         if any("next" in f for f in frameworks):
             return "[\"npm\", \"start\"]"
         elif any("express" in f for f in frameworks):
-            return "[\"node\", \"server.js\"]"
+            if project_info.get("start_script"):
+                return "[\"npm\", \"start\"]"
+            return f"[\"node\", \"{entrypoint or 'server.js'}\"]"
         return "[\"npm\", \"start\"]"
 
     # Go
@@ -0,0 +1,481 @@
+"""
+Dockerfile build-speed optimizer
+GPT / 템플릿 / fallback Dockerfile 을 parse_dockerfile() 결과 위에서 build cache 에 유리하게 고칩니다.
+  - 소스 전체 COPY 뒤에 있는 의존성 설치를 manifest / lockfile 만 먼저 COPY 한 뒤로 끌어올림
+    (소스만 바뀐 build 는 설치 layer 를 cache 에서 재사용)
+  - BuildKit cache mount (pip / npm / yarn / go / cargo) 추가
+  - 연속된 RUN layer 병합
+  - 참조되지 않거나 소스 복사만 하는 build stage 제거
+
+Passes have the dockerfile_rewrites signature and only rewrite shapes they
+fully understand; anything else is left as written. They are idempotent, so
+a Dockerfile can go through the post-processing chain more than once.
+"""
+import os
+import re
+from fnmatch import fnmatch
+from typing import Any, Dict, List, Optional, Tuple
+
+from generators.dockerfile_parser import Dockerfile, Instruction, parse_dockerfile
+from generators.dockerfile_rewrites import RewritePass, run_passes
+
+# RUN --mount needs BuildKit (default in Docker 23+ and buildx); off for classic builders
+CACHE_MOUNTS = os.getenv("DOCKERFILE_CACHE_MOUNTS", "true").lower() == "true"
+
+# Cache directories of the package managers' default (root) configuration in the official images
+PIP_CACHE = "/root/.cache/pip"
+NPM_CACHE = "/root/.npm"
+YARN_CACHE = "/usr/local/share/.cache/yarn"
+GO_CACHES = ("/go/pkg/mod", "/root/.cache/go-build")
+CARGO_CACHE = "/usr/local/cargo/registry"
+
+_COPY_CONTEXT = re.compile(r"^\s*COPY\s+((?:--(?!from)\S+\s+)*)\.\s+(\S+)\s*$", re.IGNORECASE)
+_COPY_FROM_STAGE = re.compile(r"^\s*COPY\s+((?:--\S+\s+)*)--from=(\S+)\s+((?:--\S+\s+)*)(\S+)\s+(\S+)\s*$",
+                              re.IGNORECASE)
+_FROM_LINE = re.compile(r"^\s*FROM\s+(?:--\S+\s+)*(\S+)(?:\s+AS\s+(\S+))?\s*$", re.IGNORECASE)
+_WORKDIR = re.compile(r"^\s*WORKDIR\s+(\S+)\s*$", re.IGNORECASE)
+_USER = re.compile(r"^\s*USER\s+([^:\s]+)", re.IGNORECASE)
+_NO_CACHE_DIR = re.compile(r"\s--no-cache-dir\b")
+_OR_TRUE = re.compile(r"\s*\|\|\s*(true|:)\s*$")
+# ||, ; and & make "a && b" mean something else than two RUNs
+_LIST_OPERATOR = re.compile(r"\|\||;|(?<!&)&(?!&)")
+# Shell state a later command in the same RUN would inherit (but a separate RUN would not):
+# working directory, variables, options, umask, aliases, or a replaced shell
+_STATE_CHANGE = re.compile(
+    r"^(cd|pushd|popd|export|unset|source|\.|set|shopt|umask|ulimit|alias|trap|eval|exec|readonly|declare|typeset"
+    r"|local)(\s|$)|^[A-Za-z_]\w*=\S*(\s+[A-Za-z_]\w*=\S*)*$"
+)
+_PATH_ARGUMENT = re.compile(r"^(\.|/|~)|/|^file:|^git\+")
+
+_PIP = re.compile(r"^(?:python3?(?:\.\d+)?\s+-m\s+)?pip3?\s+install\s+(.*)$")
+_PIP_VALUE_OPTIONS = {"-r", "--requirement", "-c", "--constraint", "-i", "--index-url", "--extra-index-url",
+                      "--prefix", "--target", "-t", "--root", "--trusted-host", "-f", "--find-links"}
+_PIP_FILE_OPTIONS = {"-r", "--requirement", "-c", "--constraint"}
+_NODE = re.compile(r"^(npm\s+(?:ci|install|i)|yarn(?:\s+install)?|pnpm\s+(?:install|i))(\s+.*)?$")
+_GO_MOD = re.compile(r"^go\s+mod\s+download(\s+-x)?$")
+_BUNDLE = re.compile(r"^bundle\s+install(\s+[\w\-=: ]*)?$")
+_PIPENV = re.compile(r"^pipenv\s+install(\s+--[\w\-]+)*$")
+_SYSTEM = re.compile(
+    r"^(apt-get\s+(update|install|clean|upgrade)|apk\s+(add|update|upgrade)|rm\s+-rf\s+/var/lib/apt/lists/\*"
+    r"|(yum|dnf)\s+(install|clean|makecache))(\s|$)"
+)
+_TEST_FILE = re.compile(r"^test\s+-f\s+(\S+)$")
+
+_REQUIREMENTS_NEED_SOURCE = re.compile(r"^\s*(-e\s|-r\s|-c\s|\.|/|file:)|\s@\s*file:", re.MULTILINE)
+_PACKAGE_NEEDS_SOURCE = re.compile(r'"(preinstall|install|postinstall|prepare)"\s*:|"(file|link|workspace):')
+
+# Node manifests: package manager -> files the install reads (trailing * = optional)
+NODE_MANIFESTS = {
+    "npm": ["package*.json"],
+    "yarn": ["package.json", "yarn.lock*"],
+    "pnpm": ["package.json", "pnpm-lock.yaml*"],
+}
+
+
+def _escape(dockerfile: Dockerfile) -> str:
+    return getattr(dockerfile, "escape", "\\")
+
+
+def _run_command(instruction: Instruction, escape: str) -> Optional[Tuple[List[str], str]]:
+    """(flags, command) of a shell-form RUN without heredocs or comments, else None"""
+    if instruction.keyword != "RUN" or instruction.heredocs:
+        return None
+    if any(line.strip().startswith("#") for line in instruction.lines[1:]):
+        return None
+    parts = []
+    for line in instruction.lines:
+        stripped = line.strip()
+        parts.append(stripped[:-1].strip() if stripped.endswith(escape) else stripped)
+    body = " ".join(part for part in parts if part)[3:].strip()
+    if body.startswith("["):
+        return None
+    flags = []
+    while body.startswith("--"):
+        flag, _, body = body.partition(" ")
+        flags.append(flag)
+        body = body.lstrip()
+    return flags, body
+
+
+def _stage_bounds(dockerfile: Dockerfile) -> List[Tuple[int, int]]:
+    """
+    (start, end) instruction indexes per stage. A stage starts at its FROM,
+    or at the comments / blank lines directly above it, and ends where the next one starts.
+    """
+    instructions = dockerfile.instructions
+    starts = []
+    for idx, instruction in enumerate(instructions):
+        if instruction.keyword == "FROM":
+            start = idx
+            # Lines above the first FROM (directives, file comments) belong to no stage
+            while starts and instructions[start - 1].is_trivia:
+                start -= 1
+            starts.append(start)
+    return [(start, starts[i + 1] if i + 1 < len(starts) else len(instructions)) for i, start in enumerate(starts)]
+
+
+def _classify(command: str, context: Dict[str, Any]) -> Optional[List[str]]:
+    """
+    Manifests (COPY sources) a RUN part needs if it installs dependencies
+    without the rest of the source tree, else None. [] for system packages.
+    """
+    command = _OR_TRUE.sub("", command.strip())
+    samples = context.get("file_samples") or {}
+
+    test_file = _TEST_FILE.match(command)
+    if test_file:
+        return [test_file.group(1)]
+    if command.startswith("rm "):
+        return [] if _SYSTEM.match(command) else None
+    if _SYSTEM.match(command):
+        return [] if not any(_PATH_ARGUMENT.search(token) for token in command.split()[2:]) else None
+
+    pip = _PIP.match(command)
+    if pip:
+        tokens = pip.group(1).split()
+        manifests = []
+        idx = 0
+        while idx < len(tokens):
+            token = tokens[idx]
+            option, _, inline_value = token.partition("=")
+            if option in _PIP_VALUE_OPTIONS:
+                value = inline_value or (tokens[idx + 1] if idx + 1 < len(tokens) else "")
+                if option in _PIP_FILE_OPTIONS:
+                    manifests.append(value)
+                idx += 1 if inline_value else 2
+                continue
+            # Options without a value, or package specs; local paths (., -e ./x) need the source
+            if token in ("-e", "--editable") or (not token.startswith("-") and _PATH_ARGUMENT.search(token)):
+                return None
+            idx += 1
+        if any(_REQUIREMENTS_NEED_SOURCE.search(samples.get(manifest, "")) for manifest in manifests):
+            return None
+        return manifests
+
+    node = _NODE.match(command)
+    if node:
+        # Flags only: package names would change package.json rather than install from it
+        if any(not token.startswith("-") for token in (node.group(2) or "").split()):
+            return None
+        if _PACKAGE_NEEDS_SOURCE.search(samples.get("package.json", "")):
+            return None
+        return list(NODE_MANIFESTS[node.group(1).split()[0]])
+    if _GO_MOD.match(command):
+        return ["go.mod", "go.sum*"]
+    if _BUNDLE.match(command):
+        return ["Gemfile", "Gemfile.lock*"]
+    if _PIPENV.match(command):
+        return ["Pipfile", "Pipfile.lock*"]
+    return None
+
+
+def _hoistable(instruction: Instruction, escape: str, context: Dict[str, Any]) -> Optional[List[str]]:
+    """Manifests a dependency-install RUN needs, or None if it may need the source tree"""
+    parsed = _run_command(instruction, escape)
+    if parsed is None or parsed[0] or not parsed[1] or re.search(r"[;|`$]", _OR_TRUE.sub("", parsed[1])):
+        return None
+    manifests = []
+    for part in parsed[1].split("&&"):
+        needed = _classify(part, context)
+        if needed is None:
+            return None
+        manifests.extend(m for m in needed if m not in manifests)
+
+    file_list = context.get("file_list")
+    for manifest in manifests:
+        # Manifests outside the context root would need their directory layout recreated
+        if "/" in manifest:
+            return None
+        # Optional manifests (trailing *) may be absent; the others must be in the tree
+        if file_list and not manifest.endswith("*") and not any(fnmatch(path, manifest) for path in file_list):
+            return None
+    return manifests
+
+
+def _copied(manifest: str, copies: List[Instruction]) -> bool:
+    name = manifest.rstrip("*")
+    return any(name in copy.text or manifest in copy.text for copy in copies)
+
+
+def _comments_above(instructions: List[Instruction], idx: int, floor: int) -> int:
+    """Index of the first comment line directly above instructions[idx] (blank lines stop it)"""
+    while idx - 1 > floor and instructions[idx - 1].is_trivia and instructions[idx - 1].first_line.strip():
+        idx -= 1
+    return idx
+
+
+def hoist_dependency_installs(dockerfile: Dockerfile, context: Dict[str, Any]) -> List[str]:
+    """
+    COPY . .  ...  RUN pip install -r requirements.txt
+      -> COPY requirements.txt ./  RUN pip install -r requirements.txt  COPY . .
+    Installs that only read manifests (pip -r, npm/yarn/pnpm, go mod download,
+    bundle, pipenv) or install system packages move above the stage's
+    context copy, as long as nothing between them can affect the install
+    (only comments, EXPOSE, LABEL and other hoistable installs).
+    """
+    escape = _escape(dockerfile)
+    corrections = []
+    for start, end in reversed(_stage_bounds(dockerfile)):
+        instructions = dockerfile.instructions
+        stage = instructions[start:end]
+        copy_idx = next((i for i, ins in enumerate(stage) if ins.keyword == "COPY"
+                         and _COPY_CONTEXT.match(ins.first_line) and len(ins.lines) == 1), None)
+        if copy_idx is None:
+            continue
+        copy_all = stage[copy_idx]
+        flags, destination = _COPY_CONTEXT.match(copy_all.first_line).group(1, 2)
+
+        hoisted: List[Tuple[List[Instruction], List[str]]] = []
+        idx = copy_idx + 1
+        while idx < len(stage):
+            instruction = stage[idx]
+            if instruction.is_trivia or instruction.keyword in ("EXPOSE", "LABEL"):
+                idx += 1
+                continue
+            needed = _hoistable(instruction, escape, context)
+            if needed is None:
+                break
+            first = _comments_above(stage, idx, copy_idx)
+            # The blank line separating the install from what was above it moves too
+            if first - 1 > copy_idx and stage[first - 1].is_trivia and not stage[first - 1].first_line.strip():
+                first -= 1
+            hoisted.append((stage[first:idx + 1], needed))
+            idx += 1
+        if not hoisted:
+            continue
+
+        copied = [ins for ins in stage[:copy_idx] if ins.keyword == "COPY"]
+        moved = {id(ins) for group, _ in hoisted for ins in group}
+        insert_at = _comments_above(stage, copy_idx, 0)
+        indent = copy_all.first_line[:len(copy_all.first_line) - len(copy_all.first_line.lstrip())]
+        target = "./" if destination in (".", "./") else destination.rstrip("/") + "/"
+
+        block: List[Instruction] = []
+        separated = not stage[insert_at - 1].first_line.strip()
+        for group, needed in hoisted:
+            if not block and not group[0].first_line.strip():
+                # The separating blank line goes below the block instead
+                group, separated = group[1:], True
+            missing = [m for m in needed if not _copied(m, copied)]
+            if missing:
+                # Right above the install, below its comments
+                copy = Instruction("COPY", [f"{indent}COPY {flags}{' '.join(missing)} {target}"], copy_all.stage)
+                copied.append(copy)
+                group = group[:-1] + [copy, group[-1]]
+                corrections.append(f"Copied {' '.join(missing)} before the source so installs stay cached")
+            block.extend(group)
+            corrections.append(f"Moved dependency install above the source copy: {group[-1].first_line.strip()}")
+        if separated:
+            block.append(Instruction("", [""], copy_all.stage))
+        rest = [ins for ins in stage[insert_at:] if id(ins) not in moved]
+        dockerfile.instructions = instructions[:start] + stage[:insert_at] + block + rest + instructions[end:]
+    return corrections
+
+
+def _chainable(parsed: Tuple[List[str], str]) -> bool:
+    """A flagless command that can be joined with && without changing what fails the build"""
+    flags, command = parsed
+    return not flags and bool(command) and not _LIST_OPERATOR.search(command)
+
+
+def _changes_shell_state(command: str) -> bool:
+    """cd, export, FOO=bar, set -e, ...: what follows in the same shell would run differently"""
+    return any(_STATE_CHANGE.match(part.strip()) for part in command.split("&&"))
+
+
+def merge_run_layers(dockerfile: Dockerfile, context: Dict[str, Any]) -> List[str]:
+    """
+    RUN a / RUN b on consecutive lines -> RUN a && b (shell form, no flags, no heredocs),
+    unless a changes shell state (cd, export, ...) that b would then run under
+    """
+    escape = _escape(dockerfile)
+    corrections = []
+    merged: List[Instruction] = []
+    for instruction in dockerfile:
+        previous = merged[-1] if merged else None
+        current = _run_command(instruction, escape)
+        before = _run_command(previous, escape) if previous is not None else None
+        if current and before and _chainable(current) and _chainable(before) \
+                and not _changes_shell_state(before[1]) and "#" not in instruction.text and "#" not in previous.text:
+            body = instruction.first_line.strip()[3:].strip()
+            previous.lines = (
+                previous.lines[:-1]
+                + [f"{previous.lines[-1]} && {escape}", f"    {body}"]
+                + [line for line in instruction.lines[1:]]
+            )
+            corrections.append(f"Merged RUN layers: {instruction.first_line.strip()}")
+            continue
+        merged.append(instruction)
+    dockerfile.instructions = merged
+    return corrections
+
+
+def _cache_targets(command: str, base_image: str) -> List[str]:
+    targets = []
+    parts = [_OR_TRUE.sub("", part.strip()) for part in command.split("&&")]
+    if any(_PIP.match(part) for part in parts):
+        targets.append(PIP_CACHE)
+    if any(re.match(r"^npm\s+(ci|install|i)\b", part) for part in parts):
+        targets.append(NPM_CACHE)
+    if any(re.match(r"^yarn(\s+install)?(\s+--\S+)*$", part) for part in parts):
+        targets.append(YARN_CACHE)
+    if base_image.startswith("golang") and any(re.match(r"^(\S+=\S+\s+)*go\s+(mod\s+download|build)\b", part)
+                                               for part in parts):
+        targets.extend(GO_CACHES)
+    # The registry only: target/ holds the build output the image needs
+    if base_image.startswith("rust") and any(re.match(r"^cargo\s+(build|fetch|install)\b", part) for part in parts):
+        targets.append(CARGO_CACHE)
+    return targets
+
+
+def add_cache_mounts(dockerfile: Dockerfile, context: Dict[str, Any]) -> List[str]:
+    """
+    RUN pip install --no-cache-dir ...  ->  RUN --mount=type=cache,target=/root/.cache/pip pip install ...
+    Package manager caches live in BuildKit cache mounts instead of the image,
+    so a rebuilt install layer downloads only what changed.
+    RUNs after a non-root USER are left alone.
+    """
+    if not context.get("cache_mounts", CACHE_MOUNTS):
+        return []
+    escape = _escape(dockerfile)
+    corrections = []
+    base_image = ""
+    # USER per stage; FROM <earlier stage> starts as that stage's user
+    user, stage_name = "root", None
+    stage_users: Dict[str, str] = {}
+    for instruction in dockerfile:
+        if instruction.keyword == "FROM":
+            match = _FROM_LINE.match(instruction.first_line)
+            base_image = match.group(1).lower() if match else ""
+            stage_name = match.group(2).lower() if match and match.group(2) else None
+            user = stage_users.get(base_image, "root")
+            if stage_name:
+                stage_users[stage_name] = user
+            continue
+        if instruction.keyword == "USER":
+            match = _USER.match(instruction.first_line)
+            user = match.group(1) if match else ""
+            if stage_name:
+                stage_users[stage_name] = user
+            continue
+        # The targets are root's cache directories, and cache mounts are root-owned:
+        # a non-root (or unknown, e.g. USER $APP_USER) user could not write to them
+        if user not in ("root", "0"):
+            continue
+        parsed = _run_command(instruction, escape)
+        if parsed is None or any(flag.startswith("--mount") for flag in parsed[0]):
+            continue
+        targets = _cache_targets(parsed[1], base_image)
+        if not targets:
+            continue
+        mounts = " ".join(f"--mount=type=cache,target={target}" for target in targets)
+        head = instruction.first_line
+        keyword_at = head.upper().index("RUN") + 3
+        instruction.lines[0] = f"{head[:keyword_at]} {mounts}{head[keyword_at:]}"
+        if PIP_CACHE in targets:
+            instruction.lines = [_NO_CACHE_DIR.sub("", line) for line in instruction.lines]
+        corrections.append(f"Added cache mount ({', '.join(targets)}): {head.strip()}")
+    return corrections
+
+
+def drop_redundant_stages(dockerfile: Dockerfile, context: Dict[str, Any]) -> List[str]:
+    """
+    Remove build stages nothing refers to, and stages that only copy the
+    build context (FROM x AS base / WORKDIR /app / COPY . .): their
+    COPY --from=base /app <dest> becomes COPY . <dest>.
+    Stages referred to by index are left alone (removal would renumber them).
+    """
+    bounds = _stage_bounds(dockerfile)
+    if len(bounds) < 2 or any(re.search(r"--from=\d+\b", ins.text) for ins in dockerfile):
+        return []
+
+    instructions = dockerfile.instructions
+    stages = []
+    for start, end in bounds:
+        from_line = next(ins for ins in instructions[start:end] if ins.keyword == "FROM")
+        match = _FROM_LINE.match(from_line.first_line)
+        stages.append({
+            "start": start, "end": end,
+            "base": match.group(1) if match else "",
+            "name": match.group(2) if match else None,
+            "body": [ins for ins in instructions[start:end] if not ins.is_trivia],
+        })
+
+    corrections = []
+    dropped = set()
+    for index, stage in enumerate(stages[:-1]):
+        name = stage["name"]
+        if not name:
+            # Unnamed non-final stages can only be referenced by index
+            continue
+        later = [ins for other in stages[index + 1:] for ins in other["body"]]
+        # COPY --from=name, RUN --mount=...,from=name
+        mentions = [ins for ins in later if re.search(rf"from={re.escape(name)}(?![\w.-])", ins.text, re.IGNORECASE)]
+        references = [ins for ins in mentions if ins.keyword == "COPY"]
+        if len(references) != len(mentions) or any(other["base"].lower() == name.lower() for other in stages):
+            continue
+        if not references:
+            dropped.add(index)
+            corrections.append(f"Removed unused build stage '{name}'")
+            continue
+
+        # Copy-only stage: FROM, optional WORKDIR, COPY . <workdir>
+        workdir = "/"
+        copies_context = False
+        for ins in stage["body"][1:]:
+            workdir_match = _WORKDIR.match(ins.first_line) if ins.keyword == "WORKDIR" else None
+            context_copy = _COPY_CONTEXT.match(ins.first_line) if ins.keyword == "COPY" else None
+            if workdir_match and not copies_context:
+                workdir = workdir_match.group(1).rstrip("/") or "/"
+            elif context_copy and not context_copy.group(1) and context_copy.group(2).rstrip("/") in (".", workdir):
+                copies_context = True
+            else:
+                copies_context = False
+                break
+        if not copies_context:
+            continue
+
+        rewrites = []
+        for ins in references:
+            copy = _COPY_FROM_STAGE.match(ins.first_line) if len(ins.lines) == 1 else None
+            if not copy or copy.group(4).rstrip("/") not in (workdir, workdir + "/."):
+                break
+            indent = ins.first_line[:len(ins.first_line) - len(ins.first_line.lstrip())]
+            rewrites.append((ins, f"{indent}COPY {copy.group(1)}{copy.group(3)}. {copy.group(5)}"))
+        else:
+            for ins, line in rewrites:
+                ins.lines = [line]
+            dropped.add(index)
+            corrections.append(f"Removed copy-only build stage '{name}' (source copied directly)")
+
+    if dropped:
+        dockerfile.instructions = instructions[:stages[0]["start"]] + [
+            ins for index, stage in enumerate(stages) if index not in dropped
+            for ins in instructions[stage["start"]:stage["end"]]
+        ]
+    return corrections
+
+
+# Stage removal first (it turns COPY --from=<copy-only stage> into a context copy that can then
+# be reordered), cache mounts last (merged RUNs get the mounts of everything they install)
+OPTIMIZE_PASSES: List[RewritePass] = [
+    drop_redundant_stages,
+    hoist_dependency_installs,
+    merge_run_layers,
+    add_cache_mounts,
+]
+
+
+def optimize_dockerfile(
+    dockerfile: str,
+    file_list: Optional[List[str]] = None,
+    file_samples: Optional[Dict[str, str]] = None
+) -> str:
+    """Run OPTIMIZE_PASSES over a Dockerfile text (templates, fallback specs)"""
+    parsed = parse_dockerfile(dockerfile)
+    corrections = run_passes(parsed, OPTIMIZE_PASSES, {"file_list": file_list, "file_samples": file_samples})
+    if corrections:
+        print("⚡ Dockerfile build-speed rewrites applied:")
+        for correction in corrections:
+            print(f"  - {correction}")
+    return parsed.render()
@@ -0,0 +1,192 @@
+"""
+Dockerfile tokenizer
+Dockerfile 을 한 번만 읽어서 instruction 목록 (continuation / heredoc / stage 포함) 으로 만들고,
+수정은 그 목록 위에서 pass 단위로 처리한 뒤 다시 텍스트로 렌더링합니다.
+"""
+import re
+from bisect import bisect_left
+from typing import Any, Dict, Iterator, List, Optional
+
+_KEYWORD = re.compile(r"\s*([A-Za-z]+)")
+_HEREDOC = re.compile(r"<<(-?)(['\"]?)(\w+)\2")
+_ESCAPE_DIRECTIVE = re.compile(r"#\s*escape\s*=\s*([\\`])\s*$", re.IGNORECASE)
+_STAGE_ALIAS = re.compile(r"\s+AS\s+(\S+)\s*$", re.IGNORECASE)
+
+# Instructions that may carry BuildKit heredocs
+HEREDOC_INSTRUCTIONS = {"RUN", "COPY", "ADD"}
+
+
+class Instruction:
+    """
+    One logical Dockerfile instruction, kept exactly as written.
+    Blank lines and comments are kept as instructions with an empty keyword
+    so that rendering an unmodified Dockerfile is byte-for-byte identical.
+    """
+
+    __slots__ = ("keyword", "lines", "heredocs", "stage", "line_no", "meta")
+
+    def __init__(self, keyword: str, lines: List[str], stage: int = -1):
+        self.keyword = keyword
+        self.lines = lines
+        # (delimiter, strip_tabs, body lines, terminator line) per heredoc, in order
+        self.heredocs: tuple = ()
+        self.stage = stage
+        # Index of the first physical line in the snapshot the current passes run on
+        self.line_no: Optional[int] = None
+        # Notes passes leave for later passes (None until a pass sets one)
+        self.meta: Optional[Dict[str, Any]] = None
+
+    @property
+    def is_trivia(self) -> bool:
+        return not self.keyword
+
+    @property
+    def first_line(self) -> str:
+        return self.lines[0]
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    def __repr__(self) -> str:
+        return f"Instruction({self.keyword or 'trivia'!r}, {self.first_line!r})"
+
+
+class Dockerfile:
+    """Instruction list plus stage lookup"""
+
+    def __init__(self, instructions: List[Instruction], escape: str = "\\"):
+        self.instructions = instructions
+        self.escape = escape
+
+    def __iter__(self) -> Iterator[Instruction]:
+        return iter(self.instructions)
+
+    def physical_lines(self) -> List[str]:
+        """Flatten to physical lines, numbering each instruction's first line"""
+        lines = []
+        for instruction in self.instructions:
+            instruction.line_no = len(lines)
+            lines.extend(instruction.lines)
+        return lines
+
+    def render(self) -> str:
+        return "\n".join(line for instruction in self.instructions for line in instruction.lines)
+
+    def stages(self) -> List[Dict[str, Any]]:
+        """[{"index", "name", "base", "instructions"}] in build order"""
+        stages = []
+        for instruction in self.instructions:
+            if instruction.keyword == "FROM":
+                args = instruction.first_line.strip()[4:].strip()
+                alias = _STAGE_ALIAS.search(args)
+                base = args[:alias.start()] if alias else args
+                stages.append({
+                    "index": len(stages),
+                    "name": alias.group(1) if alias else None,
+                    "base": base.split()[-1] if base else "",
+                    "instructions": [],
+                })
+            if stages:
+                stages[-1]["instructions"].append(instruction)
+        return stages
+
+
+def _continues(line: str, escape: str) -> bool:
+    return line.rstrip().endswith(escape)
+
+
+def _is_trivia(line: str) -> bool:
+    stripped = line.strip()
+    return not stripped or stripped.startswith("#")
+
+
+class _TerminatorIndex:
+    """
+    Line positions by content, built on first use, so finding a heredoc
+    terminator is a bisect instead of a scan (unterminated heredocs would
+    otherwise make parsing quadratic).
+    """
+
+    def __init__(self, lines: List[str]):
+        self._lines = lines
+        self._positions: Dict[bool, Dict[str, List[int]]] = {}
+
+    def find(self, start: int, delimiter: str, strip_tabs: bool) -> int:
+        positions = self._positions.get(strip_tabs)
+        if positions is None:
+            positions = self._positions[strip_tabs] = {}
+            for idx, line in enumerate(self._lines):
+                key = (line.lstrip("\t") if strip_tabs else line).rstrip()
+                positions.setdefault(key, []).append(idx)
+
+        candidates = positions.get(delimiter, [])
+        found = bisect_left(candidates, start)
+        return candidates[found] if found < len(candidates) else -1
+
+
+def parse_dockerfile(dockerfile: str) -> Dockerfile:
+    """
+    Tokenize a Dockerfile in one pass over its lines.
+    Continuation lines (including comments/blank lines inside them) and
+    heredoc bodies belong to the instruction that opened them. An unterminated
+    heredoc is treated as plain text, like the Docker frontend does.
+    """
+    lines = dockerfile.split("\n")
+    escape = "\\"
+    for line in lines[:5]:
+        directive = _ESCAPE_DIRECTIVE.match(line.strip())
+        if directive:
+            escape = directive.group(1)
+            break
+        if not line.strip().startswith("#"):
+            break
+
+    instructions: List[Instruction] = []
+    terminators = _TerminatorIndex(lines)
+    stage = -1
+    idx = 0
+    total = len(lines)
+
+    while idx < total:
+        line = lines[idx]
+        if _is_trivia(line):
+            instructions.append(Instruction("", [line], stage))
+            idx += 1
+            continue
+
+        match = _KEYWORD.match(line)
+        keyword = match.group(1).upper() if match else ""
+        if keyword == "FROM":
+            stage += 1
+
+        end = idx
+        continued = _continues(line, escape)
+        while continued and end + 1 < total:
+            end += 1
+            # Comments and blank lines inside a continuation don't end it
+            if not _is_trivia(lines[end]):
+                continued = _continues(lines[end], escape)
+        instruction = Instruction(keyword, lines[idx:end + 1], stage)
+
+        if keyword in HEREDOC_INSTRUCTIONS and "<<" in instruction.text:
+            body_start = end + 1
+            heredocs = ()
+            for marker in _HEREDOC.finditer(instruction.text):
+                strip_tabs, delimiter = bool(marker.group(1)), marker.group(3)
+                terminator = terminators.find(body_start, delimiter, strip_tabs)
+                if terminator == -1:
+                    heredocs = ()
+                    break
+                heredocs += ((delimiter, strip_tabs, lines[body_start:terminator], lines[terminator]),)
+                body_start = terminator + 1
+
+            if heredocs:
+                instruction.heredocs = heredocs
+                instruction.lines = lines[idx:body_start]
+                end = body_start - 1
+
+        instructions.append(instruction)
+        idx = end + 1
+
+    return Dockerfile(instructions, escape)
@@ -0,0 +1,332 @@
+"""
+Dockerfile rewrite passes
+GPT 가 만든 Dockerfile 의 흔한 오류 (heredoc, FROM 표기, CMD entrypoint, 의존성 설치 누락 등) 를
+parse_dockerfile() 결과 위에서 pass 단위로 고칩니다.
+
+Each pass takes (dockerfile, context) and returns a list of human readable
+corrections. The rules reproduce the previous line-based fixups in
+handler.py, so LLM output is rewritten exactly as before.
+"""
+import re
+from typing import Any, Callable, Dict, List
+
+from generators.dockerfile_parser import Dockerfile, Instruction
+
+RewritePass = Callable[[Dockerfile, Dict[str, Any]], List[str]]
+
+NODE_LANGUAGES = ("javascript", "node", "nodejs")
+
+PIP_INSTALL = "RUN pip install --no-cache-dir -r requirements.txt"
+NPM_INSTALL = "RUN npm install --production"
+
+# Map common wrong patterns to correct image names
+IMAGE_MAP = {
+    "python": "python",
+    "node": "node",
+    "node.js": "node",
+    "nodejs": "node",
+    "javascript": "node",
+    "go": "golang",
+    "golang": "golang",
+    "ruby": "ruby",
+    "java": "openjdk",
+    "rust": "rust",
+}
+
+_COPY_HEREDOC = re.compile(r"(\s*)COPY\s+(?:--\w+=[^\s]+\s+)?<<-?['\"]?(\w+)['\"]?\s+(.+)")
+_RUN_HEREDOC = re.compile(r"(\s*)RUN\s+<<-?['\"]?(\w+)['\"]?$")
+_MALFORMED_FROM = re.compile(r"^FROM\s+([A-Za-z\.]+)\s+([0-9\.]+[a-z\-]*)\s*(AS\s+\w+)?", re.IGNORECASE)
+_USERADD = re.compile(r"^\s*RUN\s+useradd", re.IGNORECASE)
+_USER_APPUSER = re.compile(r"^\s*USER\s+appuser", re.IGNORECASE)
+_EXEC_CMD = re.compile(r"^CMD\s+\[")
+_PY_FILE = re.compile(r'"([^"]*\.py)"')
+_NODE_FILE = re.compile(r'"([^"]*\.(?:js|ts))"')
+_PIP_INSTALL = re.compile(r"pip\s+install", re.IGNORECASE)
+_NPM_INSTALL = re.compile(r"npm\s+(install|ci)", re.IGNORECASE)
+_COPY_FROM = re.compile(r"^\s*COPY\s+--from=", re.IGNORECASE)
+_COPY_ALL = re.compile(r"^\s*COPY\s+\.\s+\.\s*$", re.IGNORECASE)
+_COPY_INTO_WORKDIR = re.compile(r"^\s*COPY\s+(--from=\w+\s+)?.*\s+\.\s*$", re.IGNORECASE)
+_REQUIREMENTS = re.compile(r"requirements\.txt", re.IGNORECASE)
+_PACKAGE_JSON = re.compile(r"package.*\.json", re.IGNORECASE)
+_STRICT_PIP_INSTALL = re.compile(
+    r"RUN\s+pip\s+install\s+--no-cache-dir\s+-r\s+requirements\.txt\b", re.IGNORECASE
+)
+
+
+def _escape_echo(line: str) -> str:
+    return line.replace("\\", "\\\\").replace('"', '\\"').replace("$", "\\$").replace("`", "\\`")
+
+
+def _chain(commands: List[str], separator: str = " && \\") -> List[str]:
+    """Physical lines for commands joined with && continuations"""
+    return [command + separator for command in commands[:-1]] + commands[-1:]
+
+
+def convert_heredocs(dockerfile: Dockerfile, context: Dict[str, Any]) -> List[str]:
+    """
+    COPY <<EOF target  -> RUN echo "..." > target && echo "..." >> target
+    RUN <<EOF script   -> RUN cmd1 && cmd2 ...
+    Only single-heredoc instructions in these two shapes are converted.
+    """
+    corrections = []
+    for instruction in dockerfile:
+        if len(instruction.heredocs) != 1:
+            continue
+        delimiter, strip_tabs, body, terminator = instruction.heredocs[0]
+        head = instruction.first_line
+        # Whatever trailed the delimiter on its line stays after the rewrite
+        trailer = (terminator.lstrip("\t") if strip_tabs else terminator)[len(delimiter):]
+
+        copy = _COPY_HEREDOC.match(head) if instruction.keyword == "COPY" else None
+        run = _RUN_HEREDOC.match(head) if instruction.keyword == "RUN" else None
+        if copy and len(instruction.lines) - len(body) == 2:
+            indent, target = copy.group(1), copy.group(3).strip()
+            content = "\n".join(body) + "\n" if body else ""
+            commands = []
+            for i, line in enumerate(content.split("\n")):
+                redirect = ">" if i == 0 else ">>"
+                commands.append(f'{"RUN " if i == 0 else "    "}echo "{_escape_echo(line)}" {redirect} {target}')
+            instruction.lines = _chain(commands)
+            instruction.keyword = "RUN"
+        elif run and len(instruction.lines) - len(body) == 2:
+            indent = run.group(1)
+            script = [line.strip() for line in body if line.strip()]
+            if script:
+                instruction.lines = ("RUN " + " && \\\n    ".join(script)).split("\n")
+            else:
+                instruction.lines = [""]
+                instruction.keyword = ""
+        else:
+            continue
+
+        instruction.lines[0] = indent + instruction.lines[0]
+        instruction.lines[-1] += trailer
+        instruction.heredocs = ()
+        corrections.append(f"Converted heredoc: {head.strip()}")
+
+    return corrections
+
+
+def fix_base_images(dockerfile: Dockerfile, context: Dict[str, Any]) -> List[str]:
+    """FROM Python 3.11 [AS x] -> FROM python:3.11 [AS x]"""
+    corrections = []
+    for instruction in dockerfile:
+        if instruction.keyword != "FROM":
+            continue
+        from_match = _MALFORMED_FROM.match(instruction.first_line)
+        if not from_match:
+            continue
+
+        image_name = from_match.group(1).lower().replace(".", "")
+        version = from_match.group(2)
+        as_clause = from_match.group(3) or ""
+        correct_image = IMAGE_MAP.get(image_name, image_name)
+
+        fixed_line = f"FROM {correct_image}:{version}"
+        if as_clause:
+            fixed_line += f" {as_clause}"
+        # Only rewritten FROM lines mark stage boundaries for ensure_dependency_install,
+        # which is how the line-based fixer has always tracked build stages
+        instruction.meta = dict(instruction.meta or {}, build_stage=bool(as_clause))
+        instruction.lines = [fixed_line]
+        corrections.append(f"FROM {from_match.group(1)} {version} → FROM {correct_image}:{version}")
+    return corrections
+
+
+def drop_user_setup(dockerfile: Dockerfile, context: Dict[str, Any]) -> List[str]:
+    """Remove useradd (UID conflicts in base images) and USER appuser"""
+    corrections = []
+    kept = []
+    for instruction in dockerfile:
+        if instruction.keyword == "RUN" and _USERADD.match(instruction.first_line):
+            corrections.append(f"Removed conflicting useradd: {instruction.first_line.strip()}")
+        elif instruction.keyword == "USER" and _USER_APPUSER.match(instruction.first_line):
+            corrections.append(f"Removed USER appuser: {instruction.first_line.strip()}")
+        else:
+            kept.append(instruction)
+    dockerfile.instructions = kept
+    return corrections
+
+
+def fix_start_command(dockerfile: Dockerfile, context: Dict[str, Any]) -> List[str]:
+    """Point exec-form CMD at the detected entrypoint and the right runtime"""
+    language = context["language"]
+    python_entrypoint = context["python_entrypoint"]
+    node_entrypoint = context["node_entrypoint"]
+    corrections = []
+    if not language:
+        return corrections
+
+    for instruction in dockerfile:
+        line = instruction.first_line
+        if instruction.keyword != "CMD" or not _EXEC_CMD.match(line):
+            continue
+
+        # Special handling for FastAPI projects - use uvicorn instead of python
+        if context["is_fastapi"] and language == "python":
+            if "python" in line.lower() and "uvicorn" not in line.lower():
+                module_name = python_entrypoint.replace(".py", "")
+                # Shell form so PORT is expanded. No --root-path: the ALB forwards the full path
+                fixed_line = (
+                    'CMD ["/bin/sh", "-lc", '
+                    '"uvicorn %s:app --host 0.0.0.0 --port ${PORT:-8000}"]'
+                ) % module_name
+                corrections.append(
+                    f"Fixed FastAPI CMD: {line.strip()} → {fixed_line} (using detected entrypoint: {python_entrypoint})"
+                )
+                instruction.lines = [fixed_line]
+                print(f"✅ Fixed FastAPI CMD to use detected entrypoint: {python_entrypoint} → {module_name}:app")
+                continue
+
+        if language == "python" and ("app.py" in line or "main.py" in line or "server.py" in line):
+            filename_match = _PY_FILE.search(line)
+            if filename_match and filename_match.group(1) != python_entrypoint:
+                current_file = filename_match.group(1)
+                instruction.lines[0] = line.replace(current_file, python_entrypoint)
+                corrections.append(f"Fixed Python entrypoint: {current_file} → {python_entrypoint}")
+                continue
+        elif language in NODE_LANGUAGES and ("index.js" in line or "server.js" in line or "app.js" in line):
+            filename_match = _NODE_FILE.search(line)
+            if filename_match and filename_match.group(1) != node_entrypoint:
+                current_file = filename_match.group(1)
+                instruction.lines[0] = line.replace(current_file, node_entrypoint)
+                corrections.append(f"Fixed Node.js entrypoint: {current_file} → {node_entrypoint}")
+                continue
+
+        # CMD in the wrong language
+        if language in NODE_LANGUAGES and "python" in line.lower():
+            fixed_line = f'CMD ["node", "{node_entrypoint}"]'
+        elif language == "python" and "node" in line.lower():
+            fixed_line = f'CMD ["python", "{python_entrypoint}"]'
+        else:
+            continue
+        corrections.append(f"Fixed CMD: {line.strip()} → {fixed_line}")
+        instruction.lines = [fixed_line]
+
+    return corrections
+
+
+def ensure_dependency_install(dockerfile: Dockerfile, context: Dict[str, Any]) -> List[str]:
+    """
+    Add pip/npm install after COPY steps that bring in manifests or sources
+    when no install follows. "Follows" looks at the next physical line(s) of
+    the Dockerfile as it was before these passes (context["lines"]).
+    """
+    language = context["language"]
+    lines = context["lines"]
+    file_list = context["file_list"]
+    is_python = language == "python"
+    is_node = language in NODE_LANGUAGES
+    if not (is_python or is_node):
+        return []
+
+    has_requirements = any("requirements.txt" in f for f in file_list)
+    has_package_json = any("package.json" in f for f in file_list)
+    has_npm_install = is_node and bool(_NPM_INSTALL.search("\n".join(lines)))
+
+    def installs_within(pattern, line_no, count):
+        return any(pattern.search(lines[j]) for j in range(line_no + 1, min(line_no + count, len(lines))))
+
+    def next_line_installs(pattern, line_no):
+        return line_no + 1 >= len(lines) or bool(pattern.search(lines[line_no + 1]))
+
+    corrections = []
+    result = []
+    in_build_stage = False
+    # A pip install earlier in the stage (e.g. hoisted above COPY . . by dockerfile_optimizer)
+    installed_in_stage = False
+    for instruction in dockerfile:
+        result.append(instruction)
+        if instruction.meta and "build_stage" in instruction.meta:
+            in_build_stage = instruction.meta["build_stage"]
+        if instruction.keyword == "FROM":
+            installed_in_stage = False
+        elif instruction.keyword == "RUN" and _PIP_INSTALL.search(instruction.text):
+            installed_in_stage = True
+        if instruction.keyword != "COPY" or instruction.line_no is None:
+            continue
+
+        line, line_no = instruction.first_line, instruction.line_no
+        added = None
+        if is_python:
+            if _COPY_FROM.match(line):
+                # Final stage of a multi-stage build: site-packages are not under /app
+                if not in_build_stage and has_requirements and not installs_within(_PIP_INSTALL, line_no, 5):
+                    added = (PIP_INSTALL, "Added missing: RUN pip install --no-cache-dir -r requirements.txt (final stage)")
+            elif _REQUIREMENTS.search(line):
+                if not next_line_installs(_PIP_INSTALL, line_no):
+                    added = (PIP_INSTALL, "Added missing: RUN pip install --no-cache-dir -r requirements.txt")
+            elif _COPY_ALL.match(line) and not in_build_stage and not installed_in_stage:
+                if has_requirements and not installs_within(_PIP_INSTALL, line_no, 5):
+                    added = (PIP_INSTALL, "Added missing: RUN pip install --no-cache-dir -r requirements.txt (single-stage)")
+        elif not has_npm_install:
+            if _PACKAGE_JSON.search(line):
+                if not next_line_installs(_NPM_INSTALL, line_no):
+                    added = (NPM_INSTALL, "Added missing: RUN npm install --production")
+            elif _COPY_INTO_WORKDIR.match(line):
+                if has_package_json and not installs_within(_NPM_INSTALL, line_no, 5):
+                    added = (NPM_INSTALL, "Added missing: RUN npm install --production (multi-stage)")
+            has_npm_install = added is not None
+
+        if added:
+            result.append(Instruction("RUN", [added[0]], instruction.stage))
+            corrections.append(added[1])
+
+    dockerfile.instructions = result
+    return corrections
+
+
+def tolerate_missing_requirements(dockerfile: Dockerfile, context: Dict[str, Any]) -> List[str]:
+    """Make pip install a no-op if requirements.txt is absent"""
+    for instruction in dockerfile:
+        if instruction.keyword == "RUN":
+            # The pattern never spans a line continuation, so lines can be rewritten one by one
+            instruction.lines = [
+                _STRICT_PIP_INSTALL.sub(
+                    "RUN test -f requirements.txt && pip install --no-cache-dir -r requirements.txt || true", line
+                ) if "requirements" in line.lower() else line
+                for line in instruction.lines
+            ]
+    return []
+
+
+def normalize_line_breaks(dockerfile: Dockerfile, context: Dict[str, Any]) -> List[str]:
+    """Split lines the way str.splitlines() does: CRLF -> LF, no trailing empty line"""
+    carriage_returns = "\r" in "\n".join(context["lines"])
+    for instruction in dockerfile:
+        if carriage_returns and any("\r" in line for line in instruction.lines):
+            instruction.lines = [part for line in instruction.lines for part in (line.splitlines() or [""])]
+
+    last = dockerfile.instructions[-1] if dockerfile.instructions else None
+    if last is not None and last.lines[-1] == "":
+        last.lines.pop()
+        if not last.lines:
+            dockerfile.instructions.pop()
+    return []
+
+
+def drop_healthchecks(dockerfile: Dockerfile, context: Dict[str, Any]) -> List[str]:
+    """Remove HEALTHCHECK instructions (they rely on curl, which is not always present)"""
+    dockerfile.instructions = [i for i in dockerfile if i.keyword != "HEALTHCHECK"]
+    return []
+
+
+# Order matters: dependency install checks rely on the stage marks left by fix_base_images
+SYNTAX_PASSES: List[RewritePass] = [
+    fix_base_images,
+    drop_user_setup,
+    fix_start_command,
+    ensure_dependency_install,
+    tolerate_missing_requirements,
+    normalize_line_breaks,
+    drop_healthchecks,
+]
+
+
+def run_passes(dockerfile: Dockerfile, passes: List[RewritePass], context: Dict[str, Any]) -> List[str]:
+    """Run passes in order over one snapshot of the Dockerfile; returns all corrections"""
+    context = dict(context, lines=dockerfile.physical_lines())
+    corrections = []
+    for rewrite in passes:
+        corrections.extend(rewrite(dockerfile, context))
+    return corrections
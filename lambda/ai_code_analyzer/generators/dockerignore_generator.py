@@ -0,0 +1,270 @@
+"""
+.dockerignore generator
+분석한 file tree 에서 runtime image 에 필요 없는 경로 (VCS, 의존성 / build 산출물, cache,
+test, notebook, data 파일) 를 골라 언어별 .dockerignore 를 만듭니다.
+Dockerfile 이 직접 COPY / ADD 하는 경로, 코드 sample 이 이름으로 참조하는 파일,
+image 안에서 test / build 를 돌리는 경우의 test / 산출물 경로는 제외하지 않습니다.
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from analyzers.project_detector import MANIFESTS
+from generators.dockerfile_parser import parse_dockerfile
+
+# Always excluded: never part of a repository's runtime, and present in CI checkouts
+# (.git, node_modules, ...) even though they are not in the analyzed file list
+COMMON_PATTERNS = [
+    ("Version control / CI", [".git", ".gitignore", ".gitattributes", ".github", ".gitlab-ci.yml"]),
+    ("Docker", ["Dockerfile*", "**/*.dockerfile", "docker-compose*", ".dockerignore"]),
+    ("Editors / OS", [".vscode", ".idea", "**/.DS_Store", "**/*.swp"]),
+    ("Local environment", [".env", ".env.*", "!.env.example"]),
+    ("Logs / coverage", ["**/*.log", ".coverage", "htmlcov", "coverage", ".nyc_output"]),
+]
+
+LANGUAGE_PATTERNS = {
+    "python": ["**/__pycache__", "**/*.py[cod]", ".venv", "venv", ".pytest_cache", ".mypy_cache",
+               ".ruff_cache", ".tox", "**/*.egg-info"],
+    "node": ["**/node_modules", ".npm", ".yarn/cache", ".next/cache", ".turbo", ".eslintcache"],
+    "rust": ["target"],
+    "java": ["target", "build", ".gradle"],
+    "ruby": [".bundle", "vendor/bundle", "log", "tmp"],
+}
+# Build output the image rebuilds itself (only excluded when the Dockerfile runs a build)
+BUILD_OUTPUT_PATTERNS = {
+    "python": ["build", "dist"],
+    "node": ["dist", "build", ".next", "out"],
+}
+
+# Only emitted when something in the tree matches them
+TEST_PATTERNS = ["tests", "test", "spec", "**/__tests__", "**/*.test.js", "**/*.test.ts", "**/*.spec.js",
+                 "**/*.spec.ts", "**/conftest.py", "**/*_test.go"]
+NOTEBOOK_PATTERNS = ["**/*.ipynb", "**/.ipynb_checkpoints"]
+DATA_EXTENSIONS = ["csv", "tsv", "parquet", "feather", "h5", "hdf5", "sqlite", "sqlite3", "db", "npy", "npz",
+                   "xlsx", "xls", "jsonl", "ndjson", "arrow", "avro"]
+
+PRIMARY_LANGUAGES = {
+    "python": "python", "javascript": "node", "typescript": "node", "node": "node", "nodejs": "node",
+    "go": "go", "golang": "go", "rust": "rust", "java": "java", "kotlin": "java", "ruby": "ruby", "php": "php",
+}
+
+_TEST_RUNNER = re.compile(r"\b(pytest|unittest|tox|(npm|yarn|pnpm)\s+(run\s+)?test|jest|vitest|go\s+test|"
+                          r"cargo\s+test|mvn\w*\b.*\b(test|verify)|gradle\w*\b.*\btest|rspec)\b")
+_BUILD_STEP = re.compile(r"\b((npm|yarn|pnpm)\s+(run\s+)?build|next\s+build|vite\s+build|tsc\b|"
+                         r"python\s+-m\s+build|setup\.py\s+(bdist|sdist|build))")
+_FILE_NAME = re.compile(r"[\w.-]+\.\w+")
+
+
+def _compile(pattern: str) -> re.Pattern:
+    """
+    Docker's .dockerignore matching: paths are relative to the context root,
+    * and ? stay inside one path segment, ** spans any number of segments.
+    A pattern excludes a path if it matches the path or one of its parent directories.
+    """
+    regex = ""
+    idx = 0
+    pattern = pattern.strip("/")
+    while idx < len(pattern):
+        char = pattern[idx]
+        if pattern.startswith("**/", idx):
+            regex += "(?:.*/)?"
+            idx += 3
+            continue
+        if pattern.startswith("**", idx):
+            regex += ".*"
+            idx += 2
+            continue
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            end = pattern.find("]", idx)
+            if end == -1:
+                regex += re.escape(char)
+            else:
+                regex += pattern[idx:end + 1]
+                idx = end
+        else:
+            regex += re.escape(char)
+        idx += 1
+    return re.compile(f"(?:{regex})(?:/.*)?\\Z")
+
+
+class Rules:
+    """Parsed .dockerignore; the last matching pattern decides, as in Docker"""
+
+    def __init__(self, dockerignore: str):
+        self.rules: List[Tuple[re.Pattern, bool]] = []
+        for line in dockerignore.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            negation = line.startswith("!")
+            self.rules.append((_compile(line[1:] if negation else line), negation))
+        # Most paths match nothing: one combined match settles those
+        self._any = re.compile("|".join(rule.pattern for rule, _ in self.rules) or "(?!)")
+
+    def excludes(self, path: str) -> bool:
+        if not self._any.match(path):
+            return False
+        for rule, negation in reversed(self.rules):
+            if rule.match(path):
+                return not negation
+        return False
+
+
+def _context_sources(dockerfile: str) -> List[str]:
+    """Build-context paths the Dockerfile COPY / ADDs by name (COPY . . adds nothing here)"""
+    if not dockerfile:
+        return []
+    sources = []
+    for instruction in parse_dockerfile(dockerfile):
+        if instruction.keyword not in ("COPY", "ADD") or instruction.heredocs:
+            continue
+        body = " ".join(line.strip().rstrip("\\").strip() for line in instruction.lines)
+        tokens = body.split()[1:]
+        if any(token.startswith("--from") for token in tokens):
+            continue
+        arguments = [token for token in tokens if not token.startswith("--")]
+        if arguments and arguments[0].startswith("["):
+            arguments = re.findall(r'"([^"]*)"', " ".join(arguments))
+        for source in arguments[:-1]:
+            source = (source[2:] if source.startswith("./") else source).rstrip("/")
+            if source and source != "." and "://" not in source:
+                sources.append(source)
+    return sources
+
+
+def _languages(project_info: Dict[str, Any], file_list: List[str]) -> List[str]:
+    """Primary language first, then every language with a root manifest in the tree"""
+    languages = []
+    primary = PRIMARY_LANGUAGES.get((project_info.get("primary_language") or "").lower())
+    if primary:
+        languages.append(primary)
+    for path in file_list:
+        language = MANIFESTS.get(path)
+        language = PRIMARY_LANGUAGES.get(language, language)
+        if language and language not in languages:
+            languages.append(language)
+    return languages
+
+
+def _referenced_names(samples: Dict[str, str]) -> set:
+    """File names sampled code mentions (open("data/prices.csv"), "spec/openapi.yaml", ...)"""
+    return {name.rpartition("/")[2] for content in samples.values() for name in _FILE_NAME.findall(content)}
+
+
+def generate_dockerignore(
+    project_info: Dict[str, Any],
+    file_list: List[str],
+    dockerfile: str = "",
+    file_samples: Optional[Dict[str, str]] = None
+) -> str:
+    """.dockerignore for the analyzed tree and the Dockerfile that will build it"""
+    samples = file_samples or {}
+    run_text = "\n".join(ins.text for ins in parse_dockerfile(dockerfile or "") if ins.keyword == "RUN")
+    languages = _languages(project_info, file_list)
+
+    sections: List[Tuple[str, List[str]]] = list(COMMON_PATTERNS)
+    for language in languages:
+        patterns = list(LANGUAGE_PATTERNS.get(language, []))
+        if _BUILD_STEP.search(run_text):
+            patterns += BUILD_OUTPUT_PATTERNS.get(language, [])
+        if patterns:
+            sections.append((f"{language.capitalize()} dependencies / caches", patterns))
+
+    def present(patterns: Iterable[str]) -> List[str]:
+        compiled = [(pattern, _compile(pattern)) for pattern in patterns]
+        return [pattern for pattern, rule in compiled if any(rule.match(path) for path in file_list)]
+
+    # Tree-specific sections: what is there is not always obviously unused
+    optional: List[Tuple[str, List[str]]] = []
+    if not _TEST_RUNNER.search(run_text):
+        optional.append(("Tests (not run in the image)", present(TEST_PATTERNS)))
+    optional.append(("Notebooks", present(NOTEBOOK_PATTERNS)))
+    optional.append(("Data files", present(f"**/*.{extension}" for extension in DATA_EXTENSIONS)))
+    optional = [(title, patterns) for title, patterns in optional if patterns]
+    sections += optional
+
+    # Whatever the Dockerfile names explicitly, and files the sampled code opens, stay in the context
+    keep = _context_sources(dockerfile)
+    if optional:
+        names = _referenced_names(samples)
+        optional_rules = Rules("\n".join(pattern for _, patterns in optional for pattern in patterns))
+        keep += [path for path in file_list
+                 if path.rpartition("/")[2] in names and optional_rules.excludes(path)]
+
+    lines = ["# Generated from the analyzed repository tree: paths the image build does not need"]
+    for title, patterns in sections:
+        lines += ["", f"# {title}", *patterns]
+    rules = Rules("\n".join(lines))
+    # A named directory is re-included as a whole if anything under it would be left out
+    negations = [source for source in dict.fromkeys(keep)
+                 if rules.excludes(source) or any(path.startswith(source + "/") and rules.excludes(path)
+                                                  for path in file_list)]
+    if negations:
+        lines += ["", "# Used by the Dockerfile or the application", *(f"!{path}" for path in negations)]
+    return "\n".join(lines) + "\n"
+
+
+def estimate_context_savings(
+    dockerignore: str,
+    file_list: List[str],
+    file_sizes: Optional[Dict[str, int]] = None,
+    repo_stats: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Files and bytes of the analyzed tree the .dockerignore keeps out of the
+    build context. Exact with per-file sizes (tree API / tarball ingestion);
+    with only repo_stats, files are sized by the average of their extension.
+    Paths outside the tree (.git, installed node_modules) are not counted.
+    """
+    rules = Rules(dockerignore)
+    excluded = [path for path in file_list if rules.excludes(path)]
+    report: Dict[str, Any] = {
+        "excluded_files": len(excluded),
+        "total_files": len(file_list),
+        "excluded_bytes": None,
+        "context_bytes": None,
+        "estimated": False,
+    }
+    if file_sizes:
+        report["context_bytes"] = sum(file_sizes.get(path, 0) for path in file_list)
+        report["excluded_bytes"] = sum(file_sizes.get(path, 0) for path in excluded)
+    elif repo_stats and repo_stats.get("total_bytes") is not None:
+        report["context_bytes"] = repo_stats["total_bytes"]
+        report["excluded_bytes"] = _estimate_bytes(excluded, file_list, repo_stats)
+        report["estimated"] = True
+    return report
+
+
+def _estimate_bytes(paths: List[str], file_list: List[str], repo_stats: Dict[str, Any]) -> int:
+    """Known sizes for the largest files, per-extension averages for the rest"""
+    def extension(path: str) -> str:
+        name = path.rpartition("/")[2]
+        return name.rpartition(".")[2].lower() if "." in name[1:] else "(none)"
+
+    known = {entry["path"]: entry["bytes"] for entry in repo_stats.get("largest_files", [])}
+    by_extension = dict(repo_stats.get("bytes_by_extension", {}))
+    counts: Dict[str, int] = {}
+    for path in file_list:
+        if path in known:
+            ext = extension(path)
+            if ext in by_extension:
+                by_extension[ext] -= known[path]
+        else:
+            counts[extension(path)] = counts.get(extension(path), 0) + 1
+    # Extensions outside the top ones share what is left of the total
+    other_bytes = repo_stats["total_bytes"] - sum(known.values()) - sum(max(b, 0) for b in by_extension.values())
+    other_files = sum(count for ext, count in counts.items() if ext not in by_extension)
+
+    total = 0
+    for path in paths:
+        ext = extension(path)
+        if path in known:
+            total += known[path]
+        elif ext in by_extension:
+            total += max(by_extension[ext], 0) // max(counts.get(ext, 1), 1)
+        elif other_files:
+            total += max(other_bytes, 0) // other_files
+    return total
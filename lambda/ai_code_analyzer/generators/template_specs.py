@@ -0,0 +1,58 @@
+"""
+Template-based spec generation (fast path)
+잘 알려진 스택은 GPT 없이 템플릿만으로 Dockerfile / tfvars / AppSpec 을 만듭니다.
+"""
+from typing import Any, Dict
+
+from generators.appspec_generator import generate_appspec_yaml
+from generators.dockerfile_generator import generate_dockerfile
+from generators.dockerfile_optimizer import optimize_dockerfile
+from generators.terraform_generator import generate_tfvars
+
+# Frameworks whose templates are known to produce a working image as-is
+FAST_PATH_FRAMEWORKS = {"fastapi", "flask", "express"}
+
+
+CONFIDENCE_LEVELS = ("low", "medium", "high")
+
+
+def supports_fast_path(project_info: Dict[str, Any], min_confidence: str = "high") -> bool:
+    """
+    True when local detection is confident enough to skip the LLM:
+    high confidence (or min_confidence), a templated framework, and a runnable entrypoint.
+    """
+    confidence = project_info.get("confidence")
+    if confidence not in CONFIDENCE_LEVELS:
+        return False
+    if CONFIDENCE_LEVELS.index(confidence) < CONFIDENCE_LEVELS.index(min_confidence):
+        return False
+
+    framework = (project_info.get("primary_framework") or "").lower()
+    if framework not in FAST_PATH_FRAMEWORKS:
+        return False
+
+    # Flask template runs under gunicorn, which must be in requirements.txt
+    if framework == "flask" and project_info.get("app_server") != "gunicorn":
+        return False
+
+    return bool(project_info.get("entrypoint") or project_info.get("start_script"))
+
+
+def generate_template_specs(
+    project_info: Dict[str, Any],
+    analysis_id: str,
+    image_tag: str
+) -> Dict[str, str]:
+    """Render Dockerfile, AppSpec and tfvars from templates"""
+    framework = project_info.get("primary_framework")
+    return {
+        "dockerfile": optimize_dockerfile(generate_dockerfile(project_info)),
+        "appspec": generate_appspec_yaml(project_info),
+        "terraform_tfvars": generate_tfvars(analysis_id, image_tag, project_info),
+        "recommendations": (
+            f"# Deployment recommendations\n\n"
+            f"Specs were rendered from the {project_info.get('primary_language')} / {framework} "
+            f"templates (entrypoint: {project_info.get('entrypoint') or project_info.get('start_script')}).\n"
+            f"Edit templates/ or config/resource_config.py to change the generated output.\n"
+        ),
+    }
@@ -4,8 +4,9 @@ Uses templates from templates/terraform_templates.py and config/resource_config.
 """
 from typing import Dict, Any
 from templates.terraform_templates import generate_terraform_tfvars
+from services.task_sizing import describe as describe_task_size
 from config.resource_config import (
-    get_cpu, get_memory,
+    get_task_size,
     SCALING_CONFIG, HEALTH_CHECK_CONFIG, DEPLOYMENT_CONFIG
 )
 
@@ -19,16 +20,16 @@ def generate_tfvars(
     프로젝트 정보를 기반으로 terraform.tfvars 생성
     config/resource_config.py 설정을 자동으로 반영합니다.
     """
-    complexity = project_info.get("deployment_complexity", "moderate")
     port = project_info.get("app_port", 8000)
     primary_language = project_info.get("primary_language", "Unknown")
     primary_framework = project_info.get("primary_framework", "N/A")
     database_needed = project_info.get("database_needed", False)
     database_type = project_info.get("database_type", "none")
 
-    # CPU/메모리는 config에서 가져옴
-    cpu = get_cpu(complexity)
-    memory = get_memory(complexity)
+    # CPU/메모리: 관측한 사용량으로 고른 크기, 없으면 config 의 시작 크기
+    task_size = get_task_size(project_info)
+    cpu = task_size["cpu"]
+    memory = task_size["memory"]
 
     # Terraform tfvars 생성
     tfvars = generate_terraform_tfvars(
@@ -43,7 +44,12 @@ def generate_tfvars(
         primary_language=primary_language,
         primary_framework=primary_framework,
         database_enabled=database_needed,
-        database_type=database_type
+        database_type=database_type,
+        task_size_note=describe_task_size(project_info.get("task_size"))
     )
 
+    # port_allocator 가 예약한 ALB listener priority (없으면 user-apps.tf 가 app name hash 로 계산)
+    if project_info.get("listener_priority"):
+        tfvars += f"\n# ALB\nuser_app_listener_priority = {project_info['listener_priority']}\n"
+
     return tfvars
@@ -1,76 +1,400 @@
+import base64
 import json
 import os
 import hashlib
+import re
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, wait
 from datetime import datetime, timezone
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 import boto3
 import requests
+from requests.adapters import HTTPAdapter
+
+from analyzers import change_impact
+from config.resource_config import SIZING_CONFIG, get_task_size
+from analyzers.project_detector import detect_project
+from analyzers.repo_summarizer import estimate_tokens, summarize_repository
+from analyzers.spec_stream import SPEC_SECTIONS, SpecSectionStream, extract_section
+from generators.dockerfile_optimizer import optimize_dockerfile
+from generators.dockerfile_parser import Dockerfile, parse_dockerfile
+from generators.dockerfile_rewrites import SYNTAX_PASSES, convert_heredocs, run_passes
+from generators.dockerignore_generator import estimate_context_savings, generate_dockerignore
+from generators.template_specs import generate_template_specs, supports_fast_path
+from services import (
+    analysis_cache, github_cache, github_sampler, github_tarball, llm_cache, llm_guard, port_allocator,
+    result_store, spec_store, task_sizing, telemetry
+)
+
+AWS_REGION = os.getenv("AWS_REGION", "ap-northeast-2")
+
+# AWS clients are created on first use and kept for warm invocations (see _get_aws_client):
+# the first one costs ~150 ms, and e.g. cache hits never need SSM
+_aws_clients: Dict[str, Any] = {}
+_aws_clients_lock = threading.Lock()
+
+OPENAI_API_KEY_PARAM = "/delightful-deploy/openai-api-key"
+# Any OpenAI-compatible endpoint (e.g. the local stub in test/local_stubs.py)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
+GITHUB_TOKEN_PARAM = "/delightful/github/token"
+# Download manifests / entrypoints / Dockerfiles from the tree as file samples
+GITHUB_SAMPLE_FILES = os.getenv("GITHUB_SAMPLE_FILES", "true").lower() == "true"
+GITHUB_FETCH_WORKERS = 8
+_FULL_SHA = re.compile(r"^[0-9a-f]{40}$")
+# "api" (tree + README + blobs, cached) or "tarball" (one streamed archive download per analysis)
+GITHUB_INGEST_MODE = os.getenv("GITHUB_INGEST_MODE", "api")
+# GitHub responses (trees, blobs, README) shared across analyses under github-cache/ in S3
+GITHUB_CACHE_ENABLED = os.getenv("GITHUB_CACHE_ENABLED", "true").lower() == "true"
+_github_cache: Optional[github_cache.ResponseCache] = None
+
+# Warm-start caches: secrets are re-read from SSM only after the TTL expires,
+# missing parameters are retried sooner
+SECRET_CACHE_TTL = int(os.getenv("SECRET_CACHE_TTL", "900"))
+SECRET_MISS_TTL = 60
+_secret_cache: Dict[str, tuple] = {}
+_secret_cache_lock = threading.Lock()
+
+# OpenAI call management: read timeout from recent p99 (capped), retries with jittered
+# backoff on 429/5xx, optional hedged second request, circuit breaker. While the circuit
+# is open, specs come from templates / fallback specs instead of the LLM.
+_openai_guard = llm_guard.LLMCallGuard(
+    connect_timeout=float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5")),
+    min_read_timeout=float(os.getenv("OPENAI_MIN_READ_TIMEOUT", "30")),
+    max_read_timeout=float(os.getenv("OPENAI_MAX_READ_TIMEOUT", "300")),
+    max_attempts=int(os.getenv("OPENAI_MAX_ATTEMPTS", "3")),
+    call_budget=float(os.getenv("OPENAI_CALL_BUDGET", "600")),
+    hedge=os.getenv("OPENAI_HEDGE", "false").lower() == "true",
+    breaker=llm_guard.CircuitBreaker(
+        failure_threshold=int(os.getenv("OPENAI_BREAKER_THRESHOLD", "3")),
+        cooldown=float(os.getenv("OPENAI_BREAKER_COOLDOWN", "120"))
+    )
+)
+
+# Stream the spec completion and post-process/upload sections as they arrive
+OPENAI_STREAMING = os.getenv("OPENAI_STREAMING", "true").lower() == "true"
+SPEC_UPLOAD_WORKERS = 4
+# Final publish: one worker per object, so checks and PUTs each cost one round trip
+SPEC_PUBLISH_WORKERS = 8
+# Also publish analysis/{id}/bundle.tar.gz (all specs + manifest.json, one GET for the workflow)
+SPEC_BUNDLE_ENABLED = os.getenv("SPEC_BUNDLE_ENABLED", "true").lower() == "true"
+
+# Reuse completions for prompts that are identical after normalization (llm-cache/ in S3)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTLS = {
+    "analysis": int(os.getenv("LLM_CACHE_ANALYSIS_TTL", str(llm_cache.DEFAULT_TTLS["analysis"]))),
+    "specs": int(os.getenv("LLM_CACHE_SPECS_TTL", str(llm_cache.DEFAULT_TTLS["specs"]))),
+}
+_llm_cache: Optional[llm_cache.ResponseCache] = None
+
+# Token budgets for repository context (file tree / README / samples) in the prompts
+ANALYSIS_PROMPT_TOKEN_BUDGET = int(os.getenv("ANALYSIS_PROMPT_TOKEN_BUDGET", "3000"))
+SPEC_PROMPT_TOKEN_BUDGET = int(os.getenv("SPEC_PROMPT_TOKEN_BUDGET", "1200"))
+
+# Render specs from templates (no LLM) when local detection is confident
+TEMPLATE_FAST_PATH = os.getenv("TEMPLATE_FAST_PATH", "true").lower() == "true"
+# How often each generation path was taken in this container
+_generation_path_counts = {"template": 0, "llm": 0, "degraded": 0, "incremental": 0}
+
+# One pooled keep-alive session per upstream (TLS handshakes only on cold start)
+HTTP_POOL_SIZE = 10
+_http_sessions: Dict[str, requests.Session] = {}
+_http_sessions_lock = threading.Lock()
+
+# Port / listener priority reservations (conditional writes instead of scanning deployments)
+PORT_ALLOCATION_TABLE = os.getenv("PORT_ALLOCATION_TABLE", "")
+
+# asyncio orchestration of lambda_handler (overlaps tfvars publishing with spec generation);
+# blocking calls run on this many threads
+ASYNC_PIPELINE = os.getenv("ASYNC_PIPELINE", "false").lower() == "true"
+ASYNC_PIPELINE_WORKERS = 4
+
+# One CloudWatch EMF record per invocation (stage durations, payload sizes, tokens, cache hits)
+TELEMETRY_ENABLED = os.getenv("TELEMETRY_ENABLED", "true").lower() == "true"
+
+# Incremental re-analysis: diff the tree against the repository's last analysis and
+# regenerate only the specs the changed files affect
+INCREMENTAL_ANALYSIS = os.getenv("INCREMENTAL_ANALYSIS", "true").lower() == "true"
+
+# Emit a .dockerignore spec (build context without VCS, caches, tests, notebooks, data)
+DOCKERIGNORE_ENABLED = os.getenv("DOCKERIGNORE_ENABLED", "true").lower() == "true"
+
+# Task right-sizing from observed utilization: "cloudwatch" (Container Insights of the services
+# tagged with the repository), "file:<path>" (JSON samples) or "off" (starting sizes only)
+TASK_SIZING_SOURCE = os.getenv("TASK_SIZING_SOURCE", "cloudwatch")
+USER_APP_CLUSTER = os.getenv("USER_APP_CLUSTER", "delightful-deploy-cluster")
+_metrics_source: Optional[Any] = None
+
+# Batch mode ({"action": "analyze_batch"}): repositories analyzed concurrently in one invocation
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+BATCH_MAX_CONCURRENCY = 16
+# No further repository is started with less invocation time left than this
+BATCH_TIME_RESERVE_MS = 120_000
+_port_scan_lock = threading.Lock()
+
+# Pre-analysis I/O fan-out (SSM, DynamoDB, GitHub run concurrently)
+PREFETCH_MAX_WORKERS = 4
+PREFETCH_DEADLINES = {
+    "api_key": 10,
+    "existing_deployments": 10,
+    "github": 30,
+    "utilization": 10,
+}
+
+
+def _github_headers() -> Dict[str, str]:
+    headers = {"Accept": "application/vnd.github.v3+json"}
 
-# Initialize AWS clients
-ssm = boto3.client("ssm")
-dynamodb = boto3.resource("dynamodb")
-s3 = boto3.client("s3")
+    # SSM에서 GitHub token 가져오기 (선택사항)
+    github_token = _get_secret_from_ssm(GITHUB_TOKEN_PARAM)
+    if github_token:
+        headers["Authorization"] = f"token {github_token}"
+    return headers
 
 
-def _fetch_github_repo_info(repository: str, commit_sha: str) -> tuple[List[str], str]:
+def _fetch_github_repo_info(repository: str, commit_sha: str, mode: Optional[str] = None) -> Dict[str, Any]:
     """
-    GitHub API를 통해 repo 파일 목록과 README 가져오기
+    GitHub 에서 repo 파일 목록, README, 주요 파일 sample 가져오기
     repository: "owner/repo" 형식
+    mode: "api" (tree + README + blob API, cached) or "tarball" (one streamed archive
+    download; falls back to the API if it fails). Default: GITHUB_INGEST_MODE.
+    Returns: {"file_list": [...], "readme_content": "...", "tree_sha": "...", "file_samples": {...}, "file_sizes": {...}}
     """
-    import requests
+    mode = mode or GITHUB_INGEST_MODE
+    if mode == "tarball":
+        try:
+            return _fetch_github_repo_archive(repository, commit_sha)
+        except Exception as e:
+            print(f"⚠️ Tarball ingestion failed ({e}), falling back to the GitHub API")
 
-    # Public API (rate limit 낮음, 하지만 demo용으로는 충분)
+    return _fetch_github_repo_via_api(repository, commit_sha)
+
+
+def _fetch_github_repo_archive(repository: str, commit_sha: str) -> Dict[str, Any]:
+    """Tarball mode: archive stream + commit lookup (for tree_sha) run concurrently"""
+    session = _get_http_session("github")
     api_base = "https://api.github.com"
-    headers = {"Accept": "application/vnd.github.v3+json"}
+    headers = _github_headers()
 
-    # SSM에서 GitHub token 가져오기 (선택사항)
-    github_token = _get_secret_from_ssm("/delightful/github/token")
-    if github_token:
-        headers["Authorization"] = f"token {github_token}"
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        commit_future = pool.submit(
+            telemetry.carry(github_sampler.conditional_get), session, f"{api_base}/repos/{repository}/commits/{commit_sha}",
+            headers, immutable=bool(_FULL_SHA.match(commit_sha or "")), cache=_get_github_cache()
+        )
+        started = time.monotonic()
+        repo_info = github_tarball.fetch_repository_archive(session, api_base, repository, commit_sha, headers)
+        try:
+            commit = commit_future.result() or {}
+            repo_info["tree_sha"] = commit.get("commit", {}).get("tree", {}).get("sha")
+        except Exception as e:
+            print(f"⚠️ Could not look up tree sha: {e}")
+            repo_info["tree_sha"] = None
 
-    try:
-        # 1. 파일 트리 가져오기
-        tree_url = f"{api_base}/repos/{repository}/git/trees/{commit_sha}?recursive=1"
-        tree_resp = requests.get(tree_url, headers=headers, timeout=10)
-        tree_resp.raise_for_status()
-        tree_data = tree_resp.json()
+    stats = repo_info["repo_stats"]
+    print(f"✅ Ingested tarball in {time.monotonic() - started:.2f}s: {stats['file_count']} files, "
+          f"{stats['total_bytes'] // 1024} KiB ({(stats['archive_bytes'] or 0) // 1024} KiB compressed), "
+          f"README {len(repo_info['readme_content'])} chars, "
+          f"{len(repo_info['file_samples'])} samples, {stats['skipped_binaries']} binaries skipped")
+    return repo_info
 
-        file_list = [item["path"] for item in tree_data.get("tree", []) if item["type"] == "blob"]
-        print(f"✅ Fetched {len(file_list)} files from GitHub")
 
-        # 2. README 가져오기
-        readme_url = f"{api_base}/repos/{repository}/readme"
-        readme_resp = requests.get(readme_url, headers=headers, timeout=10)
+def _fetch_github_repo_via_api(repository: str, commit_sha: str) -> Dict[str, Any]:
+    """API mode: recursive tree, then README and key-file blobs concurrently"""
+    session = _get_http_session("github")
+
+    # Public API (rate limit 낮음, 하지만 demo용으로는 충분)
+    api_base = "https://api.github.com"
+    headers = _github_headers()
+
+    try:
+        # 1. 파일 트리 가져오기 (commit sha 의 tree 는 바뀌지 않음)
+        tree_url = f"{api_base}/repos/{repository}/git/trees/{commit_sha}?recursive=1"
+        cache = _get_github_cache()
+        tree_data = github_sampler.conditional_get(
+            session, tree_url, headers, immutable=bool(_FULL_SHA.match(commit_sha or "")), cache=cache
+        )
+        if tree_data is None:
+            raise ValueError(f"tree {commit_sha} not found in {repository}")
+
+        tree_items = tree_data.get("tree", [])
+        file_list = [item["path"] for item in tree_items if item["type"] == "blob"]
+        file_sizes = {item["path"]: item.get("size", 0) for item in tree_items if item["type"] == "blob"}
+        tree_sha = tree_data.get("sha")
+        print(f"✅ Fetched {len(file_list)} files from GitHub (tree {tree_sha})")
+
+        # 2. README 와 주요 파일 sample 을 동시에 가져오기
+        sample_items = github_sampler.select_sample_paths(tree_items) if GITHUB_SAMPLE_FILES else []
+        with ThreadPoolExecutor(max_workers=GITHUB_FETCH_WORKERS) as pool:
+            readme_future = pool.submit(
+                telemetry.carry(github_sampler.conditional_get), session, f"{api_base}/repos/{repository}/readme", headers,
+                cache=cache
+            )
+            file_samples = github_sampler.fetch_samples(
+                session, api_base, repository, sample_items, headers, pool=pool, cache=cache
+            )
+            try:
+                readme_data = readme_future.result()
+            except Exception as e:
+                print(f"⚠️ Could not fetch README: {e}")
+                readme_data = None
 
         readme_content = ""
-        if readme_resp.status_code == 200:
-            import base64
-            readme_data = readme_resp.json()
+        if readme_data:
             readme_content = base64.b64decode(readme_data["content"]).decode("utf-8")
             print(f"✅ Fetched README ({len(readme_content)} chars)")
+        if file_samples:
+            print(f"✅ Sampled {len(file_samples)} key files: {', '.join(file_samples)}")
+        print(f"🗃️ GitHub cache: {cache.summary()}")
 
-        return file_list, readme_content
+        return {
+            "file_list": file_list,
+            "readme_content": readme_content,
+            "tree_sha": tree_sha,
+            "file_samples": file_samples,
+            "file_sizes": file_sizes,
+        }
 
     except Exception as e:
         print(f"❌ GitHub API error: {e}")
         raise
 
 
-def _get_secret_from_ssm(param_name: str) -> Optional[str]:
-    """Retrieve secret from SSM Parameter Store"""
+def _fetch_changed_paths(repository: str, base_sha: str, head_sha: str) -> Optional[List[str]]:
+    """
+    Paths changed from base_sha to head_sha (GitHub compare API), or None when
+    GitHub cannot give the complete list (history rewritten, file list truncated)
+    """
+    url = f"https://api.github.com/repos/{repository}/compare/{base_sha}...{head_sha}"
     try:
-        resp = ssm.get_parameter(Name=param_name, WithDecryption=True)
-        return resp["Parameter"]["Value"]
+        # Both ends are full commit SHAs, so the comparison never changes
+        comparison = github_sampler.conditional_get(
+            _get_http_session("github"), url, _github_headers(), immutable=True, cache=_get_github_cache()
+        )
     except Exception as e:
-        print(f"Error retrieving SSM parameter {param_name}: {e}")
+        print(f"⚠️ Could not compare {base_sha[:7]}...{head_sha[:7]}: {e}")
+        return None
+
+    # "behind" / "diverged" diff against the merge base, not against the analyzed tree
+    if comparison is None or comparison.get("status") not in ("ahead", "identical"):
         return None
+    files = comparison.get("files", [])
+    if len(files) >= change_impact.MAX_COMPARE_FILES:
+        return None
+    return change_impact.changed_paths(files)
+
+
+def _get_github_cache() -> github_cache.ResponseCache:
+    """Container-wide GitHub response cache (memory + S3 unless disabled)"""
+    global _github_cache
+    if _github_cache is None:
+        bucket = os.getenv("S3_BUCKET", "delightful-deploy-artifacts") if GITHUB_CACHE_ENABLED else None
+        _github_cache = github_cache.ResponseCache(_get_aws_client("s3") if bucket else None, bucket)
+    return _github_cache
+
+
+def _get_llm_cache() -> Optional[llm_cache.ResponseCache]:
+    """Container-wide LLM response cache (memory + S3), None when disabled"""
+    global _llm_cache
+    if _llm_cache is None and LLM_CACHE_ENABLED:
+        bucket = os.getenv("S3_BUCKET", "delightful-deploy-artifacts")
+        _llm_cache = llm_cache.ResponseCache(_get_aws_client("s3"), bucket, ttls=LLM_CACHE_TTLS)
+    return _llm_cache
+
+
+def _get_metrics_source() -> Optional[Any]:
+    """Container-wide utilization source for task right-sizing, None when disabled"""
+    global _metrics_source
+    if _metrics_source is None and TASK_SIZING_SOURCE != "off":
+        if TASK_SIZING_SOURCE.startswith("file:"):
+            _metrics_source = task_sizing.FileMetricsSource(TASK_SIZING_SOURCE[len("file:"):])
+        else:
+            _metrics_source = task_sizing.CloudWatchMetricsSource(
+                _get_aws_client("cloudwatch"), _get_aws_client("resourcegroupstaggingapi"), USER_APP_CLUSTER,
+                lookback_days=SIZING_CONFIG["lookback_days"]
+            )
+    return _metrics_source
+
+
+def _recommend_task_size(repository: str) -> Optional[Dict[str, Any]]:
+    """Task size from the repository's observed utilization, None until enough has been observed"""
+    samples = _get_metrics_source().samples(repository)
+    telemetry.current().add("utilization_samples", len(samples))
+    task_size = task_sizing.recommend_task_size(
+        samples,
+        cpu_target_percent=SIZING_CONFIG["cpu_target_percent"],
+        memory_target_percent=SIZING_CONFIG["memory_target_percent"],
+        cpu_percentile=SIZING_CONFIG["cpu_percentile"],
+        min_samples=SIZING_CONFIG["min_samples"]
+    )
+    if task_size:
+        print(f"📏 Task size {task_size['cpu']} CPU / {task_size['memory']} MiB: {task_sizing.describe(task_size)}")
+    else:
+        print(f"📏 {len(samples)} utilization samples for {repository}, keeping the starting task size")
+    return task_size
+
+
+def _get_secret_from_ssm(param_name: str, ttl: int = SECRET_CACHE_TTL) -> Optional[str]:
+    """Retrieve secret from SSM Parameter Store (cached across warm invocations)"""
+    now = time.monotonic()
+    with _secret_cache_lock:
+        cached = _secret_cache.get(param_name)
+    if cached and cached[1] > now:
+        return cached[0]
+
+    try:
+        resp = _get_aws_client("ssm").get_parameter(Name=param_name, WithDecryption=True)
+        value = resp["Parameter"]["Value"]
+        expires_at = now + ttl
+    except Exception as e:
+        print(f"Error retrieving SSM parameter {param_name}: {e}")
+        value = None
+        expires_at = now + min(ttl, SECRET_MISS_TTL)
+
+    with _secret_cache_lock:
+        _secret_cache[param_name] = (value, expires_at)
+    return value
+
+
+def _get_aws_client(service: str) -> Any:
+    """Memoized boto3 client ("s3", "ssm"), or the boto3 resource for "dynamodb"."""
+    client = _aws_clients.get(service)
+    if client is not None:
+        return client
+
+    # boto3 client creation is not thread-safe (the prefetch stages run on threads)
+    with _aws_clients_lock:
+        client = _aws_clients.get(service)
+        if client is None:
+            factory = boto3.resource if service == "dynamodb" else boto3.client
+            client = factory(service, region_name=AWS_REGION)
+            _aws_clients[service] = client
+    return client
+
+
+def _get_http_session(name: str) -> requests.Session:
+    """Pooled keep-alive session per upstream ("github", "openai")"""
+    session = _http_sessions.get(name)
+    if session is not None:
+        return session
+
+    with _http_sessions_lock:
+        session = _http_sessions.get(name)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_sessions[name] = session
+    return session
 
 
 def _get_existing_deployments() -> List[Dict]:
     """Query DynamoDB for existing successful deployments to avoid conflicts"""
     try:
         # Query AI analysis table for successful deployments
-        ai_analysis_table = dynamodb.Table("delightful-deploy-ai-analysis")
+        ai_analysis_table = _get_aws_client("dynamodb").Table("delightful-deploy-ai-analysis")
 
         response = ai_analysis_table.scan(
             FilterExpression="attribute_exists(project_info)",
@@ -106,17 +430,181 @@ def _get_existing_deployments() -> List[Dict]:
         return []
 
 
+def _get_openai_api_key() -> Optional[str]:
+    """Get OpenAI API key from SSM Parameter Store"""
+    api_key = _get_secret_from_ssm(OPENAI_API_KEY_PARAM)
+    if not api_key:
+        print("❌ ERROR: Failed to get OpenAI API key from SSM")
+    return api_key
+
+
+def _run_parallel_stages(
+    stages: Dict[str, Callable[[], Any]],
+    deadlines: Dict[str, float],
+    defaults: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Run independent stages on a bounded thread pool.
+    Each stage gets its own deadline (seconds, measured from the start of the
+    fan-out); a stage that raises or misses its deadline yields its default,
+    so the critical path is max(stage) instead of sum(stages).
+    """
+    defaults = defaults or {}
+    results = {}
+    started = time.monotonic()
+
+    executor = ThreadPoolExecutor(max_workers=min(PREFETCH_MAX_WORKERS, len(stages)) or 1)
+    try:
+        futures = {name: executor.submit(telemetry.carry(fn)) for name, fn in stages.items()}
+        for name, future in futures.items():
+            deadline = deadlines.get(name, max(deadlines.values(), default=30))
+            remaining = deadline - (time.monotonic() - started)
+            try:
+                results[name] = future.result(timeout=max(remaining, 0))
+            except FuturesTimeoutError:
+                print(f"⚠️ Stage '{name}' exceeded its {deadline}s deadline, using fallback")
+                results[name] = defaults.get(name)
+            except Exception as e:
+                print(f"⚠️ Stage '{name}' failed: {e}, using fallback")
+                results[name] = defaults.get(name)
+    finally:
+        # Stragglers past their deadline are abandoned, not awaited
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    print(f"⏱️ Prefetch stages finished in {time.monotonic() - started:.2f}s")
+    return results
+
+
+def _select_free_port(preferred: int, existing_deployments: List[Dict], repository: str) -> int:
+    """First port >= preferred not used by another repository's deployment"""
+    used = {
+        dep.get("port") for dep in existing_deployments
+        if dep.get("repository") != repository
+    }
+    port = preferred
+    while port in used:
+        port += 1
+    return port
+
+
+def _reserve_deployment_resources(
+    repository: str,
+    project_info: Dict[str, Any],
+    analysis_id: str,
+    existing_deployments: Optional[List[Dict]] = None,
+    task_size: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, int]]:
+    """
+    Reserve app_port and an ALB listener priority for repository and write
+    them into project_info. Without the allocator table (or if it fails) the
+    port is picked from a scan of existing deployments and no priority is set.
+    task_size (from observed utilization) is written into project_info too.
+    """
+    if task_size:
+        project_info["task_size"] = task_size
+    preferred = project_info.get("app_port", 8000)
+
+    if PORT_ALLOCATION_TABLE:
+        try:
+            allocation = port_allocator.allocate(
+                _get_aws_client("dynamodb").Table(PORT_ALLOCATION_TABLE), repository, preferred, analysis_id
+            )
+            project_info["app_port"] = allocation["port"]
+            project_info["listener_priority"] = allocation["listener_priority"]
+            print(f"🔒 Reserved port {allocation['port']} / listener priority "
+                  f"{allocation['listener_priority']} for {repository}")
+            return allocation
+        except Exception as e:
+            print(f"⚠️ Port allocator unavailable ({e}), falling back to deployment scan")
+
+    if existing_deployments is None:
+        existing_deployments = _get_existing_deployments()
+    with _port_scan_lock:
+        project_info["app_port"] = _select_free_port(preferred, existing_deployments, repository)
+        # A snapshot shared by a batch must show this port to the repositories after it
+        existing_deployments.append({"repository": repository, "port": project_info["app_port"]})
+    return None
+
+
+def _release_deployment_resources(repository: str) -> Dict[str, Any]:
+    """Handle {"action": "release_allocation"}: free the repository's port and priority"""
+    if not PORT_ALLOCATION_TABLE:
+        return {
+            "statusCode": 400,
+            "body": json.dumps({"error": "PORT_ALLOCATION_TABLE not configured"})
+        }
+
+    try:
+        released = port_allocator.release(_get_aws_client("dynamodb").Table(PORT_ALLOCATION_TABLE), repository)
+    except Exception as e:
+        print(f"❌ Error releasing allocation for {repository}: {e}")
+        return {
+            "statusCode": 500,
+            "body": json.dumps({"error": str(e), "repository": repository})
+        }
+
+    print(f"🔓 Released allocation for {repository}: {released}")
+    return {
+        "statusCode": 200,
+        "body": json.dumps({"repository": repository, "released": released})
+    }
+
+
+def _lookup_cached_analysis(
+    table_name: str,
+    repository: str,
+    commit_sha: str,
+    tree_sha: Optional[str] = None,
+    analysis_id: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Look up a previous analysis for the same commit (CommitIndex) or, when the
+    tree SHA is known, the same git tree (RepositoryIndex).
+    Cache errors are never fatal - a miss just means a full analysis.
+    """
+    try:
+        table = _get_aws_client("dynamodb").Table(table_name)
+        if tree_sha:
+            cached = analysis_cache.find_by_tree(table, repository, tree_sha, analysis_id)
+        else:
+            cached = analysis_cache.find_by_commit(table, repository, commit_sha, analysis_id)
+
+        if cached:
+            print(f"♻️ Cache hit: reusing analysis {cached['analysis_id']} "
+                  f"(commit {cached.get('commit_sha')}, tree {cached.get('tree_sha')})")
+        return cached
+
+    except Exception as e:
+        print(f"⚠️ Analysis cache lookup failed: {e}")
+        return None
+
+
+def _lookup_previous_analysis(table_name: str, repository: str) -> Optional[Dict[str, Any]]:
+    """Most recent reusable analysis of the repository (RepositoryIndex), None on any error"""
+    try:
+        return analysis_cache.find_latest(_get_aws_client("dynamodb").Table(table_name), repository)
+    except Exception as e:
+        print(f"⚠️ Previous analysis lookup failed: {e}")
+        return None
+
+
+def _messages_bytes(messages: List[Dict[str, str]]) -> int:
+    return sum(len(message["content"].encode("utf-8")) for message in messages)
+
+
 def _call_openai_api(
     base_url: str,
     api_key: str,
     model: str,
     messages: List[Dict[str, str]],
     temperature: float = 0.3,
-    response_format: Optional[Dict[str, str]] = None
+    response_format: Optional[Dict[str, str]] = None,
+    kind: str = "chat"
 ) -> str:
     """
     Call OpenAI API directly using requests (no pydantic dependency)
-    Returns the content of the first choice
+    Returns the content of the first choice.
+    kind groups calls of similar size for the latency-derived timeout.
     """
     endpoint = f"{base_url}/chat/completions"
 
@@ -133,24 +621,123 @@ def _call_openai_api(
 
     if response_format:
         payload["response_format"] = response_format
+    invocation = telemetry.current()
+    invocation.add(f"{kind}_prompt_bytes", _messages_bytes(messages))
 
-    try:
-        response = requests.post(
+    def send(timeout: tuple) -> str:
+        response = _get_http_session("openai").post(
             endpoint,
             headers=headers,
             json=payload,
-            timeout=900  # 15분
+            timeout=timeout
         )
         response.raise_for_status()
 
         data = response.json()
+        invocation.add_tokens(kind, data.get("usage"))
         return data["choices"][0]["message"]["content"]
 
-    except requests.exceptions.RequestException as e:
+    try:
+        content = _openai_guard.call(send, kind)
+        invocation.add(f"{kind}_response_bytes", len(content.encode("utf-8")))
+        return content
+
+    except (requests.exceptions.RequestException, llm_guard.CircuitOpenError) as e:
         print(f"Error calling OpenAI API: {e}")
         raise
 
 
+def _stream_openai_api(
+    base_url: str,
+    api_key: str,
+    model: str,
+    messages: List[Dict[str, str]],
+    temperature: float = 0.3,
+    on_chunk: Optional[Callable[[str], None]] = None,
+    kind: str = "chat"
+) -> str:
+    """
+    Call OpenAI chat completions with stream=True (server-sent events).
+    Each content delta is handed to on_chunk as it arrives; returns the full content.
+    kind names the call in the invocation's telemetry.
+    """
+    endpoint = f"{base_url}/chat/completions"
+
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "stream": True,
+        # Final chunk carries the token usage (empty choices)
+        "stream_options": {"include_usage": True}
+    }
+
+    parts = []
+    usage = {}
+    invocation = telemetry.current()
+    invocation.add(f"{kind}_prompt_bytes", _messages_bytes(messages))
+
+    def send(timeout: tuple) -> None:
+        # The read timeout bounds every gap between bytes; the first byte is the longest
+        started = time.monotonic()
+        with _get_http_session("openai").post(
+            endpoint,
+            headers=headers,
+            json=payload,
+            stream=True,
+            timeout=timeout
+        ) as response:
+            response.raise_for_status()
+            _openai_guard.record("stream_first_byte", time.monotonic() - started)
+
+            for raw_line in response.iter_lines():
+                line = raw_line.decode("utf-8") if isinstance(raw_line, bytes) else raw_line
+                if not line.startswith("data:"):
+                    continue
+
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+
+                chunk = json.loads(data)
+                if chunk.get("usage"):
+                    usage.update(chunk["usage"])
+                choices = chunk.get("choices") or []
+                delta = choices[0].get("delta", {}).get("content") if choices else None
+                if delta:
+                    parts.append(delta)
+                    if on_chunk:
+                        on_chunk(delta)
+
+    try:
+        # Once chunks were handed to on_chunk the request cannot be replayed, and a hedged
+        # second stream would interleave its chunks with the first one's
+        _openai_guard.call(
+            send, "stream_first_byte", observe=False,
+            retryable=lambda e: not parts and llm_guard.is_retryable(e), hedge=False
+        )
+        content = "".join(parts)
+        invocation.add(f"{kind}_response_bytes", len(content.encode("utf-8")))
+        if usage:
+            invocation.add_tokens(kind, usage)
+        else:
+            # Endpoints without stream_options support: estimate from the text
+            invocation.add_tokens(kind, {
+                "prompt_tokens": sum(estimate_tokens(m["content"]) for m in messages),
+                "completion_tokens": estimate_tokens(content),
+            }, estimated=True)
+        return content
+
+    except (requests.exceptions.RequestException, llm_guard.CircuitOpenError) as e:
+        print(f"Error streaming from OpenAI API: {e}")
+        raise
+
+
 def _analyze_project_with_gpt5(
     base_url: str,
     api_key: str,
@@ -158,11 +745,13 @@ def _analyze_project_with_gpt5(
     file_list: List[str],
     readme_content: str,
     file_samples: Optional[Dict[str, str]] = None,
-    existing_deployments: Optional[List[Dict]] = None
+    existing_deployments: Optional[List[Dict]] = None,
+    repository: str = ""
 ) -> Dict[str, Any]:
     """
     Use GPT-5 to intelligently analyze ANY project type.
     Returns comprehensive project information including language, framework, runtime, etc.
+    Answers to equivalent prompts are served from the LLM cache.
     """
 
     system_prompt = """You are an expert software architect and DevOps engineer with deep knowledge of:
@@ -184,27 +773,32 @@ Your task is to analyze a code repository and determine:
 
 Analyze the file structure, README, and any code samples provided. Return your analysis as a JSON object."""
 
-    # Prepare file structure summary
-    file_structure = "\n".join(file_list[:100])  # First 100 files
+    # Fit file structure, README and samples into the token budget (key files first)
+    summary = summarize_repository(
+        file_list, readme_content, file_samples, budget=ANALYSIS_PROMPT_TOKEN_BUDGET
+    )
+    print(f"🧮 Analysis prompt context: ~{sum(summary['tokens'].values())} tokens "
+          f"{summary['tokens']} ({summary['files_listed']}/{len(file_list)} files listed)")
 
     # Build user prompt with all available information
     user_prompt = f"""Analyze this repository and provide detailed project information.
 
 # File Structure
+Key files are listed individually; other directories may be collapsed as "dir/** (N files: top extensions)".
 ```
-{file_structure}
+{summary["file_structure"]}
 ```
 
 # README Content
 ```
-{readme_content[:3000] if readme_content else "No README available"}
+{summary["readme"] or "No README available"}
 ```
 """
 
-    if file_samples:
+    if summary["samples"]:
         user_prompt += "\n# Sample File Contents\n"
-        for filename, content in file_samples.items():
-            user_prompt += f"\n## {filename}\n```\n{content[:500]}\n```\n"
+        for filename, content in summary["samples"].items():
+            user_prompt += f"\n## {filename}\n```\n{content}\n```\n"
 
     # Add existing deployments context
     if existing_deployments and len(existing_deployments) > 0:
@@ -245,78 +839,61 @@ Return a JSON object with this structure:
 
 Only return the JSON object, nothing else."""
 
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+    response_format = {"type": "json_object"}
+    cache = _get_llm_cache()
+    cache_key = llm_cache.prompt_key(
+        "analysis", model, messages, repository, temperature=0.3, response_format=response_format
+    ) if cache else None
+
     try:
+        content = cache.get("analysis", cache_key, repository) if cache else None
+        if content is not None:
+            print(f"♻️ LLM cache hit (analysis {cache_key[:12]}), hit rate {cache.summary()['hit_rate']}")
+            telemetry.current().add("analysis_llm_cache_hits", 1)
+            return json.loads(content)
+
         content = _call_openai_api(
             base_url=base_url,
             api_key=api_key,
             model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
+            messages=messages,
             temperature=0.3,
-            response_format={"type": "json_object"}
+            response_format=response_format,
+            kind="analysis"
         )
 
         project_info = json.loads(content)
 
         print(f"GPT-5 Project Analysis: {json.dumps(project_info, indent=2)}")
+        # Low-confidence answers are not worth repeating for other repositories
+        if cache and project_info.get("confidence") != "low":
+            cache.put("analysis", cache_key, content, repository)
         return project_info
 
     except json.JSONDecodeError as e:
         print(f"Error parsing GPT-5 JSON response: {e}")
         # Fallback to basic detection
-        return _fallback_project_detection(file_list)
+        return _fallback_project_detection(file_list, file_samples)
     except Exception as e:
         print(f"Error calling GPT-5 for project analysis: {e}")
-        return _fallback_project_detection(file_list)
+        return _fallback_project_detection(file_list, file_samples)
 
 
-def _fallback_project_detection(files: List[str]) -> Dict[str, Any]:
-    """Fallback project detection using simple pattern matching"""
+def _fallback_project_detection(
+    files: List[str],
+    file_samples: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """Fallback project detection from manifests (no GPT)"""
 
     print("Using fallback project detection...")
 
-    project_info = {
-        "languages": [],
-        "primary_language": "Unknown",
-        "frameworks": [],
-        "primary_framework": None,
-        "build_tools": [],
-        "package_managers": [],
-        "runtime": "Unknown",
-        "app_type": "web-api",
-        "app_port": 8000,
-        "database_needed": False,
-        "database_type": "none",
-        "external_services": [],
-        "containerizable": True,
-        "deployment_complexity": "moderate",
-        "confidence": "low",
-        "notes": "Detected using fallback pattern matching"
-    }
-
-    # Basic pattern matching
-    file_patterns = {
-        "package.json": {"lang": "JavaScript", "runtime": "Node.js 20", "pkg_mgr": "npm"},
-        "requirements.txt": {"lang": "Python", "runtime": "Python 3.11", "pkg_mgr": "pip"},
-        "go.mod": {"lang": "Go", "runtime": "Go 1.21", "pkg_mgr": "go modules"},
-        "Cargo.toml": {"lang": "Rust", "runtime": "Rust 1.75", "pkg_mgr": "cargo"},
-        "pom.xml": {"lang": "Java", "runtime": "Java 17", "build": "Maven"},
-        "Gemfile": {"lang": "Ruby", "runtime": "Ruby 3.2", "pkg_mgr": "bundler"},
-    }
-
-    for file in files:
-        for pattern, info in file_patterns.items():
-            if pattern in file.lower():
-                if "lang" in info:
-                    project_info["primary_language"] = info["lang"]
-                    project_info["languages"].append(info["lang"])
-                if "runtime" in info:
-                    project_info["runtime"] = info["runtime"]
-                if "pkg_mgr" in info:
-                    project_info["package_managers"].append(info["pkg_mgr"])
-
+    project_info = detect_project(files, file_samples)
+    print(f"Fallback detection: {project_info['primary_language']} / {project_info['primary_framework']} "
+          f"(confidence {project_info['confidence']}, score {project_info['confidence_score']})")
     return project_info
 
 
@@ -325,60 +902,9 @@ def _remove_heredoc_from_dockerfile(dockerfile: str) -> str:
     Post-process Dockerfile to remove heredoc syntax (COPY << EOF).
     Converts heredoc patterns to RUN echo commands.
     """
-    import re
-
-    # Pattern to match COPY << heredoc blocks
-    # Matches: COPY [--chown=...] << or <<' or <<- with delimiter
-    heredoc_pattern = r'COPY\s+(?:--\w+=[^\s]+\s+)?<<-?[\'"]?(\w+)[\'"]?\s+([^\n]+)\n(.*?)^\1'
-
-    def replace_heredoc(match):
-        delimiter = match.group(1)
-        target_path = match.group(2).strip()
-        content = match.group(3)
-
-        # Split content into lines
-        lines = content.split('\n')
-
-        # Build RUN echo commands
-        echo_commands = []
-        for i, line in enumerate(lines):
-            # Escape special characters for shell
-            escaped_line = line.replace('\\', '\\\\').replace('"', '\\"').replace('$', '\\$').replace('`', '\\`')
-
-            if i == 0:
-                # First line: overwrite file
-                echo_commands.append(f'RUN echo "{escaped_line}" > {target_path}')
-            else:
-                # Subsequent lines: append to file
-                echo_commands.append(f'    echo "{escaped_line}" >> {target_path}')
-
-        # Add final continuation for multi-line commands
-        if len(echo_commands) > 1:
-            result = echo_commands[0] + ' && \\\n' + ' && \\\n'.join(echo_commands[1:])
-        else:
-            result = echo_commands[0] if echo_commands else ''
-
-        return result
-
-    # Apply regex replacement with MULTILINE and DOTALL flags
-    cleaned = re.sub(heredoc_pattern, replace_heredoc, dockerfile, flags=re.MULTILINE | re.DOTALL)
-
-    # Also check for RUN << heredoc (inline scripts)
-    run_heredoc_pattern = r'RUN\s+<<-?[\'"]?(\w+)[\'"]?\n(.*?)^\1'
-
-    def replace_run_heredoc(match):
-        delimiter = match.group(1)
-        script_content = match.group(2)
-
-        # Convert to RUN with && chained commands
-        lines = [l.strip() for l in script_content.split('\n') if l.strip()]
-        if lines:
-            return 'RUN ' + ' && \\\n    '.join(lines)
-        return ''
-
-    cleaned = re.sub(run_heredoc_pattern, replace_run_heredoc, cleaned, flags=re.MULTILINE | re.DOTALL)
-
-    return cleaned
+    parsed = parse_dockerfile(dockerfile)
+    convert_heredocs(parsed, {})
+    return parsed.render()
 
 
 def _detect_python_entrypoint(file_list: List[str]) -> str:
@@ -469,31 +995,14 @@ def _fix_dockerfile_syntax(dockerfile: str, project_info: Dict[str, Any], file_l
     Post-process Dockerfile to fix common AI-generated syntax errors.
     Fixes FROM statements with spaces, adds missing dependency installation, and fixes incorrect CMD statements.
     """
-    import re
+    return _apply_syntax_passes(parse_dockerfile(dockerfile), project_info, file_list)
+
 
-    lines = dockerfile.split('\n')
-    fixed_lines = []
+def _apply_syntax_passes(parsed: Dockerfile, project_info: Dict[str, Any], file_list: List[str] = None) -> str:
+    """Run SYNTAX_PASSES over an already parsed Dockerfile and render it"""
     detected_language = project_info.get('primary_language', '').lower()
     file_list = file_list or []
-
-    # Map common wrong patterns to correct image names
-    image_map = {
-        'python': 'python',
-        'node': 'node',
-        'node.js': 'node',
-        'nodejs': 'node',
-        'javascript': 'node',
-        'go': 'golang',
-        'golang': 'golang',
-        'ruby': 'ruby',
-        'java': 'openjdk',
-        'rust': 'rust'
-    }
-
-    corrections_made = []
-    has_npm_install = False
-    has_pip_install = False
-    last_copy_index = -1
+    dockerfile = parsed.render()
 
     # Detect correct entrypoint file
     python_entrypoint = _detect_python_entrypoint(file_list) if detected_language == 'python' else 'main.py'
@@ -506,219 +1015,35 @@ def _fix_dockerfile_syntax(dockerfile: str, project_info: Dict[str, Any], file_l
     if is_fastapi:
         print("🔍 Detected FastAPI project - will fix CMD to use uvicorn")
 
-    # First pass: detect if dependency installation exists and check for multi-stage build
-    in_final_stage = False
-    for i, line in enumerate(lines):
-        if re.search(r'npm\s+(install|ci)', line, re.IGNORECASE):
-            has_npm_install = True
-        if re.search(r'pip\s+install', line, re.IGNORECASE):
-            has_pip_install = True
-        if re.match(r'^\s*COPY\s+', line, re.IGNORECASE):
-            last_copy_index = i
-        # Track if we're in final stage of multi-stage build
-        if re.match(r'^FROM\s+\w+:\w+\s*$', line, re.IGNORECASE):  # FROM without AS means final stage
-            in_final_stage = True
-
-    in_build_stage = False
-    for i, line in enumerate(lines):
-        # Fix FROM statements with spaces like "FROM Python 3.11" or "FROM Node.js 20"
-        from_match = re.match(r'^FROM\s+([A-Za-z\.]+)\s+([0-9\.]+[a-z\-]*)\s*(AS\s+\w+)?', line, re.IGNORECASE)
-        if from_match:
-            image_name = from_match.group(1).lower().replace('.', '')
-            version = from_match.group(2)
-            as_clause = from_match.group(3) or ''
-
-            # Map to correct Docker Hub image name
-            correct_image = image_map.get(image_name, image_name)
-
-            # Reconstruct with colon syntax
-            fixed_line = f"FROM {correct_image}:{version}"
-            if as_clause:
-                fixed_line += f" {as_clause}"
-                in_build_stage = True
-            else:
-                in_build_stage = False  # Final stage
-
-            corrections_made.append(f"FROM {from_match.group(1)} {version} → FROM {correct_image}:{version}")
-            fixed_lines.append(fixed_line)
-            continue
-
-        # Remove useradd lines (they cause UID conflicts in base images)
-        if re.match(r'^\s*RUN\s+useradd', line, re.IGNORECASE):
-            corrections_made.append(f"Removed conflicting useradd: {line.strip()}")
-            continue
-
-        # Remove USER appuser lines (rely on base image default user instead)
-        if re.match(r'^\s*USER\s+appuser', line, re.IGNORECASE):
-            corrections_made.append(f"Removed USER appuser: {line.strip()}")
-            continue
-
-        # Fix CMD statements with wrong filenames
-        cmd_match = re.match(r'^CMD\s+\[', line)
-        if cmd_match and detected_language:
-            # Special handling for FastAPI projects - use uvicorn instead of python
-            if is_fastapi and detected_language == 'python':
-                # Check if CMD is using python instead of uvicorn
-                if 'python' in line.lower() and 'uvicorn' not in line.lower():
-                    # Use the detected Python entrypoint from file_list
-                    module_name = python_entrypoint.replace('.py', '')
-                    # Use shell form to allow env expansion for PORT
-                    # Note: Do NOT use --root-path since ALB forwards full path (doesn't strip prefix)
-                    fixed_line = (
-                        'CMD ["/bin/sh", "-lc", '
-                        '"uvicorn %s:app --host 0.0.0.0 --port ${PORT:-8000}"]'
-                    ) % module_name
-                    corrections_made.append(f"Fixed FastAPI CMD: {line.strip()} → {fixed_line} (using detected entrypoint: {python_entrypoint})")
-                    fixed_lines.append(fixed_line)
-                    print(f"✅ Fixed FastAPI CMD to use detected entrypoint: {python_entrypoint} → {module_name}:app")
-                    continue
-
-            # Fix Python CMD with wrong filename
-            if detected_language == 'python' and ('app.py' in line or 'main.py' in line or 'server.py' in line):
-                # Extract current filename from CMD
-                filename_match = re.search(r'"([^"]*\.py)"', line)
-                if filename_match:
-                    current_file = filename_match.group(1)
-                    # If the current file is not the detected entrypoint, fix it
-                    if current_file != python_entrypoint:
-                        fixed_line = line.replace(current_file, python_entrypoint)
-                        corrections_made.append(f"Fixed Python entrypoint: {current_file} → {python_entrypoint}")
-                        fixed_lines.append(fixed_line)
-                        continue
-
-            # Fix Node.js CMD with wrong filename
-            elif detected_language in ['javascript', 'node', 'nodejs'] and ('index.js' in line or 'server.js' in line or 'app.js' in line):
-                filename_match = re.search(r'"([^"]*\.(?:js|ts))"', line)
-                if filename_match:
-                    current_file = filename_match.group(1)
-                    if current_file != node_entrypoint:
-                        fixed_line = line.replace(current_file, node_entrypoint)
-                        corrections_made.append(f"Fixed Node.js entrypoint: {current_file} → {node_entrypoint}")
-                        fixed_lines.append(fixed_line)
-                        continue
-
-            # Check if CMD uses wrong language command
-            if detected_language in ['javascript', 'node', 'nodejs'] and 'python' in line.lower():
-                # Fix Python CMD for Node.js project
-                fixed_line = f'CMD ["node", "{node_entrypoint}"]'
-                corrections_made.append(f"Fixed CMD: {line.strip()} → {fixed_line}")
-                fixed_lines.append(fixed_line)
-                continue
-            elif detected_language == 'python' and 'node' in line.lower():
-                # Fix Node CMD for Python project
-                fixed_line = f'CMD ["python", "{python_entrypoint}"]'
-                corrections_made.append(f"Fixed CMD: {line.strip()} → {fixed_line}")
-                fixed_lines.append(fixed_line)
-                continue
-
-        fixed_lines.append(line)
-
-        # Insert dependency installation after COPY if missing
-        # For Python projects: add pip install after COPY requirements.txt or COPY . . or COPY --from
-        if detected_language == 'python':
-            # Detect if this is a COPY line in the final (non-build) stage
-            is_copy_from_base = re.match(r'^\s*COPY\s+--from=', line, re.IGNORECASE)
-
-            # Check for COPY --from=base in final stage (multi-stage build)
-            if is_copy_from_base and not in_build_stage:
-                # In final stage of multi-stage build, we need to install dependencies
-                # because site-packages are not in /app directory
-                if any('requirements.txt' in f for f in file_list):
-                    # Look ahead to see if pip install is coming
-                    has_pip_next = False
-                    for j in range(i + 1, min(i + 5, len(lines))):  # Check next 5 lines
-                        if re.search(r'pip\s+install', lines[j], re.IGNORECASE):
-                            has_pip_next = True
-                            break
-
-                    if not has_pip_next:
-                        fixed_lines.append("RUN pip install --no-cache-dir -r requirements.txt")
-                        corrections_made.append("Added missing: RUN pip install --no-cache-dir -r requirements.txt (final stage)")
-
-            # Check for COPY requirements.txt in any stage
-            elif re.search(r'requirements\.txt', line, re.IGNORECASE) and re.match(r'^\s*COPY', line, re.IGNORECASE):
-                # Next line should be pip install
-                next_line_idx = i + 1
-                if next_line_idx < len(lines):
-                    next_line = lines[next_line_idx]
-                    if not re.search(r'pip\s+install', next_line, re.IGNORECASE):
-                        fixed_lines.append("RUN pip install --no-cache-dir -r requirements.txt")
-                        corrections_made.append("Added missing: RUN pip install --no-cache-dir -r requirements.txt")
-
-            # Check for COPY . . without --from (single stage build)
-            elif re.match(r'^\s*COPY\s+\.\s+\.\s*$', line, re.IGNORECASE) and not in_build_stage:
-                # In single-stage build or final stage, add pip install
-                if any('requirements.txt' in f for f in file_list):
-                    # Look ahead to see if pip install is coming
-                    has_pip_next = False
-                    for j in range(i + 1, min(i + 5, len(lines))):  # Check next 5 lines
-                        if re.search(r'pip\s+install', lines[j], re.IGNORECASE):
-                            has_pip_next = True
-                            break
-
-                    if not has_pip_next:
-                        fixed_lines.append("RUN pip install --no-cache-dir -r requirements.txt")
-                        corrections_made.append("Added missing: RUN pip install --no-cache-dir -r requirements.txt (single-stage)")
-
-        # For Node.js projects: add npm install after COPY package*.json or COPY . . or COPY --from
-        if detected_language in ['javascript', 'node', 'nodejs'] and not has_npm_install:
-            # Check for package.json in COPY line
-            if re.search(r'package.*\.json', line, re.IGNORECASE) and re.match(r'^\s*COPY', line, re.IGNORECASE):
-                # Next line should be npm install
-                next_line_idx = i + 1
-                if next_line_idx < len(lines):
-                    next_line = lines[next_line_idx]
-                    if not re.search(r'npm\s+(install|ci)', next_line, re.IGNORECASE):
-                        fixed_lines.append("RUN npm install --production")
-                        corrections_made.append("Added missing: RUN npm install --production")
-                        has_npm_install = True
-            # Check for COPY --from=base or COPY . . in multi-stage builds
-            elif re.match(r'^\s*COPY\s+(--from=\w+\s+)?.*\s+\.\s*$', line, re.IGNORECASE):
-                # After copying everything, check if we need to install dependencies
-                # Check if package.json exists in file_list
-                if any('package.json' in f for f in file_list):
-                    # Look ahead to see if npm install is coming
-                    has_npm_next = False
-                    for j in range(i + 1, min(i + 5, len(lines))):  # Check next 5 lines
-                        if re.search(r'npm\s+(install|ci)', lines[j], re.IGNORECASE):
-                            has_npm_next = True
-                            break
-
-                    if not has_npm_next:
-                        fixed_lines.append("RUN npm install --production")
-                        corrections_made.append("Added missing: RUN npm install --production (multi-stage)")
-                        has_npm_install = True
+    corrections_made = run_passes(parsed, SYNTAX_PASSES, {
+        "language": detected_language,
+        "file_list": file_list,
+        "python_entrypoint": python_entrypoint,
+        "node_entrypoint": node_entrypoint,
+        "is_fastapi": is_fastapi,
+    })
 
     if corrections_made:
         print("🔧 Dockerfile syntax corrections applied:")
         for correction in corrections_made:
             print(f"  - {correction}")
 
-    # Join and apply final hygiene passes
-    result = '\n'.join(fixed_lines)
+    return parsed.render()
 
-    # Make pip install tolerant if requirements.txt is absent
-    try:
-        import re as _re
-        result = _re.sub(
-            r"RUN\s+pip\s+install\s+--no-cache-dir\s+-r\s+requirements\.txt\b",
-            "RUN test -f requirements.txt && pip install --no-cache-dir -r requirements.txt || true",
-            result,
-            flags=_re.IGNORECASE,
-        )
-    except Exception:
-        pass
 
-    # Remove Dockerfile-level HEALTHCHECK lines that rely on curl (not always present)
-    try:
-        result = '\n'.join(
-            line for line in result.splitlines()
-            if not line.strip().upper().startswith('HEALTHCHECK')
-        )
-    except Exception:
-        pass
+def _postprocess_dockerfile(dockerfile: str, project_info: Dict[str, Any], file_list: List[str]) -> str:
+    """Remove heredoc syntax, then fix FROM/CMD and dependency install issues (one parse)"""
+    with telemetry.current().span("postprocess"):
+        parsed = parse_dockerfile(dockerfile)
 
-    return result
+        # Check if any heredoc was found and removed
+        if convert_heredocs(parsed, {}):
+            print("⚠️ WARNING: Heredoc syntax detected and removed from Dockerfile")
+        else:
+            print("✓ Dockerfile clean - no heredoc syntax detected")
+
+        # POST-PROCESSING: Fix FROM and CMD syntax errors
+        return _apply_syntax_passes(parsed, project_info, file_list)
 
 
 def _generate_deployment_specs(
@@ -727,12 +1052,26 @@ def _generate_deployment_specs(
     model: str,
     project_info: Dict[str, Any],
     readme_content: str,
-    file_list: List[str]
+    file_list: List[str],
+    on_section: Optional[Callable[[str, str], None]] = None,
+    metrics: Optional[Dict[str, Any]] = None,
+    repository: str = "",
+    sections: Optional[List[str]] = None
 ) -> Dict[str, str]:
     """
     Generate deployment specifications for ANY project type using GPT-5.
     Returns Dockerfile, Terraform, AppSpec, BuildSpec, and recommendations.
+
+    In streaming mode, on_section(spec_name, content) is called for every
+    non-Dockerfile section as soon as it is complete, and stream latencies
+    are written into metrics. On an LLM cache hit nothing is streamed; the
+    caller uploads every section at the end as usual.
+
+    sections (spec names) limits generation to those specs, for an
+    incremental re-analysis; only they are returned.
     """
+    requested = [name for name in SPEC_SECTIONS.values() if sections is None or name in sections]
+    delimiters = {name: delimiter for delimiter, name in SPEC_SECTIONS.items()}
 
     system_prompt = """You are an expert DevOps engineer specialized in cloud deployments and infrastructure as code.
 
@@ -753,6 +1092,14 @@ Requirements for ALL specifications:
 
 Use the project information provided to customize each specification appropriately."""
 
+    summary = summarize_repository(
+        file_list, readme_content, budget=SPEC_PROMPT_TOKEN_BUDGET,
+        weights={"structure": 0.6, "readme": 0.4}
+    )
+
+    # The allocated port differs per repository: it is written as a placeholder here and
+    # filled in below, so the LLM cache key leaves it out
+    app_port = project_info.get("app_port", 8000)
     user_prompt = f"""Generate complete deployment specifications for this project:
 
 # Project Analysis
@@ -761,19 +1108,19 @@ Use the project information provided to customize each specification appropriate
 - **Frameworks**: {', '.join(project_info.get('frameworks', ['None']))}
 - **Runtime**: {project_info.get('runtime', 'Unknown')}
 - **App Type**: {project_info.get('app_type', 'web-api')}
-- **App Port**: {project_info.get('app_port', 8000)}
+- **App Port**: {llm_cache.PORT_PLACEHOLDER}
 - **Package Managers**: {', '.join(project_info.get('package_managers', ['Unknown']))}
 - **Database**: {project_info.get('database_type', 'none')}
 - **Complexity**: {project_info.get('deployment_complexity', 'moderate')}
 
 # README Content
 ```
-{readme_content[:2000] if readme_content else "No README available"}
+{summary["readme"] or "No README available"}
 ```
 
-# File Structure (sample)
+# File Structure (key files, large directories collapsed)
 ```
-{chr(10).join(file_list[:50])}
+{summary["file_structure"]}
 ```
 
 Generate COMPLETE specifications. Each file should be production-ready and fully functional.
@@ -781,7 +1128,7 @@ Generate COMPLETE specifications. Each file should be production-ready and fully
 **IMPORTANT**:
 - For ECS Fargate, assume VPC, ALB, ECR repository already exist
 - Use appropriate CPU/memory based on app complexity (256/512 for simple, 512/1024 for moderate, 1024/2048 for complex)
-- Container port should be {project_info.get('app_port', 8000)}
+- Container port should be {llm_cache.PORT_PLACEHOLDER}
 - Include health check endpoint at /health
 - Use Blue-Green deployment strategy with CodeDeploy
 - Generate appropriate build commands for the detected language/framework
@@ -854,100 +1201,139 @@ Generate COMPLETE specifications. Each file should be production-ready and fully
       echo "exec \\"$@\\"" >> /entrypoint.sh && \\
       chmod +x /entrypoint.sh
 
-Return your response in this format:
-
----DOCKERFILE---
-[Complete Dockerfile content]
-
----TERRAFORM---
-[Complete Terraform ECS configuration]
+{_spec_response_format(requested)}"""
 
----APPSPEC---
-[Complete AppSpec YAML]
-
----BUILDSPEC---
-[Complete BuildSpec YAML]
-
----RECOMMENDATIONS---
-[Deployment recommendations in markdown]
-"""
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt.replace(llm_cache.PORT_PLACEHOLDER, str(app_port))}
+    ]
+    # raw Dockerfile section -> post-processing future (streaming mode only)
+    dockerfile_jobs = {}
+    postprocess_pool = ThreadPoolExecutor(max_workers=1)
+    cache = _get_llm_cache()
+    cache_key = llm_cache.prompt_key(
+        "specs", model, [messages[0], {"role": "user", "content": user_prompt}], repository, temperature=0.3
+    ) if cache else None
 
     try:
+        content = cache.get("specs", cache_key, repository, app_port) if cache else None
+        cache_hit = content is not None
+        if cache_hit:
+            print(f"♻️ LLM cache hit (specs {cache_key[:12]}), hit rate {cache.summary()['hit_rate']}")
+            telemetry.current().add("specs_llm_cache_hits", 1)
+            if metrics is not None:
+                metrics["llm_cache_hit"] = True
         # Use GPT-5 to generate all deployment specs (with heredoc prohibition)
-        content = _call_openai_api(
-            base_url=base_url,
-            api_key=api_key,
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.3
-        )
+        elif OPENAI_STREAMING:
+            def handle_section(spec_name: str, section: str) -> None:
+                # Dockerfile is post-processed while the rest is still generating;
+                # other sections go straight to the caller (e.g. S3 upload)
+                if spec_name == "dockerfile":
+                    dockerfile_jobs[section] = postprocess_pool.submit(
+                        telemetry.carry(_postprocess_dockerfile), section, project_info, file_list
+                    )
+                elif on_section:
+                    on_section(spec_name, section)
+
+            stream = SpecSectionStream(on_section=handle_section)
+            _stream_openai_api(
+                base_url=base_url,
+                api_key=api_key,
+                model=model,
+                messages=messages,
+                temperature=0.3,
+                on_chunk=stream.feed,
+                kind="specs"
+            )
+            content = stream.close()
+
+            stream_metrics = stream.metrics()
+            print(f"⏱️ Spec stream: first byte {stream_metrics['first_byte_ms']} ms, "
+                  f"total {stream_metrics['total_ms']} ms, sections {stream_metrics['sections_ms']}")
+            if metrics is not None:
+                metrics.update(stream_metrics)
+        else:
+            content = _call_openai_api(
+                base_url=base_url,
+                api_key=api_key,
+                model=model,
+                messages=messages,
+                temperature=0.3,
+                kind="specs"
+            )
 
         # Parse the delimited response
-        specs = {
-            "dockerfile": _extract_section(content, "DOCKERFILE"),
-            "terraform_ecs": _extract_section(content, "TERRAFORM"),
-            "appspec": _extract_section(content, "APPSPEC"),
-            "buildspec": _extract_section(content, "BUILDSPEC"),
-            "recommendations": _extract_section(content, "RECOMMENDATIONS")
-        }
+        specs = {name: _extract_section(content, delimiters[name]) for name in requested}
 
         # If parsing failed, try code block extraction as fallback
-        if not specs["dockerfile"]:
+        if specs.get("dockerfile") == "":
             specs["dockerfile"] = _extract_code_block(content, "dockerfile") or _extract_code_block(content, "docker")
-        if not specs["terraform_ecs"]:
+        if specs.get("terraform_ecs") == "":
             specs["terraform_ecs"] = _extract_code_block(content, "terraform") or _extract_code_block(content, "hcl")
-        if not specs["appspec"]:
+        if specs.get("appspec") == "":
             specs["appspec"] = _extract_code_block(content, "yaml", "appspec")
-        if not specs["buildspec"]:
+        if specs.get("buildspec") == "":
             specs["buildspec"] = _extract_code_block(content, "yaml", "buildspec")
 
         # Store full response as recommendations if not extracted
-        if not specs["recommendations"]:
+        if specs.get("recommendations") == "":
             specs["recommendations"] = content
 
-        # POST-PROCESSING: Remove heredoc syntax from Dockerfile
-        if specs["dockerfile"]:
-            original_dockerfile = specs["dockerfile"]
-            cleaned_dockerfile = _remove_heredoc_from_dockerfile(original_dockerfile)
+        if cache and specs[requested[0]] and not cache_hit:
+            cache.put("specs", cache_key, content, repository, app_port)
 
-            # Check if any heredoc was found and removed
-            if cleaned_dockerfile != original_dockerfile:
-                print("⚠️ WARNING: Heredoc syntax detected and removed from Dockerfile")
-                specs["dockerfile"] = cleaned_dockerfile
+        # POST-PROCESSING: heredoc removal + syntax fixes (already running if streamed)
+        if specs.get("dockerfile"):
+            streamed_job = dockerfile_jobs.get(specs["dockerfile"])
+            if streamed_job:
+                specs["dockerfile"] = streamed_job.result()
             else:
-                print("✓ Dockerfile clean - no heredoc syntax detected")
-
-            # POST-PROCESSING: Fix FROM and CMD syntax errors
-            syntax_fixed_dockerfile = _fix_dockerfile_syntax(specs["dockerfile"], project_info, file_list)
-            specs["dockerfile"] = syntax_fixed_dockerfile
+                specs["dockerfile"] = _postprocess_dockerfile(specs["dockerfile"], project_info, file_list)
 
         print(f"Generated specs: {list(specs.keys())}")
         return specs
 
     except Exception as e:
         print(f"Error generating deployment specs: {e}")
-        return _generate_fallback_specs(project_info)
-
-
-def _extract_section(content: str, delimiter: str) -> str:
-    """Extract content between ---DELIMITER--- markers"""
-    start_marker = f"---{delimiter}---"
-    end_marker = "---"
+        if metrics is not None:
+            metrics["fallback_specs"] = True
+        fallback_specs = _generate_fallback_specs(project_info)
+        return {name: fallback_specs[name] for name in requested}
+
+    finally:
+        postprocess_pool.shutdown(wait=False)
+
+
+# Placeholder shown under each delimiter in the spec prompt's response format
+_SPEC_FORMAT_HINTS = {
+    "dockerfile": "[Complete Dockerfile content]",
+    "terraform_ecs": "[Complete Terraform ECS configuration]",
+    "appspec": "[Complete AppSpec YAML]",
+    "buildspec": "[Complete BuildSpec YAML]",
+    "recommendations": "[Deployment recommendations in markdown]",
+}
 
-    start_idx = content.find(start_marker)
-    if start_idx == -1:
-        return ""
 
-    start_idx += len(start_marker)
-    end_idx = content.find(end_marker, start_idx)
+def _spec_response_format(spec_names: List[str]) -> str:
+    """The "Return your response in this format" block for the requested specs"""
+    delimiters = {name: delimiter for delimiter, name in SPEC_SECTIONS.items()}
+    lines = []
+    if len(spec_names) < len(SPEC_SECTIONS):
+        # Incremental re-analysis: the other specs are kept from the previous analysis
+        lines += [
+            "**INCREMENTAL UPDATE**: generate ONLY the sections listed below; "
+            "the other specifications are unchanged and must not be included.",
+            "",
+        ]
+    lines.append("Return your response in this format:")
+    for name in spec_names:
+        lines += ["", f"---{delimiters[name]}---", _SPEC_FORMAT_HINTS[name]]
+    return "\n".join(lines) + "\n"
 
-    if end_idx == -1:
-        return content[start_idx:].strip()
 
-    return content[start_idx:end_idx].strip()
+def _extract_section(content: str, delimiter: str) -> str:
+    """Extract content between ---DELIMITER--- markers"""
+    return extract_section(content, delimiter)
 
 
 def _extract_code_block(content: str, language: str, context: str = "") -> str:
@@ -974,26 +1360,6 @@ def _extract_code_block(content: str, language: str, context: str = "") -> str:
     return content[start_idx:end_idx].strip()
 
 
-def _get_cpu_from_complexity(complexity: str) -> int:
-    """프로젝트 복잡도에 따라 CPU 할당"""
-    mapping = {
-        "simple": 256,
-        "moderate": 512,
-        "complex": 1024
-    }
-    return mapping.get(complexity, 512)
-
-
-def _get_memory_from_complexity(complexity: str) -> int:
-    """프로젝트 복잡도에 따라 메모리 할당"""
-    mapping = {
-        "simple": 512,
-        "moderate": 1024,
-        "complex": 2048
-    }
-    return mapping.get(complexity, 1024)
-
-
 def _get_build_command(project_info: Dict[str, Any]) -> str:
     """언어/프레임워크에 따라 빌드 명령어 결정"""
     primary_lang = project_info.get("primary_language", "").lower()
@@ -1087,8 +1453,7 @@ def _generate_terraform_tfvars(
 ) -> str:
     """Terraform에서 사용할 tfvars 파일 생성"""
 
-    cpu = _get_cpu_from_complexity(project_info.get("deployment_complexity", "moderate"))
-    memory = _get_memory_from_complexity(project_info.get("deployment_complexity", "moderate"))
+    task_size = get_task_size(project_info)
     port = project_info.get("app_port", 8000)
 
     tfvars = f"""# Generated by AI Analyzer: {analysis_id}
@@ -1097,8 +1462,9 @@ def _generate_terraform_tfvars(
 # Container Configuration
 image_tag = "{image_tag}"
 container_port = {port}
-cpu = {cpu}
-memory = {memory}
+# Task size: {task_sizing.describe(project_info.get("task_size"))}
+cpu = {task_size["cpu"]}
+memory = {task_size["memory"]}
 
 # Scaling Configuration
 desired_count = 2
@@ -1125,6 +1491,10 @@ database_enabled = {str(project_info.get('database_needed', False)).lower()}
 database_engine = "{project_info.get('database_type', 'none')}"
 """
 
+    # Reserved by the port allocator; without it user-apps.tf derives one from the app name
+    if project_info.get("listener_priority"):
+        tfvars += f"\n# ALB\nuser_app_listener_priority = {project_info['listener_priority']}\n"
+
     return tfvars
 
 
@@ -1135,14 +1505,10 @@ def _generate_fallback_specs(project_info: Dict[str, Any]) -> Dict[str, str]:
     port = project_info.get('app_port', 8000)
 
     # Basic Dockerfile
-    dockerfile = f"""# Multi-stage build
-FROM {runtime} AS base
+    # (single stage: a stage that only copies the source adds a layer and nothing else)
+    dockerfile = f"""FROM {runtime}
 WORKDIR /app
 COPY . .
-
-FROM {runtime}
-WORKDIR /app
-COPY --from=base /app .
 RUN useradd -m -u 1000 appuser
 USER appuser
 EXPOSE {port}
@@ -1194,10 +1560,19 @@ def _store_analysis_results(
     commit_sha: str,
     project_info: Dict,
     specs: Dict,
-    recommendation: str
-) -> None:
-    """Store analysis results in DynamoDB"""
-    table = dynamodb.Table(table_name)
+    recommendation: str,
+    spec_urls: Optional[Dict[str, str]] = None,
+    tree_sha: Optional[str] = None,
+    cached_from: Optional[str] = None,
+    s3_bucket: Optional[str] = None,
+    deployment_shape: Optional[Dict[str, Any]] = None
+) -> bool:
+    """
+    Store analysis results in DynamoDB. Specs stay inline when small and are
+    otherwise stored compressed, in the item or (given s3_bucket) in S3.
+    Returns False when the item could not be written.
+    """
+    table = _get_aws_client("dynamodb").Table(table_name)
 
     item = {
         "analysis_id": analysis_id,
@@ -1205,95 +1580,260 @@ def _store_analysis_results(
         "repository": repository,
         "commit_sha": commit_sha,
         "project_info": json.dumps(project_info),
-        "specs": json.dumps(specs),
+        "spec_urls": json.dumps(spec_urls or {}),
         "recommendation": recommendation,
         "ttl": int(datetime.now(timezone.utc).timestamp()) + 2592000  # 30 days
     }
-
+    if tree_sha:
+        item["tree_sha"] = tree_sha
+    if cached_from:
+        item["cached_from"] = cached_from
+    if deployment_shape:
+        # Baseline for the next incremental re-analysis of this repository
+        item["deployment_shape"] = json.dumps(deployment_shape)
+
+    invocation = telemetry.current()
     try:
+        item = result_store.pack_item(
+            item, {"specs": specs}, _get_aws_client("s3") if s3_bucket else None, s3_bucket
+        )
+        invocation.add("stored_item_bytes", result_store.item_size(item))
         table.put_item(Item=item)
         print(f"✅ Stored analysis results: {analysis_id}")
+        return True
     except Exception as e:
-        print(f"❌ Error storing analysis results: {e}")
+        # Not fatal for this run (specs are already in S3), but the result is not reusable
+        print(f"❌ Error storing analysis results for {analysis_id} ({type(e).__name__}): {e}")
+        invocation.add("store_failures", 1)
+        return False
 
 
-def _upload_specs_to_s3(bucket: str, analysis_id: str, specs: Dict) -> Dict[str, str]:
-    """Upload generated specs to S3 and return URLs"""
-    urls = {}
+def _upload_spec_to_s3(bucket: str, analysis_id: str, spec_name: str, content: str) -> Optional[str]:
+    """Upload a single spec to S3 (skipped if unchanged) and return its URL (None on failure)"""
+    key = spec_store.spec_key(analysis_id, spec_name)
+    invocation = telemetry.current()
 
-    for spec_name, content in specs.items():
-        if not content:
-            continue
+    try:
+        # Runs on the upload pool while generation continues, so it overlaps the generate span
+        with invocation.span("early_upload"):
+            uploaded = spec_store.put_if_changed(_get_aws_client("s3"), bucket, key, content.encode("utf-8"))
+        if uploaded:
+            print(f"✅ Uploaded {spec_name} to S3")
+            invocation.add("early_uploads", 1)
+        return f"s3://{bucket}/{key}"
+    except Exception as e:
+        print(f"❌ Error uploading {spec_name}: {e}")
+        return None
 
-        key = f"analysis/{analysis_id}/{spec_name}"
 
-        try:
-            s3.put_object(
-                Bucket=bucket,
-                Key=key,
-                Body=content.encode("utf-8"),
-                ContentType="text/plain"
-            )
-            urls[spec_name] = f"s3://{bucket}/{key}"
-            print(f"✅ Uploaded {spec_name} to S3")
-        except Exception as e:
-            print(f"❌ Error uploading {spec_name}: {e}")
+def _upload_specs_to_s3(
+    bucket: str,
+    analysis_id: str,
+    specs: Dict,
+    uploaded: Optional[Dict[str, tuple]] = None
+) -> Dict[str, str]:
+    """
+    Upload generated specs to S3 concurrently and return URLs.
+    uploaded maps spec_name -> (content, url) for specs already published
+    while streaming; they are skipped when the final content is unchanged.
+    The Dockerfile goes last since GitHub Actions polls it for completion.
+    """
+    published = {name: content for name, (content, url) in (uploaded or {}).items() if url}
 
-    return urls
+    return spec_store.publish_specs(
+        _get_aws_client("s3"), bucket, analysis_id, specs,
+        published=published,
+        bundle=SPEC_BUNDLE_ENABLED,
+        max_workers=SPEC_PUBLISH_WORKERS
+    )
 
 
-def lambda_handler(event, context):
-    """
-    Main Lambda handler for AI Code Analyzer
+def _determine_recommendation(project_info: Dict[str, Any], specs: Dict[str, str]) -> tuple[str, str]:
+    """Map detection confidence to a deployment recommendation"""
+    confidence = project_info.get("confidence", "medium")
+    has_dockerfile = bool(specs.get("dockerfile"))
 
-    Analyzes ANY project type and generates deployment specifications.
+    if confidence == "high" and has_dockerfile:
+        recommendation = "auto-apply"
+        recommendation_text = f"✅ High confidence detection: {project_info.get('primary_language')} with {project_info.get('primary_framework', 'standard')} framework. Ready for deployment."
+    elif confidence == "medium":
+        recommendation = "review-recommended"
+        recommendation_text = f"⚠️ Medium confidence detection. Please review generated specs before deployment."
+    else:
+        recommendation = "manual-review"
+        recommendation_text = f"🔍 Low confidence or unknown project type. Manual review required."
 
-    Event format:
-    {
-        "repository": "owner/repo",
-        "commit_sha": "abc123",
-        "branch": "main",
-        "pusher": "username",
-        "timestamp": "2025-01-01T00:00:00Z",
-        "file_list": ["file1.py", "file2.js", ...],  # Optional
-        "readme_content": "...",  # Optional
-        "file_samples": {"main.py": "content..."}  # Optional
+    return recommendation, recommendation_text
+
+
+def _build_analysis_result(
+    analysis_id: str,
+    repository: str,
+    commit_sha: str,
+    branch: str,
+    s3_bucket: str,
+    project_info: Dict[str, Any],
+    specs: Dict[str, str],
+    spec_urls: Dict[str, str],
+    recommendation: str,
+    recommendation_text: str
+) -> Dict[str, Any]:
+    """Prepare response for GitHub Actions"""
+    return {
+        "analysis_id": analysis_id,
+        "repository": repository,
+        "commit_sha": commit_sha,
+        "branch": branch,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "project_info": project_info,
+        "recommendation": recommendation,
+        "recommendation_text": recommendation_text,
+        "spec_urls": spec_urls,
+        "specs_generated": list(specs.keys()),
+
+        # GitHub Actions가 바로 사용할 수 있는 정보
+        "deployment_config": {
+            **get_task_size(project_info),
+            "port": project_info.get("app_port", 8000),
+            "runtime": project_info.get("runtime", "python:3.11-slim"),
+            "build_command": _get_build_command(project_info),
+            "start_command": _get_start_command(project_info)
+        },
+
+        # S3에서 다운로드할 파일 경로
+        "download_urls": {
+            "dockerfile": f"s3://{s3_bucket}/analysis/{analysis_id}/dockerfile",
+            "terraform_vars": f"s3://{s3_bucket}/analysis/{analysis_id}/terraform.tfvars",
+            "appspec": f"s3://{s3_bucket}/analysis/{analysis_id}/appspec.yaml"
+        },
+
+        "status": "success"
     }
-    """
-    print("🌸 AI Code Analyzer invoked")
-    print(f"Event: {json.dumps(event, default=str)}")
 
-    # Use direct OpenAI API instead of letsur endpoint
-    # Get OpenAI API key from SSM Parameter Store
-    try:
-        ssm = boto3.client('ssm', region_name='ap-northeast-2')
-        response = ssm.get_parameter(Name='/delightful-deploy/openai-api-key', WithDecryption=True)
-        api_key = response['Parameter']['Value']
-    except Exception as e:
-        print(f"❌ ERROR: Failed to get OpenAI API key from SSM: {e}")
-        api_key = None
 
-    if not api_key:
-        print("❌ ERROR: OpenAI API key not configured")
-        return {
-            "statusCode": 500,
-            "body": json.dumps({"error": "API key not configured"})
+def _render_dockerignore(
+    project_info: Dict[str, Any],
+    specs: Dict[str, str],
+    context: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """
+    Write specs["dockerignore"] for specs["dockerfile"] and the analyzed tree in
+    context; returns its build-context savings (None when nothing was generated)
+    """
+    if not (specs.get("dockerfile") and DOCKERIGNORE_ENABLED):
+        return None
+    invocation = telemetry.current()
+    with invocation.span("dockerignore"):
+        specs["dockerignore"] = generate_dockerignore(
+            project_info, context["file_list"], specs["dockerfile"], context["file_samples"]
+        )
+        build_context = estimate_context_savings(
+            specs["dockerignore"], context["file_list"], context["file_sizes"], context["repo_stats"]
+        )
+    saved = build_context["excluded_bytes"]
+    print(f"🙈 .dockerignore: {build_context['excluded_files']}/{build_context['total_files']} files out of "
+          f"the build context" + (f", ~{saved // 1024} KiB saved" if saved is not None else ""))
+    if saved is not None:
+        invocation.add("context_saved_bytes", saved)
+    return build_context
+
+
+def _serve_cached_analysis(
+    cached: Dict[str, Any],
+    ai_analysis_table: str,
+    s3_bucket: str,
+    analysis_id: str,
+    repository: str,
+    commit_sha: str,
+    branch: str,
+    tree_sha: Optional[str] = None,
+    deployment_shape: Optional[Dict[str, Any]] = None,
+    task_size: Optional[Dict[str, Any]] = None,
+    context: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Build the handler response from a cached analysis.
+    Specs are re-published under the current analysis_id only when it differs
+    from the cached one (GitHub Actions polls analysis/{analysis_id}/dockerfile).
+    task_size, observed since the analysis was cached, replaces the cached one.
+    With the current tree's files (context), the .dockerignore and its
+    build-context savings are rendered for this tree rather than reused;
+    without them the response carries no build_context.
+    """
+    project_info = dict(cached["project_info"])
+    specs = dict(analysis_cache.load_specs(cached, _get_aws_client("s3")))
+    spec_urls = cached["spec_urls"]
+    rerender_tfvars = cached["analysis_id"] != analysis_id
+
+    # The reservation may have been released (teardown) since the analysis was cached
+    if PORT_ALLOCATION_TABLE:
+        cached_port = project_info.get("app_port", 8000)
+        allocation = port_allocator.allocate(
+            _get_aws_client("dynamodb").Table(PORT_ALLOCATION_TABLE), repository, cached_port, analysis_id
+        )
+        if allocation["port"] != cached_port:
+            # The cached Dockerfile/AppSpec are built around the old port
+            raise ValueError(f"port {cached_port} is now reserved by another repository")
+        if allocation["listener_priority"] != project_info.get("listener_priority"):
+            project_info["listener_priority"] = allocation["listener_priority"]
+            rerender_tfvars = True
+
+    if task_size and get_task_size({"task_size": task_size}) != get_task_size(project_info):
+        project_info["task_size"] = task_size
+        rerender_tfvars = True
+
+    rerendered = set()
+    if rerender_tfvars:
+        # tfvars embeds the analysis_id, image tag, listener priority and task size
+        commit_sha_short = commit_sha[:7] if commit_sha and commit_sha != "unknown" else "latest"
+        specs["terraform_tfvars"] = _generate_terraform_tfvars(
+            project_info, analysis_id, commit_sha_short
+        )
+        rerendered.add("terraform_tfvars")
+
+    # A reused analysis may come from another tree: new paths, other sizes
+    build_context = None
+    if context is not None:
+        cached_dockerignore = specs.get("dockerignore")
+        build_context = _render_dockerignore(project_info, specs, context)
+        if specs.get("dockerignore") != cached_dockerignore:
+            rerendered.add("dockerignore")
+
+    if rerendered:
+        unchanged = {} if cached["analysis_id"] != analysis_id else {
+            name: (content, spec_urls.get(name))
+            for name, content in specs.items() if name not in rerendered and spec_urls.get(name)
         }
+        spec_urls = _upload_specs_to_s3(s3_bucket, analysis_id, specs, unchanged)
 
-    # Use direct OpenAI API endpoint
-    base_url = "https://api.openai.com/v1"
-    model = "gpt-4o"  # Using gpt-4o model
+    recommendation, recommendation_text = _determine_recommendation(project_info, specs)
 
-    print(f"✅ OpenAI API configured (base_url={base_url}, model={model})")
+    if rerendered:
+        _store_analysis_results(
+            ai_analysis_table, analysis_id, repository, commit_sha,
+            project_info, specs, recommendation,
+            spec_urls=spec_urls,
+            tree_sha=tree_sha or cached.get("tree_sha"),
+            cached_from=cached["analysis_id"],
+            s3_bucket=s3_bucket,
+            deployment_shape=deployment_shape or cached.get("deployment_shape")
+        )
 
-    # Extract environment variables
-    ai_analysis_table = os.getenv("AI_ANALYSIS_TABLE", "delightful-deploy-ai-analysis")
-    s3_bucket = os.getenv("S3_BUCKET", "delightful-deploy-artifacts")
+    result = _build_analysis_result(
+        analysis_id, repository, commit_sha, branch, s3_bucket,
+        project_info, specs, spec_urls, recommendation, recommendation_text
+    )
+    result["cache_hit"] = True
+    result["cached_from"] = cached["analysis_id"]
+    if build_context:
+        result["build_context"] = build_context
+    return result
 
-    # Extract event parameters
+
+def _analysis_request(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Table/bucket names and event parameters shared by every stage of an analysis"""
     repository = event.get("repository", "unknown/repo")
     commit_sha = event.get("commit_sha", "unknown")
-    branch = event.get("branch", "main")
 
     # Use analysis_id from event payload (provided by GitHub Actions workflow)
     # If not provided, fall back to generating one
@@ -1305,25 +1845,237 @@ def lambda_handler(event, context):
         ).hexdigest()[:24]
 
     print(f"📝 Using analysis_id: {analysis_id}")
+    invocation = telemetry.current()
+    invocation.set_property("analysis_id", analysis_id)
+    invocation.set_property("repository", repository)
+
+    return {
+        "ai_analysis_table": os.getenv("AI_ANALYSIS_TABLE", "delightful-deploy-ai-analysis"),
+        "s3_bucket": os.getenv("S3_BUCKET", "delightful-deploy-artifacts"),
+        "use_cache": not event.get("force_reanalyze", False),
+        "repository": repository,
+        "commit_sha": commit_sha,
+        "branch": event.get("branch", "main"),
+        "analysis_id": analysis_id,
+        "commit_sha_short": commit_sha[:7] if commit_sha and commit_sha != "unknown" else "latest",
+    }
+
+
+def _response(status_code: int, body: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "statusCode": status_code,
+        "body": json.dumps(body, default=str)
+    }
+
 
+def _serve_from_cache(request: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Response built from a reusable earlier analysis (same commit, or, with the
+    fetched repository context, same tree), or None
+    """
+    tree_sha = context["tree_sha"] if context else None
+    invocation = telemetry.current()
+    with invocation.span("cache_lookup"):
+        cached = _lookup_cached_analysis(
+            request["ai_analysis_table"], request["repository"], request["commit_sha"],
+            tree_sha, request["analysis_id"]
+        )
+    if not cached:
+        return None
     try:
-        print(f"🔍 Analyzing repository: {repository} @ {commit_sha}")
+        with invocation.span("serve_cached"):
+            result = _serve_cached_analysis(
+                cached, request["ai_analysis_table"], request["s3_bucket"],
+                request["analysis_id"], request["repository"], request["commit_sha"], request["branch"],
+                tree_sha, task_size=context["task_size"] if context else None, context=context
+            )
+        print(f"✅ Analysis served from cache!")
+        invocation.set_property("generation_path", "cache")
+        invocation.add("analysis_cache_hits", 1)
+        return _response(200, result)
+    except Exception as e:
+        print(f"⚠️ Could not serve cached analysis: {e}, running full analysis")
+        return None
 
-        # Step 0: Get existing deployments to avoid conflicts
-        print("📊 Querying existing deployments...")
-        existing_deployments = _get_existing_deployments()
 
-        # Get repository information from event or simulate
-        file_list = event.get("file_list", [
+def _plan_incremental(request: Dict[str, Any], context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Change impact (change_impact.assess) of this commit against the repository's
+    last analysis, with that analysis and its specs loaded under "previous".
+    None when there is no usable baseline or the change needs a full analysis.
+    """
+    commit_sha = request["commit_sha"]
+    if not (INCREMENTAL_ANALYSIS and request["use_cache"] and context["tree_sha"]):
+        return None
+    if not _FULL_SHA.match(commit_sha or ""):
+        return None
+
+    with telemetry.current().span("incremental_lookup"):
+        previous = _lookup_previous_analysis(request["ai_analysis_table"], request["repository"])
+        previous_sha = (previous or {}).get("commit_sha") or ""
+        if not _FULL_SHA.match(previous_sha) or previous_sha == commit_sha:
+            return None
+        paths = _fetch_changed_paths(request["repository"], previous_sha, commit_sha)
+        if paths is None:
+            return None
+
+        impact = change_impact.assess(
+            paths, previous["deployment_shape"], change_impact.deployment_shape(context["local_info"])
+        )
+        print(f"🔀 {len(paths)} files changed since analysis {previous['analysis_id']} ({previous_sha[:7]}): "
+              f"relevant {impact['relevant_paths'] or 'none'}, shape changes {impact['shape_changes'] or 'none'} "
+              f"-> {impact['mode']} {impact['specs']}")
+        if impact["mode"] == "full":
+            return None
+        try:
+            analysis_cache.load_specs(previous, _get_aws_client("s3"))
+        except Exception as e:
+            print(f"⚠️ Could not load the previous specs: {e}, running full analysis")
+            return None
+
+    context["incremental"] = {
+        "previous_analysis_id": previous["analysis_id"],
+        "previous_commit_sha": previous_sha,
+        "changed_files": len(paths),
+        "relevant_paths": impact["relevant_paths"],
+        "regenerated": impact["specs"],
+    }
+    return dict(impact, previous=previous)
+
+
+def _serve_incremental(
+    request: Dict[str, Any],
+    context: Dict[str, Any],
+    plan: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """Response reusing the previous analysis as-is (no deployment-relevant change), or None"""
+    invocation = telemetry.current()
+    try:
+        with invocation.span("serve_cached"):
+            result = _serve_cached_analysis(
+                plan["previous"], request["ai_analysis_table"], request["s3_bucket"],
+                request["analysis_id"], request["repository"], request["commit_sha"], request["branch"],
+                context["tree_sha"], deployment_shape=change_impact.deployment_shape(context["local_info"]),
+                task_size=context["task_size"], context=context
+            )
+    except Exception as e:
+        print(f"⚠️ Could not reuse the previous analysis: {e}, running full analysis")
+        context.pop("incremental", None)
+        return None
+
+    print(f"✅ No deployment-relevant changes, previous analysis reused!")
+    result["incremental"] = context["incremental"]
+    invocation.set_property("generation_path", "incremental")
+    invocation.add("incremental_reuses", 1)
+    return _response(200, result)
+
+
+def _generate_incremental_specs(
+    request: Dict[str, Any],
+    context: Dict[str, Any],
+    plan: Dict[str, Any],
+    api_key: str,
+    existing_deployments: Optional[List[Dict]],
+    generation_metrics: Dict[str, Any],
+    on_section: Optional[Callable[[str, str], None]] = None
+) -> tuple:
+    """
+    Regenerate only the specs affected by the change and keep the previous
+    analysis' others. The project is re-analyzed only when its detected
+    deployment shape or its own Dockerfile (a sampled file) changed.
+    Returns (project_info, specs).
+    """
+    base_url = OPENAI_BASE_URL.rstrip("/")
+    previous = plan["previous"]
+    invocation = telemetry.current()
+
+    if plan["shape_changes"] or "docker" in plan["relevant_paths"].values():
+        print("🤖 Deployment shape or Dockerfile changed, re-running project analysis...")
+        with invocation.span("analyze"):
+            project_info = _analyze_project_with_gpt5(
+                base_url, api_key, OPENAI_MODEL, context["file_list"], context["readme_content"],
+                context["file_samples"], existing_deployments, repository=request["repository"]
+            )
+    else:
+        project_info = dict(previous["project_info"])
+    previous_port = previous["project_info"].get("app_port")
+    _reserve_deployment_resources(
+        request["repository"], project_info, request["analysis_id"], existing_deployments, context["task_size"]
+    )
+
+    sections = set(plan["specs"])
+    if project_info.get("app_port") != previous_port:
+        # The kept specs are built around the previous port
+        sections |= set(change_impact.CATEGORY_SPECS["port_config"])
+    context["incremental"]["regenerated"] = sorted(sections)
+    invocation.add("incremental_regenerated_specs", len(sections))
+
+    print(f"📦 Regenerating {sorted(sections)}, keeping the rest of analysis {previous['analysis_id']}...")
+    with invocation.span("generate"):
+        regenerated = _generate_deployment_specs(
+            base_url, api_key, OPENAI_MODEL, project_info, context["readme_content"], context["file_list"],
+            on_section=on_section, metrics=generation_metrics, repository=request["repository"],
+            sections=sorted(sections)
+        )
+
+    # tfvars embed the analysis_id and are rendered again by _finish_analysis
+    specs = {name: content for name, content in previous["specs"].items() if name != "terraform_tfvars"}
+    specs.update(regenerated)
+    return project_info, specs
+
+
+def _prefetch_stages(event: Dict[str, Any], request: Dict[str, Any]) -> Dict[str, Callable[[], Any]]:
+    """
+    The OpenAI key (SSM), existing deployments (DynamoDB), repository files
+    (GitHub) and the deployed service's utilization (CloudWatch) are independent
+    of each other
+    """
+    repository = request["repository"]
+    stages = {"api_key": _get_openai_api_key}
+    if not PORT_ALLOCATION_TABLE:
+        # Without the allocator, ports are picked from a scan of existing deployments
+        stages["existing_deployments"] = _get_existing_deployments
+    if "github" in repository.lower():
+        # GitHub repo 형식: owner/repo
+        stages["github"] = lambda: _fetch_github_repo_info(
+            repository, request["commit_sha"], event.get("ingest_mode")
+        )
+    if TASK_SIZING_SOURCE != "off":
+        stages["utilization"] = lambda: _recommend_task_size(repository)
+    return stages
+
+
+def _prefetch(
+    event: Dict[str, Any],
+    request: Dict[str, Any],
+    shared: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Prefetch stages, minus those already fetched once for a whole batch (shared)"""
+    shared = shared or {}
+    stages = {name: fn for name, fn in _prefetch_stages(event, request).items() if name not in shared}
+    print(f"📊 Prefetching {', '.join(stages)}...")
+    with telemetry.current().span("fetch"):
+        prefetched = _run_parallel_stages(
+            stages,
+            PREFETCH_DEADLINES,
+            defaults={"api_key": None, "existing_deployments": None, "github": None, "utilization": None}
+        )
+    return {**prefetched, **shared}
+
+
+def _repository_context(event: Dict[str, Any], prefetched: Dict[str, Any], repository: str) -> Dict[str, Any]:
+    """File list / README / samples to analyze: fetched from GitHub, else taken from the event"""
+    # Get repository information from event or simulate
+    context = {
+        "file_list": event.get("file_list", [
             "README.md",
             "requirements.txt",
             "app/main.py",
             "app/__init__.py",
             "Dockerfile",
             ".gitignore"
-        ])
-
-        readme_content = event.get("readme_content", """# Demo Application
+        ]),
+        "readme_content": event.get("readme_content", """# Demo Application
 
 A demo application for deployment automation.
 
@@ -1334,122 +2086,664 @@ python app/main.py
 ```
 
 Server runs on port 8000.
-""")
+"""),
+        "file_samples": event.get("file_samples", None),
+        "tree_sha": None,
+        "repo_stats": None,
+        "file_sizes": None,
+        # Recommended from the service's observed utilization (None: starting size by complexity)
+        "task_size": prefetched.get("utilization"),
+    }
 
-        file_samples = event.get("file_samples", None)
+    # Step 1: Use actual repository files if they were fetched from GitHub
+    repo_info = prefetched.get("github")
+    if repo_info:
+        context["file_list"] = repo_info["file_list"]
+        context["readme_content"] = repo_info["readme_content"]
+        context["tree_sha"] = repo_info.get("tree_sha")
+        # Size statistics (tarball ingestion only) and per-file sizes
+        context["repo_stats"] = repo_info.get("repo_stats")
+        context["file_sizes"] = repo_info.get("file_sizes")
+        # Samples sent in the event win over the ones fetched from the tree
+        if repo_info.get("file_samples"):
+            context["file_samples"] = {**repo_info["file_samples"], **(context["file_samples"] or {})}
+    elif "github" in repository.lower():
+        print("⚠️ Could not fetch from GitHub, using provided data")
+
+    invocation = telemetry.current()
+    invocation.add("file_count", len(context["file_list"]))
+    invocation.add("readme_bytes", len((context["readme_content"] or "").encode("utf-8")))
+    return context
+
+
+def _fast_path_info(event: Dict[str, Any], context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Locally detected project info when its specs can be rendered from templates, else None"""
+    local_info = detect_project(context["file_list"], context["file_samples"])
+    context["local_info"] = local_info
+    fast_path_enabled = TEMPLATE_FAST_PATH and event.get("fast_path", True)
+    if not (fast_path_enabled and supports_fast_path(local_info)):
+        return None
+    print(f"⚡ Template fast path: {local_info['primary_language']} / "
+          f"{local_info['primary_framework']} (entrypoint {local_info.get('entrypoint')})")
+    return local_info
 
-        # Step 1: Fetch actual repository files if GitHub event
-        if "github" in repository.lower():
-            print("📥 Fetching repository files from GitHub...")
-            try:
-                # GitHub repo 형식: owner/repo
-                file_list, readme_content = _fetch_github_repo_info(repository, commit_sha)
-            except Exception as e:
-                print(f"⚠️ Could not fetch from GitHub: {e}, using provided data")
 
-        # Step 1.5: Analyze project using GPT-5 with existing deployment context
-        print("🤖 Running intelligent project analysis...")
-        project_info = _analyze_project_with_gpt5(
-            base_url, api_key, model, file_list, readme_content, file_samples, existing_deployments
-        )
+def _generate_degraded_specs(
+    request: Dict[str, Any],
+    context: Dict[str, Any],
+    existing_deployments: Optional[List[Dict]],
+    generation_metrics: Dict[str, Any]
+) -> tuple:
+    """
+    LLM provider circuit is open: render template specs when the stack is
+    templated (medium confidence is enough here), generic fallback specs
+    otherwise. Returns (project_info, specs).
+    """
+    project_info = context.get("local_info") or detect_project(context["file_list"], context["file_samples"])
+    print(f"🚧 LLM provider degraded ({_openai_guard.summary()}), generating without it")
+    _reserve_deployment_resources(
+        request["repository"], project_info, request["analysis_id"], existing_deployments, context["task_size"]
+    )
+    generation_metrics["provider_degraded"] = True
+
+    if supports_fast_path(project_info, min_confidence="medium"):
+        specs = generate_template_specs(project_info, request["analysis_id"], request["commit_sha_short"])
+    else:
+        specs = _generate_fallback_specs(project_info)
+    # Anything short of the regular fast path needs a human look and is not cached
+    if not supports_fast_path(project_info):
+        generation_metrics["fallback_specs"] = True
+    return project_info, specs
+
+
+def _finish_analysis(
+    request: Dict[str, Any],
+    context: Dict[str, Any],
+    project_info: Dict[str, Any],
+    specs: Dict[str, str],
+    generation_path: str,
+    generation_metrics: Dict[str, Any],
+    early_uploads: Dict[str, tuple]
+) -> Dict[str, Any]:
+    """Post-process, publish and store the generated specs; returns the Lambda response"""
+    analysis_id = request["analysis_id"]
+    file_list = context["file_list"]
+    invocation = telemetry.current()
+    invocation.set_property("generation_path", generation_path)
+
+    # Generic fallback specs need a human look and must not be served from cache,
+    # however confident the (local) project detection was
+    if generation_metrics.get("fallback_specs"):
+        project_info["confidence"] = "low"
+
+    _generation_path_counts[generation_path] += 1
+    print(f"📈 Generation paths (this container): {_generation_path_counts}")
+    if generation_path in ("llm", "incremental") and _llm_cache is not None:
+        print(f"♻️ LLM cache (this container): {_llm_cache.summary()}")
+    if generation_path != "template":
+        print(f"🛡️ OpenAI calls (this container): {_openai_guard.summary()}")
+
+    # Step 2.5: Generate Terraform tfvars
+    if "terraform_tfvars" not in specs:
+        print("⚙️ Generating Terraform variables...")
+        with invocation.span("tfvars"):
+            specs["terraform_tfvars"] = _generate_terraform_tfvars(
+                project_info, analysis_id, request["commit_sha_short"]
+            )
 
-        # Step 2: Generate deployment specs using GPT-5
-        print("📦 Generating deployment specifications...")
-        specs = _generate_deployment_specs(
-            base_url, api_key, model, project_info, readme_content, file_list
-        )
+    # Step 3: Determine recommendation
+    recommendation, recommendation_text = _determine_recommendation(project_info, specs)
 
-        # Step 2.5: Generate Terraform tfvars
-        print("⚙️ Generating Terraform variables...")
-        commit_sha_short = commit_sha[:7] if commit_sha and commit_sha != "unknown" else "latest"
-        specs["terraform_tfvars"] = _generate_terraform_tfvars(
-            project_info, analysis_id, commit_sha_short
+    # Step 3.5: Fix Dockerfile syntax errors (post-processing)
+    if specs.get("dockerfile") and generation_path in ("llm", "incremental"):
+        print("🔧 Applying Dockerfile syntax fixes...")
+        with invocation.span("fix"):
+            specs["dockerfile"] = _fix_dockerfile_syntax(specs["dockerfile"], project_info, file_list)
+        # Step 3.6: Build-speed rewrites (layer order, cache mounts); template specs are optimized when rendered
+        with invocation.span("optimize"):
+            specs["dockerfile"] = optimize_dockerfile(specs["dockerfile"], file_list, context["file_samples"])
+
+    # Step 3.7: .dockerignore for the final Dockerfile and this tree
+    build_context = _render_dockerignore(project_info, specs, context)
+    invocation.add("spec_bytes", sum(len((content or "").encode("utf-8")) for content in specs.values()))
+
+    # Step 4: Upload specs to S3
+    print("☁️ Uploading specs to S3...")
+    with invocation.span("upload"):
+        uploaded = {name: (content, future.result()) for name, (content, future) in early_uploads.items()}
+        spec_urls = _upload_specs_to_s3(request["s3_bucket"], analysis_id, specs, uploaded)
+
+    # Step 5: Store analysis results (after upload so the cache entry carries spec_urls)
+    print("💾 Storing analysis results...")
+    with invocation.span("store"):
+        stored = _store_analysis_results(
+            request["ai_analysis_table"], analysis_id, request["repository"], request["commit_sha"],
+            project_info, specs, recommendation,
+            spec_urls=spec_urls,
+            tree_sha=context["tree_sha"],
+            s3_bucket=request["s3_bucket"],
+            deployment_shape=change_impact.deployment_shape(context.get("local_info"))
         )
 
-        # Step 3: Determine recommendation
-        confidence = project_info.get("confidence", "medium")
-        has_dockerfile = bool(specs.get("dockerfile"))
+    # Step 6: Prepare response for GitHub Actions
+    result = _build_analysis_result(
+        analysis_id, request["repository"], request["commit_sha"], request["branch"], request["s3_bucket"],
+        project_info, specs, spec_urls, recommendation, recommendation_text
+    )
+    result["cache_hit"] = False
+    result["generation_path"] = generation_path
+    if not stored:
+        # Specs are published, but this analysis will not be served from cache
+        result["result_stored"] = False
+    if context.get("incremental"):
+        result["incremental"] = context["incremental"]
+    if generation_metrics:
+        result["generation_metrics"] = generation_metrics
+    if context["repo_stats"]:
+        result["repo_stats"] = context["repo_stats"]
+    if build_context:
+        result["build_context"] = build_context
+
+    print(f"✅ Analysis complete!")
+    print(f"📊 Results: {json.dumps(result, indent=2, default=str)}")
+
+    return _response(200, result)
+
+
+def _error_response(request: Dict[str, Any], e: Exception) -> Dict[str, Any]:
+    print(f"❌ ERROR during analysis: {e}")
+    traceback.print_exc()
+
+    return _response(500, {
+        "analysis_id": request["analysis_id"],
+        "repository": request["repository"],
+        "commit_sha": request["commit_sha"],
+        "status": "error",
+        "error": str(e),
+        "error_type": type(e).__name__
+    })
+
+
+def _api_key_missing() -> Dict[str, Any]:
+    print("❌ ERROR: OpenAI API key not configured")
+    return _response(500, {"error": "API key not configured"})
+
+
+def lambda_handler(event, context):
+    """
+    Main Lambda handler for AI Code Analyzer
+
+    Analyzes ANY project type and generates deployment specifications.
+
+    Event format:
+    {
+        "repository": "owner/repo",
+        "commit_sha": "abc123",
+        "branch": "main",
+        "pusher": "username",
+        "timestamp": "2025-01-01T00:00:00Z",
+        "file_list": ["file1.py", "file2.js", ...],  # Optional
+        "readme_content": "...",  # Optional
+        "file_samples": {"main.py": "content..."},  # Optional
+        "force_reanalyze": false,  # Optional, bypasses the analysis cache
+        "fast_path": true,  # Optional, false forces LLM generation
+        "ingest_mode": "tarball",  # Optional, "api" | "tarball" (default GITHUB_INGEST_MODE)
+        "async_pipeline": true  # Optional, asyncio orchestration (default ASYNC_PIPELINE)
+    }
+
+    Teardown: {"action": "release_allocation", "repository": "owner/repo"}
+    frees the port / listener priority reserved for the repository.
+
+    Batch: {"action": "analyze_batch", "repositories": [event, ...],
+            "defaults": {...}, "max_concurrency": 4}
+    analyzes many repositories in one invocation (see _analyze_batch).
+    """
+    print("🌸 AI Code Analyzer invoked")
+    print(f"Event: {json.dumps(event, default=str)}")
+
+    if event.get("action") == "release_allocation":
+        return _release_deployment_resources(event.get("repository", "unknown/repo"))
+    if event.get("action") == "analyze_batch":
+        return _analyze_batch(event, context)
 
-        if confidence == "high" and has_dockerfile:
-            recommendation = "auto-apply"
-            recommendation_text = f"✅ High confidence detection: {project_info.get('primary_language')} with {project_info.get('primary_framework', 'standard')} framework. Ready for deployment."
-        elif confidence == "medium":
-            recommendation = "review-recommended"
-            recommendation_text = f"⚠️ Medium confidence detection. Please review generated specs before deployment."
+    pipeline = "async" if event.get("async_pipeline", ASYNC_PIPELINE) else "sequential"
+    invocation = telemetry.start({"pipeline": pipeline}, enabled=TELEMETRY_ENABLED)
+    try:
+        if pipeline == "async":
+            # Imported here: asyncio adds ~50 ms to every cold start and is off by default
+            import asyncio
+            response = asyncio.run(_analyze_async(event))
         else:
-            recommendation = "manual-review"
-            recommendation_text = f"🔍 Low confidence or unknown project type. Manual review required."
+            response = _analyze(event)
+        invocation.set_property("status_code", response["statusCode"])
+        return response
+    finally:
+        invocation.emit()
 
-        # Step 4: Store analysis results
-        print("💾 Storing analysis results...")
-        _store_analysis_results(
-            ai_analysis_table, analysis_id, repository, commit_sha,
-            project_info, specs, recommendation
-        )
 
-        # Step 4.5: Fix Dockerfile syntax errors (post-processing)
-        if specs.get("dockerfile"):
-            print("🔧 Applying Dockerfile syntax fixes...")
-            specs["dockerfile"] = _fix_dockerfile_syntax(specs["dockerfile"], project_info, file_list)
+def _analyze(event: Dict[str, Any], shared: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Sequential pipeline: every stage waits for the previous one.
+    shared carries prefetch results fetched once for a batch.
+    """
+    request = _analysis_request(event)
+    repository = request["repository"]
+    analysis_id = request["analysis_id"]
+    invocation = telemetry.current()
 
-        # Step 5: Upload specs to S3
-        print("☁️ Uploading specs to S3...")
-        spec_urls = _upload_specs_to_s3(s3_bucket, analysis_id, specs)
-
-        # Step 6: Prepare response for GitHub Actions
-        result = {
-            "analysis_id": analysis_id,
-            "repository": repository,
-            "commit_sha": commit_sha,
-            "branch": branch,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "project_info": project_info,
-            "recommendation": recommendation,
-            "recommendation_text": recommendation_text,
-            "spec_urls": spec_urls,
-            "specs_generated": list(specs.keys()),
-
-            # GitHub Actions가 바로 사용할 수 있는 정보
-            "deployment_config": {
-                "cpu": _get_cpu_from_complexity(project_info.get("deployment_complexity", "moderate")),
-                "memory": _get_memory_from_complexity(project_info.get("deployment_complexity", "moderate")),
-                "port": project_info.get("app_port", 8000),
-                "runtime": project_info.get("runtime", "python:3.11-slim"),
-                "build_command": _get_build_command(project_info),
-                "start_command": _get_start_command(project_info)
-            },
-
-            # S3에서 다운로드할 파일 경로
-            "download_urls": {
-                "dockerfile": f"s3://{s3_bucket}/analysis/{analysis_id}/dockerfile",
-                "terraform_vars": f"s3://{s3_bucket}/analysis/{analysis_id}/terraform.tfvars",
-                "appspec": f"s3://{s3_bucket}/analysis/{analysis_id}/appspec.yaml"
-            },
-
-            "status": "success"
-        }
+    # Step -1: Same repository + commit already analyzed? (single indexed read)
+    if request["use_cache"]:
+        cached_response = _serve_from_cache(request)
+        if cached_response:
+            return cached_response
 
-        print(f"✅ Analysis complete!")
-        print(f"📊 Results: {json.dumps(result, indent=2, default=str)}")
+    # Step 0: Fetch the OpenAI key (SSM), existing deployments (DynamoDB) and
+    # repository files (GitHub) concurrently
+    prefetched = _prefetch(event, request, shared)
+    api_key = prefetched["api_key"]
 
-        return {
-            "statusCode": 200,
-            "body": json.dumps(result, default=str)
-        }
+    base_url = OPENAI_BASE_URL.rstrip("/")
+    model = OPENAI_MODEL
+
+    try:
+        print(f"🔍 Analyzing repository: {repository} @ {request['commit_sha']}")
+
+        # Existing deployments are only scanned when the port allocator is not configured
+        existing_deployments = prefetched.get("existing_deployments")
+        context = _repository_context(event, prefetched, repository)
+        file_list = context["file_list"]
+        readme_content = context["readme_content"]
+
+        # Step 1.2: Same git tree analyzed under a different commit?
+        if request["use_cache"] and context["tree_sha"]:
+            cached_response = _serve_from_cache(request, context)
+            if cached_response:
+                return cached_response
+
+        upload_pool = ThreadPoolExecutor(max_workers=SPEC_UPLOAD_WORKERS)
+        early_uploads = {}
+        generation_metrics = {}
+
+        # Finished sections (except the Dockerfile, which GitHub Actions polls
+        # as the completion signal) are uploaded while generation continues
+        def publish_section(spec_name: str, content: str) -> None:
+            early_uploads[spec_name] = (
+                content,
+                upload_pool.submit(
+                    telemetry.carry(_upload_spec_to_s3), request["s3_bucket"], analysis_id, spec_name, content
+                )
+            )
+
+        # Step 1.4: Well-known stack? Render specs from templates and skip the LLM
+        with invocation.span("analyze"):
+            local_info = _fast_path_info(event, context)
+
+        # Step 1.45: Only application code changed since the last analysis? Reuse its
+        # specs, or regenerate the affected ones (template stacks are cheaper to render)
+        plan = None if local_info else _plan_incremental(request, context)
+        if plan and plan["mode"] == "reuse":
+            incremental_response = _serve_incremental(request, context, plan)
+            if incremental_response:
+                return incremental_response
+            plan = None
+
+        if local_info:
+            generation_path = "template"
+            project_info = local_info
+            _reserve_deployment_resources(
+                repository, project_info, analysis_id, existing_deployments, context["task_size"]
+            )
+            # Templates are maintained by hand, so they skip the LLM output fixups below
+            with invocation.span("generate"):
+                specs = generate_template_specs(project_info, analysis_id, request["commit_sha_short"])
+        elif _openai_guard.degraded:
+            generation_path = "degraded"
+            with invocation.span("generate"):
+                project_info, specs = _generate_degraded_specs(
+                    request, context, existing_deployments, generation_metrics
+                )
+        elif plan:
+            generation_path = "incremental"
+            if not api_key:
+                return _api_key_missing()
+            project_info, specs = _generate_incremental_specs(
+                request, context, plan, api_key, existing_deployments, generation_metrics,
+                on_section=publish_section
+            )
+        else:
+            generation_path = "llm"
+            if not api_key:
+                return _api_key_missing()
+            print(f"✅ OpenAI API configured (base_url={base_url}, model={model})")
+
+            # Step 1.5: Analyze project using GPT-5 with existing deployment context
+            print("🤖 Running intelligent project analysis...")
+            with invocation.span("analyze"):
+                project_info = _analyze_project_with_gpt5(
+                    base_url, api_key, model, file_list, readme_content, context["file_samples"],
+                    existing_deployments, repository=repository
+                )
+
+            # Reserve the port before spec generation so the Dockerfile uses it
+            _reserve_deployment_resources(
+                repository, project_info, analysis_id, existing_deployments, context["task_size"]
+            )
+
+            # Step 2: Generate deployment specs using GPT-5
+            print("📦 Generating deployment specifications...")
+            with invocation.span("generate"):
+                specs = _generate_deployment_specs(
+                    base_url, api_key, model, project_info, readme_content, file_list,
+                    on_section=publish_section, metrics=generation_metrics, repository=repository
+                )
+
+        try:
+            return _finish_analysis(
+                request, context, project_info, specs, generation_path, generation_metrics, early_uploads
+            )
+        finally:
+            upload_pool.shutdown(wait=False)
 
     except Exception as e:
-        print(f"❌ ERROR during analysis: {e}")
-        import traceback
-        traceback.print_exc()
+        return _error_response(request, e)
 
-        return {
-            "statusCode": 500,
-            "body": json.dumps({
-                "analysis_id": analysis_id,
-                "repository": repository,
-                "commit_sha": commit_sha,
-                "status": "error",
-                "error": str(e),
-                "error_type": type(e).__name__
-            })
-        }
+
+async def _analyze_async(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Same stages and results as _analyze, orchestrated with asyncio so that
+    independent work overlaps:
+      - tfvars are rendered and uploaded while the spec completion is in flight
+    The prefetch starts after a commit cache miss, as in _analyze: started
+    alongside the lookup, a hit would leave GitHub / SSM / CloudWatch calls
+    running in the background for a few ms saved on a miss.
+    Blocking calls (boto3, requests) run on a thread pool.
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(max_workers=ASYNC_PIPELINE_WORKERS)
+
+    def run(fn, *args, **kwargs) -> "asyncio.Future":
+        return loop.run_in_executor(pool, telemetry.carry(lambda: fn(*args, **kwargs)))
+
+    try:
+        request = _analysis_request(event)
+        repository = request["repository"]
+        analysis_id = request["analysis_id"]
+        invocation = telemetry.current()
+
+        # Step -1: Same repository + commit already analyzed? (single indexed read)
+        if request["use_cache"]:
+            cached_response = await run(_serve_from_cache, request)
+            if cached_response:
+                return cached_response
+        # Step 0: prefetch
+        prefetched = await run(_prefetch, event, request)
+        api_key = prefetched["api_key"]
+
+        base_url = OPENAI_BASE_URL.rstrip("/")
+        model = OPENAI_MODEL
+
+        try:
+            print(f"🔍 Analyzing repository: {repository} @ {request['commit_sha']}")
+
+            existing_deployments = prefetched.get("existing_deployments")
+            context = _repository_context(event, prefetched, repository)
+            file_list = context["file_list"]
+            readme_content = context["readme_content"]
+
+            # Step 1.2: Same git tree analyzed under a different commit?
+            if request["use_cache"] and context["tree_sha"]:
+                cached_response = await run(_serve_from_cache, request, context)
+                if cached_response:
+                    return cached_response
+
+            upload_pool = ThreadPoolExecutor(max_workers=SPEC_UPLOAD_WORKERS)
+            early_uploads = {}
+            generation_metrics = {}
+
+            def publish_section(spec_name: str, content: str) -> None:
+                early_uploads[spec_name] = (
+                    content,
+                    upload_pool.submit(
+                        telemetry.carry(_upload_spec_to_s3), request["s3_bucket"], analysis_id, spec_name, content
+                    )
+                )
+
+            with invocation.span("analyze"):
+                local_info = _fast_path_info(event, context)
+
+            plan = None if local_info else await run(_plan_incremental, request, context)
+            if plan and plan["mode"] == "reuse":
+                incremental_response = await run(_serve_incremental, request, context, plan)
+                if incremental_response:
+                    return incremental_response
+                plan = None
+
+            if local_info:
+                generation_path = "template"
+                project_info = local_info
+                await run(
+                    _reserve_deployment_resources,
+                    repository, project_info, analysis_id, existing_deployments, context["task_size"]
+                )
+                with invocation.span("generate"):
+                    specs = generate_template_specs(project_info, analysis_id, request["commit_sha_short"])
+            elif _openai_guard.degraded:
+                generation_path = "degraded"
+                with invocation.span("generate"):
+                    project_info, specs = await run(
+                        _generate_degraded_specs, request, context, existing_deployments, generation_metrics
+                    )
+            elif plan:
+                generation_path = "incremental"
+                if not api_key:
+                    return _api_key_missing()
+                project_info, specs = await run(
+                    _generate_incremental_specs,
+                    request, context, plan, api_key, existing_deployments, generation_metrics,
+                    on_section=publish_section
+                )
+            else:
+                generation_path = "llm"
+                if not api_key:
+                    return _api_key_missing()
+                print(f"✅ OpenAI API configured (base_url={base_url}, model={model})")
+
+                print("🤖 Running intelligent project analysis...")
+                with invocation.span("analyze"):
+                    project_info = await run(
+                        _analyze_project_with_gpt5,
+                        base_url, api_key, model, file_list, readme_content, context["file_samples"],
+                        existing_deployments, repository=repository
+                    )
+                await run(
+                    _reserve_deployment_resources,
+                    repository, project_info, analysis_id, existing_deployments, context["task_size"]
+                )
+
+                print("📦 Generating deployment specifications...")
+                generate_started = time.monotonic()
+                specs_future = run(
+                    _generate_deployment_specs,
+                    base_url, api_key, model, project_info, readme_content, file_list,
+                    on_section=publish_section, metrics=generation_metrics, repository=repository
+                )
+
+                # tfvars only need the reserved port / priority: publish them while the LLM generates
+                with invocation.span("tfvars"):
+                    tfvars = _generate_terraform_tfvars(project_info, analysis_id, request["commit_sha_short"])
+                publish_section("terraform_tfvars", tfvars)
+
+                specs = await specs_future
+                # generate overlaps tfvars, so it is timed by hand rather than with a span
+                invocation.add("generate_ms", (time.monotonic() - generate_started) * 1000)
+                # Fallback specs may carry their own tfvars; the final publish re-uploads on change
+                specs.setdefault("terraform_tfvars", tfvars)
+
+            try:
+                return await run(
+                    _finish_analysis,
+                    request, context, project_info, specs, generation_path, generation_metrics, early_uploads
+                )
+            finally:
+                upload_pool.shutdown(wait=False)
+
+        except Exception as e:
+            return _error_response(request, e)
+
+    finally:
+        pool.shutdown(wait=False)
+
+
+def _batch_item_summary(
+    item: Dict[str, Any],
+    response: Dict[str, Any],
+    duration_ms: float,
+    metrics: Dict[str, float]
+) -> Dict[str, Any]:
+    """Compact per-repository entry of a batch result (full results are in DynamoDB / S3)"""
+    body = json.loads(response["body"])
+    summary = {
+        "repository": item.get("repository"),
+        "commit_sha": item.get("commit_sha"),
+        "analysis_id": body.get("analysis_id"),
+        "status_code": response["statusCode"],
+        "duration_ms": round(duration_ms, 1),
+        # Counters of the item's telemetry record (cache hits, tokens, ...), summed by _batch_report
+        "counts": {name: value for name, value in metrics.items() if not name.endswith(("_ms", "_bytes"))},
+    }
+    if response["statusCode"] == 200:
+        summary["generation_path"] = body.get("generation_path", "cache" if body.get("cache_hit") else None)
+        summary["recommendation"] = body.get("recommendation")
+    else:
+        summary["error"] = body.get("error")
+        summary["error_type"] = body.get("error_type", "Error")
+    return summary
+
+
+def _analyze_batch_item(item: Dict[str, Any], shared: Dict[str, Any], batch_id: str) -> Dict[str, Any]:
+    """One repository of a batch, with its own EMF record (repository, generation path, cache hits)"""
+    started = time.monotonic()
+    with telemetry.scope({"pipeline": "batch_item", "batch_id": batch_id}, enabled=TELEMETRY_ENABLED) as invocation:
+        try:
+            response = _analyze(item, shared)
+        except Exception as e:
+            # _analyze turns analysis errors into 500s; this catches what happens before that
+            traceback.print_exc()
+            response = _response(500, {"status": "error", "error": str(e), "error_type": type(e).__name__})
+        invocation.set_property("status_code", response["statusCode"])
+        invocation.emit()
+    return _batch_item_summary(item, response, (time.monotonic() - started) * 1000, invocation.metrics)
+
+
+def _batch_report(results: List[Dict[str, Any]], wall_ms: float) -> Dict[str, Any]:
+    """Throughput and error summary of a batch"""
+    finished = [r for r in results if r["status_code"] is not None]
+    failed = [r for r in finished if r["status_code"] != 200]
+    durations = sorted(r["duration_ms"] for r in finished)
+    paths: Dict[str, int] = {}
+    errors: Dict[str, int] = {}
+    counts: Dict[str, float] = {}
+    for result in finished:
+        for name, value in result.get("counts", {}).items():
+            counts[name] = counts.get(name, 0) + value
+        if result in failed:
+            errors[result["error_type"]] = errors.get(result["error_type"], 0) + 1
+        else:
+            paths[result["generation_path"] or "unknown"] = paths.get(result["generation_path"] or "unknown", 0) + 1
+
+    def percentile(q: float) -> Optional[float]:
+        return durations[min(len(durations) - 1, int(q * len(durations)))] if durations else None
+
+    return {
+        "total": len(results),
+        "succeeded": len(finished) - len(failed),
+        "failed": len(failed),
+        "skipped": len(results) - len(finished),
+        "wall_ms": round(wall_ms, 1),
+        "repositories_per_minute": round(len(finished) / (wall_ms / 60000), 2) if wall_ms else None,
+        "duration_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "max": durations[-1] if durations else None},
+        "generation_paths": paths,
+        "errors": errors,
+        "counts": {name: round(value, 1) for name, value in sorted(counts.items())},
+    }
+
+
+def _analyze_batch(event: Dict[str, Any], context=None) -> Dict[str, Any]:
+    """
+    Analyze event["repositories"] (each a regular analysis event, over
+    event["defaults"]) on a bounded thread pool in one invocation.
+    The OpenAI key, GitHub token and existing-deployments snapshot are
+    fetched once; HTTP sessions, caches and the OpenAI guard are the
+    container's as usual. Every repository is stored (DynamoDB) and
+    published (S3) as soon as it finishes, so a batch cut short by the
+    Lambda timeout keeps its finished work: repositories not started with
+    less than BATCH_TIME_RESERVE_MS left are reported as skipped.
+    Every repository emits its own EMF record (pipeline "batch_item"); the
+    batch record has the shared fetch, the outcome counts and the items' counters summed.
+    """
+    defaults = event.get("defaults", {})
+    items = [{**defaults, **item} for item in event.get("repositories", [])]
+    concurrency = max(1, min(int(event.get("max_concurrency", BATCH_CONCURRENCY)), BATCH_MAX_CONCURRENCY))
+    batch_id = event.get("batch_id") or hashlib.md5(
+        json.dumps([[i.get("repository"), i.get("commit_sha")] for i in items]).encode()
+    ).hexdigest()[:24]
+    print(f"📚 Batch {batch_id}: {len(items)} repositories, concurrency {concurrency}")
+
+    invocation = telemetry.start({"pipeline": "batch"}, enabled=TELEMETRY_ENABLED)
+    started = time.monotonic()
+    try:
+        # Fetched once instead of once per repository
+        shared_stages = {"api_key": _get_openai_api_key, "github_token": _github_headers}
+        if not PORT_ALLOCATION_TABLE:
+            shared_stages["existing_deployments"] = _get_existing_deployments
+        with invocation.span("batch_fetch"):
+            shared = _run_parallel_stages(shared_stages, PREFETCH_DEADLINES)
+        shared.pop("github_token", None)
+        if not PORT_ALLOCATION_TABLE and shared["existing_deployments"] is None:
+            shared["existing_deployments"] = []
+
+        def time_left() -> bool:
+            return context is None or context.get_remaining_time_in_millis() > BATCH_TIME_RESERVE_MS
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        queue = list(enumerate(items))
+        running = {}
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while queue or running:
+                while queue and len(running) < concurrency and time_left():
+                    index, item = queue.pop(0)
+                    running[pool.submit(_analyze_batch_item, item, shared, batch_id)] = index
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    results[index] = future.result()
+                    mark = "✅" if results[index]["status_code"] == 200 else "❌"
+                    print(f"{mark} [{sum(r is not None for r in results)}/{len(items)}] "
+                          f"{results[index]['repository']}: {results[index]['status_code']} "
+                          f"({results[index].get('generation_path') or results[index].get('error_type')}, "
+                          f"{results[index]['duration_ms']:.0f} ms)")
+
+        for index, item in queue:
+            results[index] = {
+                "repository": item.get("repository"), "commit_sha": item.get("commit_sha"),
+                "status_code": None, "skipped": "invocation time limit",
+            }
+        if queue:
+            print(f"⏳ {len(queue)} repositories skipped (less than {BATCH_TIME_RESERVE_MS} ms left)")
+
+        report = _batch_report(results, (time.monotonic() - started) * 1000)
+        print(f"📚 Batch {batch_id} done: {json.dumps(report)}")
+        for name in ("total", "succeeded", "failed", "skipped"):
+            invocation.add(f"batch_{name}", report[name])
+        for name, value in report["counts"].items():
+            invocation.add(name, value)
+        invocation.set_property("analysis_id", batch_id)
+        invocation.set_property("generation_path", "batch")
+        invocation.set_property("status_code", 200)
+        return _response(200, {"batch_id": batch_id, "summary": report, "results": results})
+    finally:
+        invocation.emit()
@@ -0,0 +1,3 @@
+"""
+AWS/GitHub backed services used by the AI analyzer
+"""
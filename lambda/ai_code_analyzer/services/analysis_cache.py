@@ -0,0 +1,153 @@
+"""
+Analysis result cache
+같은 repository + commit (또는 같은 git tree) 의 이전 분석 결과를 재사용해서
+재실행/재시도 시 GPT 호출을 건너뜁니다.
+Specs 본문은 재사용할 항목이 정해진 뒤에만 load_specs 로 읽습니다 (result_store 참고).
+find_latest 는 incremental re-analysis 의 기준점 (같은 repository 의 최근 분석) 을 찾습니다.
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+from boto3.dynamodb.conditions import Attr, Key
+
+from services import result_store
+
+COMMIT_INDEX = "CommitIndex"
+REPOSITORY_INDEX = "RepositoryIndex"
+
+# RepositoryIndex 조회 시 최대 페이지 수 (오래된 분석까지 전부 훑지 않도록)
+MAX_REPOSITORY_PAGES = 3
+
+
+def _load_json(value: Any, default: Any) -> Any:
+    """DynamoDB 에 JSON 문자열로 저장된 필드 파싱"""
+    if value is None:
+        return default
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return default
+    return value
+
+
+def _to_cached_analysis(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    DynamoDB item 을 캐시 결과로 변환.
+    Fallback (low confidence) 결과나 spec 이 없는 항목은 재사용하지 않습니다.
+    """
+    project_info = _load_json(item.get("project_info"), {})
+    spec_urls = _load_json(item.get("spec_urls"), {})
+
+    if not project_info or not result_store.field_sizes(item, "specs").get("dockerfile") or not spec_urls:
+        return None
+    if project_info.get("confidence") == "low":
+        return None
+
+    return {
+        "analysis_id": item.get("analysis_id"),
+        "commit_sha": item.get("commit_sha"),
+        "tree_sha": item.get("tree_sha"),
+        "timestamp": item.get("timestamp"),
+        "project_info": project_info,
+        "specs": None,
+        "spec_urls": spec_urls,
+        "recommendation": item.get("recommendation"),
+        # Locally detected deployment shape (change_impact), None for older items
+        "deployment_shape": _load_json(item.get("deployment_shape"), None),
+        "item": item,
+    }
+
+
+def load_specs(cached: Dict[str, Any], s3=None) -> Dict[str, str]:
+    """cached["specs"], read from the stored item on first use (offloaded specs need s3)"""
+    if cached["specs"] is None:
+        specs = result_store.load_field(cached["item"], "specs", s3, None)
+        if not specs or not specs.get("dockerfile"):
+            raise ValueError(f"specs of analysis {cached['analysis_id']} could not be loaded")
+        cached["specs"] = specs
+    return cached["specs"]
+
+
+def _first_reusable(
+    items: List[Dict[str, Any]],
+    prefer_analysis_id: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    최신 순으로 정렬된 item 중 재사용 가능한 첫 항목.
+    같은 analysis_id 의 결과가 있으면 우선합니다 (S3 재업로드 불필요).
+    """
+    reusable = [c for c in (_to_cached_analysis(item) for item in items) if c]
+    for cached in reusable:
+        if prefer_analysis_id and cached["analysis_id"] == prefer_analysis_id:
+            return cached
+    return reusable[0] if reusable else None
+
+
+def find_by_commit(
+    table,
+    repository: str,
+    commit_sha: str,
+    prefer_analysis_id: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """CommitIndex 로 같은 repository/commit 의 최신 분석 결과 조회"""
+    if not commit_sha or commit_sha == "unknown":
+        return None
+
+    response = table.query(
+        IndexName=COMMIT_INDEX,
+        KeyConditionExpression=Key("commit_sha").eq(commit_sha),
+        FilterExpression=Attr("repository").eq(repository),
+        ScanIndexForward=False,
+    )
+    return _first_reusable(response.get("Items", []), prefer_analysis_id)
+
+
+def find_by_tree(
+    table,
+    repository: str,
+    tree_sha: str,
+    prefer_analysis_id: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    RepositoryIndex 로 같은 git tree 의 분석 결과 조회.
+    Commit 이 달라도 (rebase, revert, merge commit 등) tree 가 같으면 결과가 동일합니다.
+    """
+    if not tree_sha:
+        return None
+
+    return _query_repository(table, {
+        "IndexName": REPOSITORY_INDEX,
+        "KeyConditionExpression": Key("repository").eq(repository),
+        "FilterExpression": Attr("tree_sha").eq(tree_sha),
+        "ScanIndexForward": False,
+    }, prefer_analysis_id)
+
+
+def find_latest(table, repository: str) -> Optional[Dict[str, Any]]:
+    """RepositoryIndex 로 같은 repository 의 가장 최근 (재사용 가능한) 분석 결과 조회"""
+    return _query_repository(table, {
+        "IndexName": REPOSITORY_INDEX,
+        "KeyConditionExpression": Key("repository").eq(repository),
+        "ScanIndexForward": False,
+    })
+
+
+def _query_repository(
+    table,
+    query_kwargs: Dict[str, Any],
+    prefer_analysis_id: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """RepositoryIndex 를 최신 순으로 최대 MAX_REPOSITORY_PAGES 페이지까지 조회"""
+    for _ in range(MAX_REPOSITORY_PAGES):
+        response = table.query(**query_kwargs)
+        cached = _first_reusable(response.get("Items", []), prefer_analysis_id)
+        if cached:
+            return cached
+
+        last_key = response.get("LastEvaluatedKey")
+        if not last_key:
+            break
+        query_kwargs["ExclusiveStartKey"] = last_key
+
+    return None
@@ -0,0 +1,140 @@
+"""
+GitHub response cache
+GitHub API 응답을 ETag 와 함께 두 단계로 캐시합니다.
+  1. warm container 메모리 (byte 크기 기준 LRU)
+  2. S3 (github-cache/ prefix, 모든 분석이 공유, lifecycle rule 로 만료)
+Tree / blob 처럼 sha 로 주소가 정해진 응답은 재검증 없이 그대로 쓰고, README 처럼
+바뀔 수 있는 응답은 저장된 ETag 로 If-None-Match 재검증합니다.
+DynamoDB 대신 S3 를 쓰는 이유: 큰 repo 의 recursive tree 는 item 크기 제한 (400KB) 을 넘습니다.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+CACHE_PREFIX = "github-cache/"
+
+# In-memory tier budget (Lambda memory is shared with the analysis itself)
+MAX_MEMORY_BYTES = 64 * 1024 * 1024
+# Responses bigger than this are not cached at all (raw, before compression)
+MAX_ENTRY_BYTES = 16 * 1024 * 1024
+
+
+class CachedResponse:
+    """One cached GitHub response body plus its ETag"""
+
+    __slots__ = ("etag", "body", "source", "_json")
+
+    def __init__(self, etag: Optional[str], body: bytes, source: str):
+        self.etag = etag
+        self.body = body
+        # "memory" or "s3": where this lookup found it
+        self.source = source
+        self._json = None
+
+    def json(self) -> Any:
+        """Parsed body, parsed once per entry (recursive trees are large)"""
+        if self._json is None:
+            self._json = json.loads(self.body)
+        return self._json
+
+
+class ResponseCache:
+    """
+    Two-tier response cache keyed by request URL (trees and blobs carry their
+    sha in the URL). Without s3/bucket it is memory-only. Cache errors never
+    fail a fetch: a broken S3 read is a miss, a broken write is logged.
+    """
+
+    def __init__(
+        self,
+        s3=None,
+        bucket: Optional[str] = None,
+        prefix: str = CACHE_PREFIX,
+        max_memory_bytes: int = MAX_MEMORY_BYTES,
+        max_entry_bytes: int = MAX_ENTRY_BYTES
+    ):
+        self.s3 = s3
+        self.bucket = bucket
+        self.prefix = prefix
+        self.max_memory_bytes = max_memory_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "s3_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @property
+    def persistent(self) -> bool:
+        return bool(self.s3 and self.bucket)
+
+    def _key(self, url: str) -> str:
+        digest = hashlib.sha256(url.encode()).hexdigest()
+        return f"{self.prefix}{digest[:2]}/{digest}"
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _remember(self, url: str, entry: CachedResponse) -> None:
+        size = len(entry.body)
+        if size > self.max_memory_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(url, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous.body)
+            self._entries[url] = entry
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._memory_bytes -= len(evicted.body)
+                self.stats["evictions"] += 1
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+                self.stats["memory_hits"] += 1
+                entry.source = "memory"
+                return entry
+
+        if self.persistent:
+            try:
+                obj = self.s3.get_object(Bucket=self.bucket, Key=self._key(url))
+                body = gzip.decompress(obj["Body"].read())
+                entry = CachedResponse(obj.get("Metadata", {}).get("etag") or None, body, "s3")
+                self._remember(url, entry)
+                self._count("s3_hits")
+                return entry
+            except Exception as e:
+                if "NoSuchKey" not in type(e).__name__ and "NoSuchKey" not in str(e):
+                    print(f"⚠️ GitHub cache read failed ({url}): {e}")
+
+        self._count("misses")
+        return None
+
+    def put(self, url: str, etag: Optional[str], body: bytes) -> None:
+        if len(body) > self.max_entry_bytes:
+            return
+        self._remember(url, CachedResponse(etag, body, "memory"))
+        self._count("stores")
+
+        if self.persistent:
+            try:
+                self.s3.put_object(
+                    Bucket=self.bucket,
+                    Key=self._key(url),
+                    Body=gzip.compress(body, compresslevel=6),
+                    ContentType="application/gzip",
+                    Metadata={"etag": etag or "", "url": url[:1024]}
+                )
+            except Exception as e:
+                print(f"⚠️ GitHub cache write failed ({url}): {e}")
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats, memory_entries=len(self._entries), memory_bytes=self._memory_bytes)
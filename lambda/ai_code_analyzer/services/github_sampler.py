@@ -0,0 +1,139 @@
+"""
+GitHub key-file sampler
+Tree 에서 배포에 중요한 파일 (manifest, entrypoint, 기존 Dockerfile 등) 을 골라서
+blob API 로 병렬 다운로드합니다. 응답은 ETag 와 함께 캐시해두고 (services/github_cache.py)
+If-None-Match 로 재검증하므로, 바뀌지 않은 파일은 rate limit 을 소모하지 않습니다 (304).
+Blob 은 sha 로 주소가 정해지므로 캐시에 있으면 요청 자체를 하지 않습니다.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from analyzers.project_detector import LOCKFILES
+from analyzers.repo_summarizer import file_relevance
+from services.github_cache import ResponseCache
+
+# Sampling limits
+MAX_SAMPLE_FILES = 12
+MAX_SAMPLE_BYTES = 64 * 1024
+MAX_TOTAL_SAMPLE_BYTES = 256 * 1024
+# Relevance below this is not worth a request (plain .tf files, deep configs, ...)
+MIN_SAMPLE_RELEVANCE = 50
+
+RAW_MEDIA_TYPE = "application/vnd.github.raw"
+
+# Used when the caller does not pass a (persistent) cache
+memory_cache = ResponseCache()
+
+
+def conditional_get(
+    session,
+    url: str,
+    headers: Dict[str, str],
+    raw: bool = False,
+    immutable: bool = False,
+    timeout: int = 10,
+    cache: Optional[ResponseCache] = None
+) -> Optional[Any]:
+    """
+    GET url (parsed JSON, or bytes with raw=True), revalidating a cached copy
+    with If-None-Match. immutable URLs (addressed by sha) are served from
+    cache without a request. Returns None on 404; other errors raise.
+    """
+    cache = cache or memory_cache
+    cached = cache.get(url)
+    if cached is not None and immutable:
+        return cached.body if raw else cached.json()
+
+    request_headers = dict(headers)
+    if raw:
+        request_headers["Accept"] = RAW_MEDIA_TYPE
+    if cached is not None and cached.etag:
+        request_headers["If-None-Match"] = cached.etag
+
+    resp = session.get(url, headers=request_headers, timeout=timeout)
+    if resp.status_code == 304 and cached is not None:
+        return cached.body if raw else cached.json()
+    if resp.status_code == 404:
+        return None
+    resp.raise_for_status()
+
+    cache.put(url, resp.headers.get("ETag"), resp.content)
+    return resp.content if raw else resp.json()
+
+
+def sample_priority(path: str, size: int) -> int:
+    """Relevance of path as a file sample (0 = do not sample)"""
+    name = path.rpartition("/")[2]
+    if name in LOCKFILES or name.upper().startswith("README") or size > MAX_SAMPLE_BYTES:
+        return 0
+    score = file_relevance(path)
+    return score if score >= MIN_SAMPLE_RELEVANCE else 0
+
+
+def select_sample_paths(
+    tree_items: List[Dict[str, Any]],
+    max_files: int = MAX_SAMPLE_FILES
+) -> List[Dict[str, Any]]:
+    """
+    Most deployment-relevant blobs of a git tree, within the size limits.
+    Lockfiles and READMEs are skipped (the name says enough / fetched separately).
+    """
+    ranked = []
+    for item in tree_items:
+        if item.get("type") != "blob":
+            continue
+        score = sample_priority(item["path"], item.get("size") or 0)
+        if score:
+            ranked.append((-score, item["path"], item))
+
+    ranked.sort(key=lambda entry: entry[:2])
+    selected, total = [], 0
+    for _, _, item in ranked:
+        if len(selected) >= max_files:
+            break
+        size = item.get("size") or 0
+        if total + size > MAX_TOTAL_SAMPLE_BYTES:
+            continue
+        selected.append(item)
+        total += size
+    return selected
+
+
+def _decode(body: bytes) -> Optional[str]:
+    if b"\0" in body[:1024]:
+        return None
+    try:
+        return body.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+def fetch_samples(
+    session,
+    api_base: str,
+    repository: str,
+    items: List[Dict[str, Any]],
+    headers: Dict[str, str],
+    pool: Optional[ThreadPoolExecutor] = None,
+    cache: Optional[ResponseCache] = None
+) -> Dict[str, str]:
+    """
+    Download the given tree items through the blob API, concurrently.
+    Files that fail to download or are not UTF-8 text are left out.
+    """
+    def fetch(item: Dict[str, Any]) -> Optional[str]:
+        url = f"{api_base}/repos/{repository}/git/blobs/{item['sha']}"
+        try:
+            body = conditional_get(session, url, headers, raw=True, immutable=True, cache=cache)
+        except Exception as e:
+            print(f"⚠️ Could not fetch {item['path']}: {e}")
+            return None
+        return _decode(body) if body is not None else None
+
+    if pool is None:
+        with ThreadPoolExecutor(max_workers=max(1, min(len(items), MAX_SAMPLE_FILES))) as own_pool:
+            contents = list(own_pool.map(fetch, items))
+    else:
+        contents = list(pool.map(fetch, items))
+
+    return {item["path"]: content for item, content in zip(items, contents) if content is not None}
@@ -0,0 +1,166 @@
+"""
+GitHub tarball ingestion
+Tree / README / blob API 를 따로 부르는 대신 commit archive 를 한 번 받아서, 디스크에
+풀지 않고 tarfile 스트림으로 한 번만 훑으면서 file list / README / 주요 파일 내용 /
+크기 통계를 만듭니다. 메모리에 남는 건 sample 로 고른 파일들 (개수/크기 제한) 뿐이고,
+큰 binary 나 vendored 디렉토리는 읽지 않고 건너뜁니다.
+"""
+import heapq
+import tarfile
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from analyzers.project_detector import IGNORED_DIRS
+from services.github_sampler import MAX_SAMPLE_FILES, MAX_TOTAL_SAMPLE_BYTES, sample_priority
+
+# Abort (and fall back to the API) past this many compressed bytes
+MAX_ARCHIVE_BYTES = 200 * 1024 * 1024
+MAX_README_BYTES = 256 * 1024
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# Never read, whatever their name says
+BINARY_EXTENSIONS = {
+    "png", "jpg", "jpeg", "gif", "webp", "ico", "svg", "pdf", "zip", "gz", "tgz", "bz2", "xz", "7z",
+    "jar", "war", "class", "so", "dll", "dylib", "exe", "bin", "o", "a", "pyc", "wasm",
+    "mp3", "mp4", "mov", "woff", "woff2", "ttf", "otf", "eot", "psd", "sqlite", "db", "parquet",
+}
+
+README_NAMES = ("README.md", "README.rst", "README.txt", "README")
+
+
+class ArchiveTooLarge(Exception):
+    """The archive exceeded MAX_ARCHIVE_BYTES while streaming"""
+
+
+class _BoundedStream:
+    """File-like view of an HTTP response that counts (and caps) bytes read"""
+
+    def __init__(self, raw, limit: int):
+        self._raw = raw
+        self._limit = limit
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._raw.read(STREAM_CHUNK_BYTES if size is None or size < 0 else size)
+        self.bytes_read += len(chunk)
+        if self.bytes_read > self._limit:
+            raise ArchiveTooLarge(f"archive larger than {self._limit // (1024 * 1024)} MiB")
+        return chunk
+
+
+def _extension(name: str) -> str:
+    return name.rpartition(".")[2].lower() if "." in name[1:] else ""
+
+
+def ingest_archive(stream, max_sample_files: int = MAX_SAMPLE_FILES) -> Dict[str, Any]:
+    """
+    Single pass over a .tar.gz stream (GitHub archive layout: one top-level
+    "owner-repo-sha/" directory, stripped from every path).
+
+    Returns {"file_list", "readme_content", "file_samples", "file_sizes", "repo_stats"}.
+    """
+    file_list: List[str] = []
+    file_sizes: Dict[str, int] = {}
+    readme: Tuple[int, str] = (len(README_NAMES), "")
+    # Min-heap of (priority, path, content): the lowest-priority sample is evicted first
+    samples: List[Tuple[int, str, str]] = []
+    sample_bytes = 0
+    bytes_by_extension: Counter = Counter()
+    largest: List[Tuple[int, str]] = []
+    total_bytes = skipped_binaries = 0
+
+    with tarfile.open(fileobj=stream, mode="r|gz") as archive:
+        for member in archive:
+            # Stream mode still appends every TarInfo to archive.members; keep memory flat
+            archive.members = []
+            if not member.isfile():
+                continue
+            path = member.name.partition("/")[2]
+            if not path:
+                continue
+            file_list.append(path)
+
+            size = member.size
+            file_sizes[path] = size
+            directory, _, name = path.rpartition("/")
+            extension = _extension(name)
+            total_bytes += size
+            bytes_by_extension[extension or "(none)"] += size
+            if len(largest) < 10:
+                heapq.heappush(largest, (size, path))
+            elif size > largest[0][0]:
+                heapq.heapreplace(largest, (size, path))
+
+            if extension in BINARY_EXTENSIONS:
+                skipped_binaries += 1
+                continue
+
+            # Root README (README.md preferred)
+            if not directory and name in README_NAMES and size <= MAX_README_BYTES:
+                rank = README_NAMES.index(name)
+                if rank < readme[0]:
+                    content = _read_text(archive, member)
+                    if content is not None:
+                        readme = (rank, content)
+                continue
+
+            priority = sample_priority(path, size)
+            if not priority or (directory and not IGNORED_DIRS.isdisjoint(directory.split("/"))):
+                continue
+            if len(samples) >= max_sample_files and priority <= samples[0][0]:
+                continue
+            content = _read_text(archive, member)
+            if content is None:
+                continue
+            heapq.heappush(samples, (priority, path, content))
+            sample_bytes += len(content)
+            while len(samples) > max_sample_files or sample_bytes > MAX_TOTAL_SAMPLE_BYTES:
+                _, _, dropped = heapq.heappop(samples)
+                sample_bytes -= len(dropped)
+
+    return {
+        "file_list": file_list,
+        "readme_content": readme[1],
+        "file_samples": {path: content for _, path, content in sorted(samples, reverse=True)},
+        "file_sizes": file_sizes,
+        "repo_stats": {
+            "file_count": len(file_list),
+            "total_bytes": total_bytes,
+            "archive_bytes": getattr(stream, "bytes_read", None),
+            "bytes_by_extension": dict(bytes_by_extension.most_common(10)),
+            "largest_files": [{"path": path, "bytes": size} for size, path in sorted(largest, reverse=True)],
+            "skipped_binaries": skipped_binaries,
+        },
+    }
+
+
+def _read_text(archive: tarfile.TarFile, member: tarfile.TarInfo) -> Optional[str]:
+    extracted = archive.extractfile(member)
+    if extracted is None:
+        return None
+    body = extracted.read()
+    if b"\0" in body[:1024]:
+        return None
+    try:
+        return body.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+def fetch_repository_archive(
+    session,
+    api_base: str,
+    repository: str,
+    ref: str,
+    headers: Dict[str, str],
+    max_archive_bytes: int = MAX_ARCHIVE_BYTES,
+    timeout: int = 30
+) -> Dict[str, Any]:
+    """Download the tarball of ref and ingest it while it streams in"""
+    url = f"{api_base}/repos/{repository}/tarball/{ref}"
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as resp:
+        resp.raise_for_status()
+        # Undo any transfer Content-Encoding; the archive's own gzip layer is left to tarfile
+        resp.raw.decode_content = True
+        stream = _BoundedStream(resp.raw, max_archive_bytes)
+        return ingest_archive(stream)
@@ -0,0 +1,233 @@
+"""
+LLM response cache
+프레임워크 / manifest / README 가 비슷한 repository 들은 거의 같은 prompt 를 만들기 때문에,
+prompt 를 정규화한 뒤 hash 를 key 로 응답 (project_info JSON, spec 본문) 을 재사용합니다.
+  - 정규화: repository 이름 제거, 공백 정리, file structure 블록 정렬
+    (할당된 app port 는 호출하는 쪽이 prompt 에 PORT_PLACEHOLDER 로 남겨둡니다)
+  - 저장 전 응답 안의 repository 이름과 port 는 placeholder 로 바꾸고, 꺼낼 때 현재 값으로 되돌립니다
+  - warm container 메모리 + S3 (llm-cache/ prefix), 종류별 TTL
+동시 실행에 안전한 이유: entry 는 객체 하나를 통째로 쓰고 (S3 PUT 은 atomic) 수정하지
+않습니다. 같은 key 를 두 invocation 이 동시에 쓰면 둘 다 유효한 응답이라 마지막 것이 남을 뿐입니다.
+"""
+import gzip
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+CACHE_PREFIX = "llm-cache/"
+# Bump when prompts change in a way normalization cannot see (e.g. output format)
+CACHE_VERSION = 1
+
+DEFAULT_TTLS = {
+    "analysis": 7 * 24 * 3600,
+    "specs": 3 * 24 * 3600,
+}
+MAX_MEMORY_ENTRIES = 256
+
+REPOSITORY_PLACEHOLDER = "{{repository}}"
+REPOSITORY_NAME_PLACEHOLDER = "{{repository_name}}"
+PORT_PLACEHOLDER = "{{app_port}}"
+# Bare repository names shorter than this ("api", "app") are too common to strip
+MIN_NAME_LENGTH = 4
+# Ports below this ("80", "443") are too common as plain numbers to strip
+MIN_STRIPPED_PORT = 1024
+
+# Fenced blocks under these headings are file listings: order carries no meaning
+SORTED_SECTIONS = ("File Structure",)
+
+_HEADING = re.compile(r"^#+\s*(.+)$")
+_SPACES = re.compile(r"[ \t]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def _patterns(repository: str, port: Optional[int]) -> List[tuple]:
+    """(regex, placeholder) pairs: full name, bare repository name, app port"""
+    patterns = []
+    if repository:
+        patterns.append((re.compile(re.escape(repository), re.IGNORECASE), REPOSITORY_PLACEHOLDER))
+        name = repository.rpartition("/")[2]
+        if len(name) >= MIN_NAME_LENGTH:
+            patterns.append((
+                re.compile(rf"(?<![\w-]){re.escape(name)}(?![\w-])", re.IGNORECASE),
+                REPOSITORY_NAME_PLACEHOLDER
+            ))
+    if port and int(port) >= MIN_STRIPPED_PORT:
+        patterns.append((re.compile(rf"(?<![\d.]){int(port)}(?![\d.])"), PORT_PLACEHOLDER))
+    return patterns
+
+
+def strip_repository(text: str, repository: str, port: Optional[int] = None) -> str:
+    """
+    Replace the repository's full and bare names with placeholders, and the
+    app port too when given (every repository gets its own allocated port)
+    """
+    for pattern, placeholder in _patterns(repository, port):
+        text = pattern.sub(placeholder, text)
+    return text
+
+
+def restore_repository(text: str, repository: str, port: Optional[int] = None) -> str:
+    """Inverse of strip_repository for a (possibly different) repository / port"""
+    if repository:
+        text = (text.replace(REPOSITORY_PLACEHOLDER, repository)
+                    .replace(REPOSITORY_NAME_PLACEHOLDER, repository.rpartition("/")[2]))
+    if port:
+        text = text.replace(PORT_PLACEHOLDER, str(int(port)))
+    return text
+
+
+def _sort_listings(text: str, sections: Iterable[str]) -> str:
+    """Sort the lines of the first fenced block after each listed heading"""
+    lines = text.split("\n")
+    in_section = False
+    index = 0
+    while index < len(lines):
+        heading = _HEADING.match(lines[index])
+        if heading:
+            in_section = any(section in heading.group(1) for section in sections)
+        elif in_section and lines[index].startswith("```"):
+            end = index + 1
+            while end < len(lines) and not lines[end].startswith("```"):
+                end += 1
+            lines[index + 1:end] = sorted(lines[index + 1:end])
+            in_section = False
+            index = end
+        index += 1
+    return "\n".join(lines)
+
+
+def normalize_text(text: str, repository: str = "", sections: Iterable[str] = SORTED_SECTIONS) -> str:
+    text = strip_repository(text, repository)
+    text = "\n".join(_SPACES.sub(" ", line).strip() for line in text.split("\n"))
+    text = _sort_listings(text, sections)
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+def prompt_key(
+    kind: str,
+    model: str,
+    messages: List[Dict[str, str]],
+    repository: str = "",
+    temperature: Optional[float] = None,
+    response_format: Optional[Dict[str, Any]] = None
+) -> str:
+    """sha256 over everything that shapes the completion, after normalization"""
+    payload = {
+        "v": CACHE_VERSION,
+        "kind": kind,
+        "model": model,
+        "temperature": temperature,
+        "response_format": response_format,
+        "messages": [
+            {"role": message["role"], "content": normalize_text(message["content"], repository)}
+            for message in messages
+        ],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier LLM response cache. Without s3/bucket it is memory-only.
+    Cache errors never fail a completion: a broken read is a miss, a broken write is logged.
+    """
+
+    def __init__(
+        self,
+        s3=None,
+        bucket: Optional[str] = None,
+        prefix: str = CACHE_PREFIX,
+        ttls: Optional[Dict[str, int]] = None,
+        max_memory_entries: int = MAX_MEMORY_ENTRIES
+    ):
+        self.s3 = s3
+        self.bucket = bucket
+        self.prefix = prefix
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_memory_entries = max_memory_entries
+        # key -> (expires_at, stripped body)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "memory_hits": 0, "s3_hits": 0, "misses": 0, "stores": 0, "expired": 0}
+
+    @property
+    def persistent(self) -> bool:
+        return bool(self.s3 and self.bucket)
+
+    def _object_key(self, kind: str, key: str) -> str:
+        return f"{self.prefix}{kind}/{key[:2]}/{key}"
+
+    def _count(self, *stats: str) -> None:
+        with self._lock:
+            for stat in stats:
+                self.stats[stat] += 1
+
+    def _remember(self, key: str, expires_at: float, body: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (expires_at, body)
+            while len(self._entries) > self.max_memory_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, kind: str, key: str, repository: str = "", port: Optional[int] = None) -> Optional[str]:
+        """Cached response for key with repository names (and port) restored, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self.stats["expired"] += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                self.stats["memory_hits"] += 1
+                return restore_repository(entry[1], repository, port)
+
+        if self.persistent:
+            try:
+                obj = self.s3.get_object(Bucket=self.bucket, Key=self._object_key(kind, key))
+                stored = json.loads(gzip.decompress(obj["Body"].read()))
+                if stored.get("key") == key and stored.get("expires_at", 0) > now:
+                    self._remember(key, stored["expires_at"], stored["body"])
+                    self._count("hits", "s3_hits")
+                    return restore_repository(stored["body"], repository, port)
+                self._count("expired")
+            except Exception as e:
+                if "NoSuchKey" not in type(e).__name__ and "NoSuchKey" not in str(e):
+                    print(f"⚠️ LLM cache read failed ({kind}/{key[:12]}): {e}")
+
+        self._count("misses")
+        return None
+
+    def put(self, kind: str, key: str, body: str, repository: str = "", port: Optional[int] = None) -> None:
+        """Store body (repository names and port stripped) for ttls[kind] seconds"""
+        stripped = strip_repository(body, repository, port)
+        expires_at = time.time() + self.ttls.get(kind, DEFAULT_TTLS["specs"])
+        self._remember(key, expires_at, stripped)
+        self._count("stores")
+
+        if self.persistent:
+            try:
+                payload = {"key": key, "kind": kind, "expires_at": expires_at, "body": stripped}
+                self.s3.put_object(
+                    Bucket=self.bucket,
+                    Key=self._object_key(kind, key),
+                    Body=gzip.compress(json.dumps(payload).encode(), compresslevel=6),
+                    ContentType="application/gzip"
+                )
+            except Exception as e:
+                print(f"⚠️ LLM cache write failed ({kind}/{key[:12]}): {e}")
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return dict(
+                self.stats,
+                hit_rate=round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+                memory_entries=len(self._entries)
+            )
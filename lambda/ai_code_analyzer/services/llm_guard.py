@@ -0,0 +1,292 @@
+"""
+LLM call guard
+OpenAI 호출을 고정 900초 timeout 하나로 기다리는 대신:
+  - 최근 응답 시간의 p99 로 read timeout 을 정하고 (샘플이 모자라면 max_read_timeout)
+  - 429 / 5xx / 연결 오류는 jitter 를 준 exponential backoff 로 재시도 (Retry-After 존중)
+  - 선택적으로, 응답이 p95 보다 늦으면 같은 요청을 하나 더 보내서 먼저 온 응답을 씁니다 (hedging)
+  - 재시도까지 실패가 이어지면 circuit breaker 가 열려서 cooldown 동안은 호출하지 않습니다
+    (handler 는 그동안 template / fallback spec 으로 생성합니다)
+상태는 warm container 메모리에만 있습니다.
+"""
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import requests
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+LATENCY_WINDOW = 200
+# p99 over fewer samples than this is noise; max_read_timeout is used instead
+MIN_LATENCY_SAMPLES = 20
+
+
+class CircuitOpenError(Exception):
+    """The provider failed repeatedly; calls are refused until the cooldown ends"""
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Throttling, server errors, timeouts and dropped connections are worth another try"""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    value = response.headers.get("Retry-After") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class LatencyTracker:
+    """Sliding window of call latencies (seconds) per call kind"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples: Dict[str, Deque[float]] = {}
+        self._window = window
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(kind, deque(maxlen=self._window)).append(seconds)
+
+    def percentile(self, kind: str, pct: float, min_samples: int = MIN_LATENCY_SAMPLES) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(kind, ()))
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * pct))]
+
+    def count(self, kind: str) -> int:
+        with self._lock:
+            return len(self._samples.get(kind, ()))
+
+
+class CircuitBreaker:
+    """
+    closed -> open after failure_threshold consecutive failed calls;
+    open -> half-open after cooldown (one probe call allowed);
+    half-open -> closed on success, open again on failure.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 120.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+
+    @property
+    def degraded(self) -> bool:
+        """True while calls would be refused (open, or half-open with the probe in flight)"""
+        with self._lock:
+            state = self._state()
+            return state == "open" or (state == "half_open" and self._probing)
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def release(self) -> None:
+        """The call proved nothing either way: state unchanged, a half-open probe may be retried"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._probing:
+                    print(f"⚠️ LLM provider circuit opened for {self.cooldown:.0f}s "
+                          f"after {self._failures} failed calls")
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class LLMCallGuard:
+    """
+    Runs send(timeout) with latency-derived timeouts, retries, optional
+    hedging and a circuit breaker. send gets a requests-style
+    (connect, read) timeout tuple and performs exactly one HTTP request.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = 5.0,
+        min_read_timeout: float = 30.0,
+        max_read_timeout: float = 300.0,
+        p99_multiplier: float = 2.0,
+        max_attempts: int = 3,
+        backoff_base: float = 1.0,
+        backoff_max: float = 20.0,
+        call_budget: float = 600.0,
+        hedge: bool = False,
+        breaker: Optional[CircuitBreaker] = None,
+        latencies: Optional[LatencyTracker] = None
+    ):
+        self.connect_timeout = connect_timeout
+        self.min_read_timeout = min_read_timeout
+        self.max_read_timeout = max_read_timeout
+        self.p99_multiplier = p99_multiplier
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.call_budget = call_budget
+        self.hedge = hedge
+        self.breaker = breaker or CircuitBreaker()
+        self.latencies = latencies or LatencyTracker()
+        self.stats = {"calls": 0, "retries": 0, "hedged": 0, "hedge_wins": 0, "failures": 0, "rejected": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    @property
+    def degraded(self) -> bool:
+        return self.breaker.degraded
+
+    def read_timeout(self, kind: str) -> float:
+        p99 = self.latencies.percentile(kind, 0.99)
+        if p99 is None:
+            return self.max_read_timeout
+        return min(self.max_read_timeout, max(self.min_read_timeout, p99 * self.p99_multiplier))
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        # Full jitter, unless the provider said how long to wait
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _hedged(self, send: Callable[[Tuple[float, float]], Any], kind: str, timeout: Tuple[float, float]) -> Any:
+        """First result of send, with a second request racing it after the p95 latency"""
+        hedge_after = self.latencies.percentile(kind, 0.95)
+        if hedge_after is None:
+            return send(timeout)
+
+        # Not a context manager: the losing request is left to finish (or time out) on its own
+        pool = ThreadPoolExecutor(max_workers=2)
+        try:
+            primary = pool.submit(send, timeout)
+            done, _ = wait([primary], timeout=hedge_after)
+            if done:
+                return primary.result()
+
+            self._count("hedged")
+            backup = pool.submit(send, timeout)
+            pending = {primary, backup}
+            error = None
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is backup:
+                            self._count("hedge_wins")
+                        return future.result()
+                    error = future.exception()
+            raise error
+        finally:
+            pool.shutdown(wait=False)
+
+    def call(
+        self,
+        send: Callable[[Tuple[float, float]], Any],
+        kind: str,
+        observe: bool = True,
+        retryable: Callable[[Exception], bool] = is_retryable,
+        hedge: Optional[bool] = None
+    ) -> Any:
+        """
+        Run send under the guard. observe=False leaves latency recording to
+        the caller (streaming records time to first byte via record()).
+        hedge overrides the guard's setting for this call: send with side
+        effects (streaming into a shared buffer) must not run twice at once.
+        Raises CircuitOpenError without calling send while the circuit is open.
+        """
+        hedge = self.hedge if hedge is None else hedge
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError("LLM provider circuit is open")
+
+        self._count("calls")
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            timeout = (self.connect_timeout, self.read_timeout(kind))
+            attempt_started = time.monotonic()
+            try:
+                result = self._hedged(send, kind, timeout) if hedge else send(timeout)
+            except Exception as e:
+                if not retryable(e):
+                    status = _status_code(e)
+                    if is_retryable(e):
+                        self.breaker.record_failure()
+                    elif status is not None and 400 <= status < 500:
+                        # The provider answered: a client error (bad request, auth) shows it is up
+                        self.breaker.record_success()
+                    else:
+                        # Malformed bodies / unexpected exceptions say nothing about provider health
+                        self.breaker.release()
+                    raise
+
+                attempt += 1
+                delay = self._backoff(attempt, e)
+                elapsed = time.monotonic() - started
+                if attempt >= self.max_attempts or elapsed + delay + timeout[1] > self.call_budget:
+                    self._count("failures")
+                    self.breaker.record_failure()
+                    raise
+                self._count("retries")
+                print(f"⚠️ LLM call failed ({e}); retry {attempt}/{self.max_attempts - 1} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            if observe:
+                self.latencies.record(kind, time.monotonic() - attempt_started)
+            self.breaker.record_success()
+            return result
+
+    def record(self, kind: str, seconds: float) -> None:
+        self.latencies.record(kind, seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats, circuit=self.breaker.state)
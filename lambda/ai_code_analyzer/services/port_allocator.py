@@ -0,0 +1,156 @@
+"""
+Port / ALB listener priority allocator
+DynamoDB conditional write 로 repository 마다 container port 와 listener rule priority 를
+예약합니다. 분석이 동시에 여러 개 돌아도 두 repository 가 같은 값을 가져가지 않습니다.
+
+Table layout (hash key "resource"):
+  port#8001              -> {"repository": owner, ...}
+  priority#317           -> {"repository": owner, ...}
+  repository#owner/repo  -> {"port", "listener_priority", "requested_port", ...}
+"""
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional
+
+from botocore.exceptions import ClientError
+
+PORT_PREFIX = "port#"
+PRIORITY_PREFIX = "priority#"
+OWNER_PREFIX = "repository#"
+
+# Listener rule priorities handed out to user apps (same range user-apps.tf hashes into);
+# the platform's own listener rules (alb.tf: 40, 50, 100) sit below it
+PRIORITY_MIN = 1000
+PRIORITY_MAX = 49999
+
+PORT_MAX = 65535
+MAX_PORT_PROBES = 200
+
+
+class AllocationError(Exception):
+    """No free port or listener priority left to reserve"""
+
+
+def _owned_by(repository: str) -> Dict[str, Any]:
+    return {
+        "ExpressionAttributeNames": {"#owner": "repository"},
+        "ExpressionAttributeValues": {":repository": repository},
+    }
+
+
+def _claim(table, resource: str, repository: str, analysis_id: str) -> bool:
+    """Reserve resource for repository; True if it was free or already ours"""
+    try:
+        table.put_item(
+            Item={
+                "resource": resource,
+                "repository": repository,
+                "analysis_id": analysis_id,
+                "allocated_at": datetime.now(timezone.utc).isoformat(),
+            },
+            ConditionExpression="attribute_not_exists(#resource) OR #owner = :repository",
+            ExpressionAttributeNames={"#resource": "resource", "#owner": "repository"},
+            ExpressionAttributeValues={":repository": repository},
+        )
+        return True
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+            return False
+        raise
+
+
+def _release(table, resource: str, repository: str) -> None:
+    """Delete resource if (and only if) repository still owns it"""
+    try:
+        table.delete_item(
+            Key={"resource": resource},
+            ConditionExpression="#owner = :repository",
+            **_owned_by(repository),
+        )
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+            raise
+
+
+def priority_candidates(repository: str) -> Iterator[int]:
+    """
+    Probe order for listener priorities: start at a hash of the repository
+    and wrap around the range, so a repository lands on the same priority
+    every time it is free.
+    """
+    size = PRIORITY_MAX - PRIORITY_MIN + 1
+    start = int(hashlib.md5(repository.encode()).hexdigest()[:8], 16) % size
+    for offset in range(size):
+        yield PRIORITY_MIN + (start + offset) % size
+
+
+def _claim_port(table, repository: str, preferred_port: int, analysis_id: str) -> int:
+    for port in range(preferred_port, min(preferred_port + MAX_PORT_PROBES, PORT_MAX + 1)):
+        if _claim(table, f"{PORT_PREFIX}{port}", repository, analysis_id):
+            return port
+    raise AllocationError(f"No free port in {preferred_port}-{preferred_port + MAX_PORT_PROBES - 1}")
+
+
+def _claim_priority(table, repository: str, analysis_id: str) -> int:
+    for priority in priority_candidates(repository):
+        if _claim(table, f"{PRIORITY_PREFIX}{priority}", repository, analysis_id):
+            return priority
+    raise AllocationError(f"All listener priorities {PRIORITY_MIN}-{PRIORITY_MAX} are taken")
+
+
+def get_allocation(table, repository: str) -> Optional[Dict[str, int]]:
+    """Current allocation of repository, or None"""
+    item = table.get_item(
+        Key={"resource": f"{OWNER_PREFIX}{repository}"},
+        ConsistentRead=True,
+    ).get("Item")
+    if not item:
+        return None
+    return {
+        "port": int(item["port"]),
+        "listener_priority": int(item["listener_priority"]),
+        "requested_port": int(item.get("requested_port", item["port"])),
+    }
+
+
+def allocate(table, repository: str, preferred_port: int, analysis_id: str) -> Dict[str, int]:
+    """
+    Reserve a port (first free one >= preferred_port) and a listener priority.
+    Idempotent per repository: the existing reservation is returned as long as
+    the app still asks for the same port; a new port request keeps the priority
+    and moves the port reservation.
+    """
+    preferred_port = int(preferred_port or 8000)
+    current = get_allocation(table, repository)
+    if current and current["requested_port"] == preferred_port:
+        return current
+
+    port = _claim_port(table, repository, preferred_port, analysis_id)
+    priority = current["listener_priority"] if current else _claim_priority(table, repository, analysis_id)
+
+    table.put_item(Item={
+        "resource": f"{OWNER_PREFIX}{repository}",
+        "repository": repository,
+        "port": port,
+        "listener_priority": priority,
+        "requested_port": preferred_port,
+        "analysis_id": analysis_id,
+        "allocated_at": datetime.now(timezone.utc).isoformat(),
+    })
+
+    if current and current["port"] != port:
+        _release(table, f"{PORT_PREFIX}{current['port']}", repository)
+
+    return {"port": port, "listener_priority": priority, "requested_port": preferred_port}
+
+
+def release(table, repository: str) -> Optional[Dict[str, int]]:
+    """Free everything repository holds (on teardown); returns what was released"""
+    current = get_allocation(table, repository)
+    if not current:
+        return None
+
+    _release(table, f"{PORT_PREFIX}{current['port']}", repository)
+    _release(table, f"{PRIORITY_PREFIX}{current['listener_priority']}", repository)
+    _release(table, f"{OWNER_PREFIX}{repository}", repository)
+    return current
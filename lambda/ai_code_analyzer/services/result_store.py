@@ -0,0 +1,134 @@
+"""
+Analysis result storage
+AI analysis table 의 item 을 작게 유지합니다. 큰 필드 (specs: Dockerfile, Terraform,
+AppSpec, BuildSpec, recommendations markdown) 는 크기에 따라:
+  - 작으면 지금처럼 JSON 문자열로 inline                      ({field})
+  - 크면 gzip 해서 binary attribute 로                        ({field}_gz)
+  - 압축해도 크면 S3 object 로 올리고 item 에는 pointer 만     ({field}_ref = s3://bucket/key)
+item 에는 필드별 compact summary ({field}_sizes: 항목 이름 -> byte 수) 를 같이 둬서
+dashboard scan 이나 cache 재사용 판단은 본문을 풀지 않고 할 수 있고,
+본문은 load_field 로 필요할 때만 읽습니다 (기존 inline item 도 그대로 읽힘).
+
+Keys (expired by a bucket lifecycle rule, like the item TTL):
+  analysis-results/{analysis_id}/{field}.json.gz
+"""
+import gzip
+import json
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+# Inline JSON up to this size; the common case (a few KB of specs) stays readable in the console
+INLINE_BYTES = 8 * 1024
+# Compressed binary attribute up to this size, S3 beyond it
+BINARY_BYTES = 96 * 1024
+# DynamoDB rejects items over 400 KB (attribute names count too)
+MAX_ITEM_BYTES = 400 * 1024
+
+CONTENT_TYPE = "application/json"
+CONTENT_ENCODING = "gzip"
+
+
+class ItemTooLargeError(ValueError):
+    """The item exceeds the DynamoDB limit even with every large field offloaded"""
+
+
+def result_key(analysis_id: str, field: str) -> str:
+    return f"analysis-results/{analysis_id}/{field}.json.gz"
+
+
+def _attribute_size(value: Any) -> int:
+    """Approximate DynamoDB size of an attribute value"""
+    if value is None or isinstance(value, bool):
+        return 1
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (int, float, Decimal)):
+        return len(str(value)) // 2 + 1
+    if isinstance(value, dict):
+        return 3 + sum(len(k.encode("utf-8")) + _attribute_size(v) + 1 for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return 3 + sum(_attribute_size(v) + 1 for v in value)
+    return len(str(getattr(value, "value", value)).encode("utf-8"))
+
+
+def item_size(item: Dict[str, Any]) -> int:
+    return sum(len(name.encode("utf-8")) + _attribute_size(value) for name, value in item.items())
+
+
+def _sizes(value: Any) -> Dict[str, int]:
+    if not isinstance(value, dict):
+        return {}
+    return {
+        name: len((content if isinstance(content, str) else json.dumps(content)).encode("utf-8"))
+        for name, content in value.items() if content
+    }
+
+
+def pack_item(
+    item: Dict[str, Any],
+    fields: Dict[str, Any],
+    s3=None,
+    bucket: Optional[str] = None,
+    inline_bytes: int = INLINE_BYTES,
+    binary_bytes: int = BINARY_BYTES
+) -> Dict[str, Any]:
+    """
+    Add fields to item as inline JSON, gzip binary or an S3 pointer, by size.
+    Without s3/bucket nothing is offloaded to S3. Raises ItemTooLargeError
+    when the packed item is still over the DynamoDB limit.
+    """
+    packed = dict(item)
+    for field, value in fields.items():
+        body = json.dumps(value).encode("utf-8")
+        packed[f"{field}_sizes"] = json.dumps(_sizes(value))
+        if len(body) <= inline_bytes:
+            packed[field] = body.decode("utf-8")
+            continue
+
+        compressed = gzip.compress(body, compresslevel=6, mtime=0)
+        if len(compressed) <= binary_bytes or not (s3 and bucket):
+            packed[f"{field}_gz"] = compressed
+            continue
+
+        key = result_key(packed["analysis_id"], field)
+        s3.put_object(
+            Bucket=bucket, Key=key, Body=compressed,
+            ContentType=CONTENT_TYPE, ContentEncoding=CONTENT_ENCODING
+        )
+        packed[f"{field}_ref"] = f"s3://{bucket}/{key}"
+
+    size = item_size(packed)
+    if size > MAX_ITEM_BYTES:
+        raise ItemTooLargeError(f"analysis item is {size} bytes after packing (limit {MAX_ITEM_BYTES})")
+    return packed
+
+
+def field_sizes(item: Dict[str, Any], field: str) -> Dict[str, int]:
+    """Summary of a packed field (entry name -> bytes) without loading it"""
+    summary = item.get(f"{field}_sizes")
+    if summary is not None:
+        try:
+            return json.loads(summary) if isinstance(summary, str) else dict(summary)
+        except json.JSONDecodeError:
+            return {}
+    # Items written before packing carry the field inline
+    return _sizes(load_field(item, field))
+
+
+def load_field(item: Dict[str, Any], field: str, s3=None, default: Any = None) -> Any:
+    """Field value from whichever representation the item has (S3 needs a client)"""
+    try:
+        if field in item:
+            value = item[field]
+            return json.loads(value) if isinstance(value, str) else value
+        if f"{field}_gz" in item:
+            compressed = item[f"{field}_gz"]
+            # boto3 returns binary attributes wrapped in boto3.dynamodb.types.Binary
+            return json.loads(gzip.decompress(bytes(getattr(compressed, "value", compressed))))
+        if f"{field}_ref" in item and s3 is not None:
+            bucket, _, key = item[f"{field}_ref"][len("s3://"):].partition("/")
+            body = s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+            return json.loads(gzip.decompress(body))
+    except (ValueError, OSError) as e:
+        print(f"⚠️ Could not load {field} of analysis {item.get('analysis_id')}: {e}")
+    return default
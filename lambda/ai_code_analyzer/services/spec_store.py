@@ -0,0 +1,218 @@
+"""
+Spec publishing
+생성된 spec 들을 S3 에 병렬로 올립니다. 모든 object 에 body 의 sha256 을 metadata 로
+붙여두고, 같은 key 에 같은 digest 가 이미 올라가 있으면 PUT 을 건너뜁니다 (재시도 / 캐시 재배포).
+Content addressing 이 아니라 key 단위의 "unchanged upload skip" 입니다: key 는 GitHub Actions 가
+polling 하는 analysis/{analysis_id}/{spec_name} 그대로라서, 내용이 같아도 analysis_id 가
+다르면 따로 저장됩니다.
+선택적으로 모든 spec + manifest.json 을 담은 bundle.tar.gz 하나를 같이 올려서
+GitHub Actions 가 GET 한 번으로 받을 수 있게 합니다.
+
+Keys:
+  analysis/{analysis_id}/{spec_name}
+  analysis/{analysis_id}/bundle.tar.gz   (dockerfile, terraform_tfvars, ..., manifest.json)
+"""
+import gzip
+import hashlib
+import io
+import json
+import tarfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from botocore.exceptions import ClientError
+
+DIGEST_METADATA = "sha256"
+BUNDLE_NAME = "bundle.tar.gz"
+MANIFEST_NAME = "manifest.json"
+
+# Uploaded last: GitHub Actions polls it as the "analysis complete" signal,
+# so everything else (including the bundle) must already be there
+COMPLETION_SPEC = "dockerfile"
+
+# (bucket, key) -> digest of what this container last wrote there
+_published_digests: Dict[tuple, str] = {}
+_published_lock = threading.Lock()
+MAX_PUBLISHED_DIGESTS = 2048
+
+
+def content_digest(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+def spec_key(analysis_id: str, name: str) -> str:
+    return f"analysis/{analysis_id}/{name}"
+
+
+def _remember(bucket: str, key: str, digest: str) -> None:
+    with _published_lock:
+        if len(_published_digests) >= MAX_PUBLISHED_DIGESTS:
+            _published_digests.clear()
+        _published_digests[(bucket, key)] = digest
+
+
+def _remote_digest(s3, bucket: str, key: str) -> Optional[str]:
+    """
+    sha256 metadata of an existing object, None if it does not exist.
+    Without s3:ListBucket a missing key answers 403 instead of 404, so any
+    client error just means "upload it".
+    """
+    try:
+        head = s3.head_object(Bucket=bucket, Key=key)
+    except ClientError:
+        return None
+    return head.get("Metadata", {}).get(DIGEST_METADATA)
+
+
+def _forget(bucket: str, key: str) -> None:
+    with _published_lock:
+        _published_digests.pop((bucket, key), None)
+
+
+def _known(bucket: str, key: str, digest: str) -> bool:
+    with _published_lock:
+        return _published_digests.get((bucket, key)) == digest
+
+
+def _put(s3, bucket: str, key: str, body: bytes, content_type: str, digest: str) -> None:
+    s3.put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=body,
+        ContentType=content_type,
+        Metadata={DIGEST_METADATA: digest}
+    )
+    _remember(bucket, key, digest)
+
+
+def put_if_changed(
+    s3,
+    bucket: str,
+    key: str,
+    body: bytes,
+    content_type: str = "text/plain",
+    check_remote: bool = True
+) -> bool:
+    """
+    PUT body unless this same key already holds the same content (the digest
+    is compared per key; identical bodies under other keys are not shared).
+    Returns True if it was uploaded, False if the upload was skipped.
+    """
+    digest = content_digest(body)
+    if _known(bucket, key, digest):
+        return False
+
+    if check_remote and _remote_digest(s3, bucket, key) == digest:
+        _remember(bucket, key, digest)
+        return False
+
+    _put(s3, bucket, key, body, content_type, digest)
+    return True
+
+
+def build_bundle(analysis_id: str, specs: Dict[str, str]) -> bytes:
+    """
+    tar.gz of every spec plus manifest.json ({name: {"key", "sha256", "size"}}).
+    Byte-for-byte reproducible for the same input (fixed mtimes), so an
+    unchanged bundle is skipped like any other object.
+    """
+    files = {name: content.encode("utf-8") for name, content in sorted(specs.items()) if content}
+    manifest = {
+        "analysis_id": analysis_id,
+        "specs": {
+            name: {"key": spec_key(analysis_id, name), "sha256": content_digest(body), "size": len(body)}
+            for name, body in files.items()
+        },
+    }
+    files[MANIFEST_NAME] = json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8")
+
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb", mtime=0) as gz:
+        with tarfile.open(fileobj=gz, mode="w") as tar:
+            for name, body in files.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(body)
+                info.mode = 0o644
+                tar.addfile(info, io.BytesIO(body))
+    return buffer.getvalue()
+
+
+def publish_specs(
+    s3,
+    bucket: str,
+    analysis_id: str,
+    specs: Dict[str, str],
+    published: Optional[Dict[str, str]] = None,
+    bundle: bool = True,
+    max_workers: int = 4
+) -> Dict[str, str]:
+    """
+    Upload specs concurrently (the completion spec last) and return
+    spec_name -> s3:// URL for every spec that is in S3 afterwards.
+    published maps spec_name -> content already known to be at its key
+    (e.g. uploaded while streaming). Published specs that are not in specs
+    (a stream that fell back to other specs) are deleted before the
+    completion spec goes up. A failed upload is logged and left out.
+    """
+    for name, content in (published or {}).items():
+        _remember(bucket, spec_key(analysis_id, name), content_digest(content.encode("utf-8")))
+
+    objects = {
+        name: (spec_key(analysis_id, name), content.encode("utf-8"), "text/plain")
+        for name, content in specs.items() if content
+    }
+    if bundle and objects:
+        objects[BUNDLE_NAME] = (
+            spec_key(analysis_id, BUNDLE_NAME), build_bundle(analysis_id, specs), "application/gzip"
+        )
+    digests = {name: content_digest(body) for name, (key, body, content_type) in objects.items()}
+    pending = [name for name, (key, body, content_type) in objects.items()
+               if not _known(bucket, key, digests[name])]
+    urls = {name: f"s3://{bucket}/{key}" for name, (key, body, content_type) in objects.items()}
+    stale = [name for name in (published or {}) if name not in objects]
+    if not pending:
+        _delete(s3, bucket, analysis_id, stale)
+        return urls
+
+    def check(name: str) -> bool:
+        """True if the object still has to be uploaded"""
+        key = objects[name][0]
+        if _remote_digest(s3, bucket, key) == digests[name]:
+            _remember(bucket, key, digests[name])
+            print(f"⏭️ {name} unchanged in S3, skipped upload")
+            return False
+        return True
+
+    def upload(name: str) -> bool:
+        key, body, content_type = objects[name]
+        try:
+            _put(s3, bucket, key, body, content_type, digests[name])
+            print(f"✅ Uploaded {name} to S3")
+            return True
+        except Exception as e:
+            print(f"❌ Error uploading {name}: {e}")
+            urls.pop(name, None)
+            return False
+
+    # One round trip for all existence checks, one for all PUTs, then the completion spec
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+        changed = [name for name, needed in zip(pending, pool.map(check, pending)) if needed]
+        list(pool.map(upload, [name for name in changed if name != COMPLETION_SPEC]))
+    _delete(s3, bucket, analysis_id, stale)
+    if COMPLETION_SPEC in changed:
+        upload(COMPLETION_SPEC)
+
+    return urls
+
+
+def _delete(s3, bucket: str, analysis_id: str, names) -> None:
+    """Remove specs of this analysis that the final result does not have"""
+    for name in names:
+        key = spec_key(analysis_id, name)
+        try:
+            s3.delete_object(Bucket=bucket, Key=key)
+            print(f"🗑️ Removed stale {name} from S3")
+        except Exception as e:
+            print(f"❌ Error removing stale {name}: {e}")
+        _forget(bucket, key)
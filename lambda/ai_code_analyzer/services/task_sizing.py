@@ -0,0 +1,240 @@
+"""
+Task right-sizing
+서비스에서 관측한 사용량 sample (CPU, memory high-water mark, request rate) 으로
+target headroom 안에 들어가는 가장 작은 (가장 싼) Fargate CPU / memory 조합을 고릅니다.
+Sample 은 metrics source 에서 읽습니다:
+  - CloudWatchMetricsSource: Container Insights (ECS/ContainerInsights) + ALB RequestCountPerTarget
+  - FileMetricsSource: {repository: [sample, ...]} JSON 파일 (로컬 / 테스트용)
+
+Sample (one per period, per task):
+  {"timestamp": "...", "cpu_units": 180.0, "memory_mib": 410.0, "requests_per_second": 12.5}
+cpu_units / memory_mib may instead be given as cpu_percent + cpu_reserved /
+memory_percent + memory_reserved (ECS CPUUtilization / MemoryUtilization).
+"""
+import json
+import statistics
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+# Valid Fargate task sizes: CPU units -> memory (MiB)
+FARGATE_TASK_SIZES = {
+    256: [512, 1024, 2048],
+    512: list(range(1024, 4097, 1024)),
+    1024: list(range(2048, 8193, 1024)),
+    2048: list(range(4096, 16385, 1024)),
+    4096: list(range(8192, 30721, 1024)),
+}
+# Fargate Linux/x86 on-demand price per vCPU-hour and per GB-hour; only the ratio matters here
+VCPU_HOUR_PRICE = 0.04048
+GB_HOUR_PRICE = 0.004445
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * percentile / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _usage(sample: Dict[str, Any], absolute: str, percent: str, reserved: str) -> Optional[float]:
+    if sample.get(absolute) is not None:
+        return float(sample[absolute])
+    if sample.get(percent) is not None and sample.get(reserved):
+        return float(sample[percent]) / 100 * float(sample[reserved])
+    return None
+
+
+def _cpu_demand(cpu: List[float], rates: List[Optional[float]], percentile: float) -> float:
+    """
+    CPU units a task needs: the percentile of what it used, or, when request
+    rates are known, the fitted cpu = base + per_request * rate at the peak
+    rate if that is higher (bursts shorter than the percentile window).
+    """
+    demand = _percentile(cpu, percentile)
+    paired = [(rate, used) for rate, used in zip(rates, cpu) if rate is not None]
+    if len(paired) >= 2 and len({rate for rate, _ in paired}) > 1:
+        mean_rate = statistics.fmean(rate for rate, _ in paired)
+        mean_cpu = statistics.fmean(used for _, used in paired)
+        variance = sum((rate - mean_rate) ** 2 for rate, _ in paired)
+        per_request = sum((rate - mean_rate) * (used - mean_cpu) for rate, used in paired) / variance
+        if per_request > 0:
+            peak_rate = max(rate for rate, _ in paired)
+            demand = max(demand, mean_cpu + per_request * (peak_rate - mean_rate))
+    return demand
+
+
+def recommend_task_size(
+    samples: List[Dict[str, Any]],
+    cpu_target_percent: float = 70,
+    memory_target_percent: float = 80,
+    cpu_percentile: float = 95,
+    min_samples: int = 12
+) -> Optional[Dict[str, Any]]:
+    """
+    Cheapest Fargate size whose CPU keeps the task's CPU demand under
+    cpu_target_percent and whose memory keeps the memory high-water mark
+    under memory_target_percent. None with fewer than min_samples samples.
+    """
+    usable = [
+        (cpu, memory, sample.get("requests_per_second"))
+        for sample in samples
+        if (cpu := _usage(sample, "cpu_units", "cpu_percent", "cpu_reserved")) is not None
+        and (memory := _usage(sample, "memory_mib", "memory_percent", "memory_reserved")) is not None
+    ]
+    if len(usable) < min_samples:
+        return None
+
+    cpu_demand = _cpu_demand([cpu for cpu, _, _ in usable], [rate for _, _, rate in usable], cpu_percentile)
+    # Memory is not elastic: the peak has to fit, or the task is OOM-killed
+    memory_demand = max(memory for _, memory, _ in usable)
+    cpu_needed = cpu_demand * 100 / cpu_target_percent
+    memory_needed = memory_demand * 100 / memory_target_percent
+
+    # Beyond the largest task: size to the maximum and let autoscaling add tasks
+    largest = max(FARGATE_TASK_SIZES)
+    capped = cpu_needed > largest or memory_needed > FARGATE_TASK_SIZES[largest][-1]
+    candidates = [
+        (cpu / 1024 * VCPU_HOUR_PRICE + memory / 1024 * GB_HOUR_PRICE, cpu, memory)
+        for cpu, memories in FARGATE_TASK_SIZES.items() for memory in memories
+        if cpu >= min(cpu_needed, largest) and memory >= min(memory_needed, FARGATE_TASK_SIZES[largest][-1])
+    ]
+    _, cpu, memory = min(candidates)
+
+    rates = [rate for _, _, rate in usable if rate is not None]
+    return {
+        "cpu": cpu,
+        "memory": memory,
+        "source": "utilization",
+        "samples": len(usable),
+        "cpu_demand_units": round(cpu_demand, 1),
+        "memory_demand_mib": round(memory_demand, 1),
+        "peak_requests_per_second": round(max(rates), 2) if rates else None,
+        "capped": capped,
+    }
+
+
+class FileMetricsSource:
+    """Samples from a JSON file: {"owner/repo": [sample, ...]} (local runs, tests)"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def samples(self, repository: str) -> List[Dict[str, Any]]:
+        with open(self.path) as f:
+            return json.load(f).get(repository, [])
+
+
+class CloudWatchMetricsSource:
+    """
+    Per-task samples of the repository's ECS services (tagged Repository=...):
+    Container Insights CpuUtilized / MemoryUtilized divided by RunningTaskCount,
+    plus the ALB's RequestCountPerTarget of the service's own target group
+    (same AppName tag, or named <service>-tg as the user-app module does).
+    """
+
+    def __init__(self, cloudwatch, tagging, cluster: str, lookback_days: int = 14, period: int = 300):
+        self.cloudwatch = cloudwatch
+        self.tagging = tagging
+        self.cluster = cluster
+        self.lookback_days = lookback_days
+        self.period = period
+
+    def _tagged(self, repository: str, resource_type: str) -> Dict[str, Dict[str, str]]:
+        """ARN -> tags of resources whose Repository tag is the repository (or a URL ending in it)"""
+        resources = {}
+        paginator = self.tagging.get_paginator("get_resources")
+        for page in paginator.paginate(TagFilters=[{"Key": "Repository"}], ResourceTypeFilters=[resource_type]):
+            for resource in page.get("ResourceTagMappingList", []):
+                tags = {tag["Key"]: tag["Value"] for tag in resource.get("Tags", [])}
+                value = tags.get("Repository", "").rstrip("/").removesuffix(".git")
+                if value == repository or value.endswith("/" + repository):
+                    resources[resource["ResourceARN"]] = tags
+        return resources
+
+    @staticmethod
+    def _serves(service: str, service_tags: Dict[str, str], target_group: str, tags: Dict[str, str]) -> bool:
+        """Whether the target group (name/id) is the service's: a repository may run several services"""
+        if service_tags.get("AppName") and tags.get("AppName"):
+            return service_tags["AppName"] == tags["AppName"]
+        return target_group.partition("/")[0] == f"{service}-tg"[:32]
+
+    def samples(self, repository: str) -> List[Dict[str, Any]]:
+        services = [(arn.rpartition("/")[2], tags) for arn, tags in self._tagged(repository, "ecs:service").items()]
+        target_groups = [(arn.partition(":targetgroup/")[2], tags) for arn, tags in
+                         self._tagged(repository, "elasticloadbalancing:targetgroup").items()]
+        target_groups = [(name, tags) for name, tags in target_groups
+                         if any(self._serves(service, service_tags, name, tags) for service, service_tags in services)]
+        if not services:
+            return []
+
+        queries = []
+        for index, (service, _) in enumerate(services):
+            dimensions = [{"Name": "ClusterName", "Value": self.cluster}, {"Name": "ServiceName", "Value": service}]
+            for key, metric, stat in (("cpu", "CpuUtilized", "Average"), ("memory", "MemoryUtilized", "Maximum"),
+                                      ("tasks", "RunningTaskCount", "Average")):
+                queries.append({
+                    "Id": f"{key}{index}",
+                    "MetricStat": {
+                        "Metric": {"Namespace": "ECS/ContainerInsights", "MetricName": metric,
+                                   "Dimensions": dimensions},
+                        "Period": self.period,
+                        "Stat": stat,
+                    },
+                })
+        for index, (target_group, _) in enumerate(target_groups):
+            queries.append({
+                "Id": f"requests{index}",
+                "MetricStat": {
+                    "Metric": {"Namespace": "AWS/ApplicationELB", "MetricName": "RequestCountPerTarget",
+                               "Dimensions": [{"Name": "TargetGroup", "Value": f"targetgroup/{target_group}"}]},
+                    "Period": self.period,
+                    "Stat": "Sum",
+                },
+            })
+
+        end = datetime.now(timezone.utc)
+        series: Dict[str, Dict[datetime, float]] = {}
+        paginator = self.cloudwatch.get_paginator("get_metric_data")
+        # GetMetricData takes at most 500 queries per request
+        for start_index in range(0, len(queries), 500):
+            for page in paginator.paginate(MetricDataQueries=queries[start_index:start_index + 500],
+                                           StartTime=end - timedelta(days=self.lookback_days), EndTime=end):
+                for result in page.get("MetricDataResults", []):
+                    values = series.setdefault(result["Id"], {})
+                    values.update(zip(result.get("Timestamps", []), result.get("Values", [])))
+
+        samples = []
+        for index, (service, service_tags) in enumerate(services):
+            requests: Dict[datetime, float] = {}
+            for tg_index, (target_group, tags) in enumerate(target_groups):
+                if not self._serves(service, service_tags, target_group, tags):
+                    continue
+                for timestamp, count in series.get(f"requests{tg_index}", {}).items():
+                    requests[timestamp] = requests.get(timestamp, 0) + count / self.period
+            tasks = series.get(f"tasks{index}", {})
+            memory = series.get(f"memory{index}", {})
+            for timestamp, cpu in sorted(series.get(f"cpu{index}", {}).items()):
+                count = tasks.get(timestamp)
+                if not count or timestamp not in memory:
+                    continue
+                samples.append({
+                    "timestamp": timestamp.isoformat(),
+                    "cpu_units": cpu / count,
+                    "memory_mib": memory[timestamp] / count,
+                    "requests_per_second": requests.get(timestamp),
+                })
+        return samples
+
+
+def describe(task_size: Optional[Dict[str, Any]]) -> str:
+    """One-line provenance of a task size (tfvars comment, logs)"""
+    if not task_size:
+        return "starting size for the deployment complexity (no utilization observed yet)"
+    note = (f"right-sized from {task_size['samples']} utilization samples "
+            f"(CPU demand {task_size['cpu_demand_units']} units, "
+            f"memory peak {task_size['memory_demand_mib']} MiB")
+    if task_size.get("peak_requests_per_second") is not None:
+        note += f", peak {task_size['peak_requests_per_second']} req/s"
+    note += ")"
+    return note + (", capped at the largest Fargate task" if task_size.get("capped") else "")
@@ -0,0 +1,133 @@
+"""
+Per-invocation telemetry
+lambda_handler 의 stage 별 소요 시간 (span), payload 크기, token 수, cache hit 을 모아서
+invocation 당 JSON 레코드 하나를 CloudWatch Embedded Metric Format (EMF) 으로 출력합니다.
+CloudWatch Logs 가 이 레코드에서 metric 을 추출하므로 PutMetricData 호출이 필요 없고,
+stage 별 latency percentile 을 바로 볼 수 있습니다.
+
+Lambda container 는 한 번에 invocation 하나만 처리하므로 현재 invocation 은 module
+전역으로 둡니다 (worker thread 에서도 current() 로 접근).
+Batch 처럼 한 invocation 안에서 동시에 도는 작업은 scope() 로 자기 record 를 갖고,
+그 작업이 pool 에 넘기는 함수는 carry() 로 감싸서 같은 record 에 기록합니다.
+"""
+import contextvars
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+NAMESPACE = "DelightfulDeploy/Analyzer"
+# Metrics are published per generation path (llm / template / degraded / cache)
+DIMENSIONS = [["generation_path"]]
+
+# Metric name suffix -> CloudWatch unit
+_UNITS = (("_ms", "Milliseconds"), ("_bytes", "Bytes"))
+
+
+def _unit(name: str) -> str:
+    for suffix, unit in _UNITS:
+        if name.endswith(suffix):
+            return unit
+    return "Count"
+
+
+class Invocation:
+    """Spans, counters and properties of one analyzer invocation"""
+
+    def __init__(self, properties: Optional[Dict[str, Any]] = None, enabled: bool = True):
+        self.enabled = enabled
+        self.started = time.monotonic()
+        self.metrics: Dict[str, float] = {}
+        self.properties: Dict[str, Any] = {"generation_path": "none", **(properties or {})}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Time a stage as {stage}_ms (repeated spans of a stage add up)"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(f"{stage}_ms", (time.monotonic() - started) * 1000)
+
+    def add(self, name: str, value: float) -> None:
+        if value is None:
+            return
+        with self._lock:
+            self.metrics[name] = self.metrics.get(name, 0) + value
+
+    def set_property(self, name: str, value: Any) -> None:
+        with self._lock:
+            self.properties[name] = value
+
+    def add_tokens(self, kind: str, usage: Optional[Dict[str, Any]], estimated: bool = False) -> None:
+        """OpenAI usage block (or an estimate of it) for one completion"""
+        if not usage:
+            return
+        self.add(f"{kind}_prompt_tokens", usage.get("prompt_tokens") or 0)
+        self.add(f"{kind}_completion_tokens", usage.get("completion_tokens") or 0)
+        if estimated:
+            self.set_property(f"{kind}_tokens_estimated", True)
+
+    def record(self) -> Dict[str, Any]:
+        """The EMF document: metric values and properties at the top level"""
+        with self._lock:
+            metrics = {name: round(value, 1) for name, value in self.metrics.items()}
+            properties = dict(self.properties)
+        metrics["total_ms"] = round((time.monotonic() - self.started) * 1000, 1)
+
+        definitions: List[Dict[str, str]] = [{"Name": name, "Unit": _unit(name)} for name in sorted(metrics)]
+        return {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": NAMESPACE,
+                    "Dimensions": DIMENSIONS,
+                    "Metrics": definitions,
+                }],
+            },
+            **properties,
+            **metrics,
+        }
+
+    def emit(self) -> Optional[Dict[str, Any]]:
+        """Print the record as one log line (CloudWatch extracts the metrics)"""
+        if not self.enabled:
+            return None
+        record = self.record()
+        print(json.dumps(record, default=str))
+        return record
+
+
+_current: Optional[Invocation] = None
+# Stand-in outside an invocation (direct calls from scripts); never emitted
+_detached = Invocation(enabled=False)
+# Set by scope() for the thread running it (and whatever carry() hands to pool threads)
+_scoped: contextvars.ContextVar[Optional[Invocation]] = contextvars.ContextVar("invocation", default=None)
+
+
+def start(properties: Optional[Dict[str, Any]] = None, enabled: bool = True) -> Invocation:
+    global _current
+    _current = Invocation(properties, enabled)
+    return _current
+
+
+@contextmanager
+def scope(properties: Optional[Dict[str, Any]] = None, enabled: bool = True) -> Iterator[Invocation]:
+    """Separate record for work running concurrently inside the invocation (batch items); emit() is the caller's"""
+    token = _scoped.set(Invocation(properties, enabled))
+    try:
+        yield _scoped.get()
+    finally:
+        _scoped.reset(token)
+
+
+def carry(fn: Callable) -> Callable:
+    """fn bound to the caller's scope, for ThreadPoolExecutor.submit (pool threads do not inherit it)"""
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def current() -> Invocation:
+    return _scoped.get() or _current or _detached
@@ -8,17 +8,16 @@ PYTHON_TEMPLATE = """# Multi-stage build for Python application
 FROM python:3.11-slim as builder
 WORKDIR /app
 
-# Install dependencies
+# Install dependencies (into /install so the non-root user can read them)
 COPY requirements.txt .
-RUN pip install --no-cache-dir --user -r requirements.txt
+RUN pip install --no-cache-dir --prefix=/install -r requirements.txt
 
 # Final stage
 FROM python:3.11-slim
 WORKDIR /app
 
 # Copy dependencies from builder
-COPY --from=builder /root/.local /root/.local
-ENV PATH=/root/.local/bin:$PATH
+COPY --from=builder /install /usr/local
 
 # Copy application code
 COPY . .
@@ -27,9 +26,9 @@ COPY . .
 RUN useradd -m -u 1000 appuser && chown -R appuser:appuser /app
 USER appuser
 
-# Health check
+# Health check (python:slim has no curl)
 HEALTHCHECK --interval=30s --timeout=5s --start-period=60s --retries=3 \\
-  CMD curl -f http://localhost:{port}/health || exit 1
+  CMD python -c "import urllib.request; urllib.request.urlopen('http://localhost:{port}/health')" || exit 1
 
 EXPOSE {port}
 
@@ -74,6 +73,32 @@ EXPOSE {port}
 CMD {start_command}
 """
 
+# Express Dockerfile template (server code runs from the source tree, no build output)
+EXPRESS_TEMPLATE = """# Express application
+FROM node:20-alpine
+WORKDIR /app
+
+# Install production dependencies (cached unless package*.json changes)
+COPY package*.json ./
+RUN npm install --omit=dev
+
+# Copy application code
+COPY . .
+
+# Run as the image's built-in non-root user (uid 1000)
+USER node
+
+# Health check
+HEALTHCHECK --interval=30s --timeout=5s --start-period=30s --retries=3 \\
+  CMD wget --no-verbose --tries=1 --spider http://localhost:{port}/health || exit 1
+
+ENV PORT={port}
+EXPOSE {port}
+
+# Start command
+CMD {start_command}
+"""
+
 # Go Dockerfile template
 GO_TEMPLATE = """# Multi-stage build for Go application
 FROM golang:1.21-alpine as builder
@@ -202,9 +227,9 @@ STREAMLIT_TEMPLATE = """# Multi-stage build for Streamlit application
 FROM python:3.11-slim as builder
 WORKDIR /app
 
-# Install dependencies
+# Install dependencies (into /install so the non-root user can read them)
 COPY requirements.txt .
-RUN pip install --no-cache-dir --user -r requirements.txt
+RUN pip install --no-cache-dir --prefix=/install -r requirements.txt
 
 # Final stage
 FROM python:3.11-slim
@@ -214,8 +239,7 @@ WORKDIR /app
 RUN apt-get update && apt-get install -y --no-install-recommends curl && rm -rf /var/lib/apt/lists/*
 
 # Copy dependencies from builder
-COPY --from=builder /root/.local /root/.local
-ENV PATH=/root/.local/bin:$PATH
+COPY --from=builder /install /usr/local
 
 # Copy application code
 COPY . .
@@ -246,6 +270,8 @@ def get_dockerfile_template(language: str, framework: str = "") -> str:
 
     if "python" in language_lower:
         return PYTHON_TEMPLATE
+    elif "express" in framework_lower:
+        return EXPRESS_TEMPLATE
     elif "javascript" in language_lower or "typescript" in language_lower or "node" in language_lower:
         return NODEJS_TEMPLATE
     elif "go" in language_lower or "golang" in language_lower:
@@ -12,6 +12,7 @@ TERRAFORM_TFVARS_TEMPLATE = """# ========================================
 # Container Configuration
 image_tag = "{image_tag}"
 container_port = {port}
+# Task size: {task_size_note}
 cpu = {cpu}
 memory = {memory}
 
@@ -62,7 +63,8 @@ def generate_terraform_tfvars(
     primary_language: str = "Unknown",
     primary_framework: str = "N/A",
     database_enabled: bool = False,
-    database_type: str = "none"
+    database_type: str = "none",
+    task_size_note: str = ""
 ) -> str:
     """Terraform tfvars 파일 생성"""
 
@@ -74,6 +76,7 @@ def generate_terraform_tfvars(
         port=port,
         cpu=cpu,
         memory=memory,
+        task_size_note=task_size_note,
         desired_count=scaling_config["desired_count"],
         min_capacity=scaling_config["min_capacity"],
         max_capacity=scaling_config["max_capacity"],
@@ -3,21 +3,34 @@ set -euo pipefail
 
 SRC_DIR=${1:-lambda/ai_code_analyzer}
 OUT_ZIP=${2:-build/ai_analyzer.zip}
+# Must match the Lambda runtime, other versions' .pyc files are ignored
+PYTHON=${PYTHON:-python3.11}
 
 mkdir -p "$(dirname "$OUT_ZIP")"
 
 tmpdir=$(mktemp -d)
 trap 'rm -rf "$tmpdir"' EXIT
 
-rsync -a "$SRC_DIR/" "$tmpdir/"
+# Bytecode compiled for this machine's Python (possibly another version) is not shipped
+rsync -a --exclude "__pycache__" "$SRC_DIR/" "$tmpdir/"
 
 # Move package/* to root for Lambda to find dependencies
+# (--ignore-existing: stale copies of our own modules in package/ must not replace the sources)
 if [ -d "$tmpdir/package" ]; then
     echo "Moving package contents to root..."
-    rsync -a "$tmpdir/package/" "$tmpdir/"
+    rsync -a --ignore-existing "$tmpdir/package/" "$tmpdir/"
     rm -rf "$tmpdir/package"
 fi
 
+# Lambda cannot write __pycache__, so without .pyc files every cold start compiles the
+# sources. unchecked-hash: zip timestamps are too coarse for mtime-validated .pyc files
+if command -v "$PYTHON" >/dev/null 2>&1; then
+    echo "Compiling bytecode with $PYTHON..."
+    "$PYTHON" -m compileall -q --invalidation-mode unchecked-hash "$tmpdir"
+else
+    echo "⚠️ $PYTHON not found (Lambda runtime is python3.11), shipping sources only"
+fi
+
 pushd "$tmpdir" >/dev/null
 zip -r "$OLDPWD/$OUT_ZIP" .
 popd >/dev/null
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+End-to-end analyzer benchmark
+Drives lambda_handler against the local stand-ins in local_stubs.py (OpenAI
+stub over HTTP, in-memory SSM / DynamoDB / S3 with fixed latencies) and
+reports per-stage wall time for each generation path:
+  - LLM, blocking completion / streamed completion
+  - LLM response cache hit (second repository with the same prompt)
+  - template fast path (no LLM)
+  - analysis cache hit (same repository + commit again)
+  - the streaming and cache hit cases again with the asyncio pipeline
+Stages are timed by wrapping the handler's stage functions, so the numbers
+include everything lambda_handler does around them.
+
+Usage: python test/bench_analyzer_e2e.py [--rounds 3] [--first-byte 0.5] [--verbose]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lambda", "ai_code_analyzer"))
+sys.path.insert(0, os.path.dirname(__file__))
+os.environ.setdefault("AWS_DEFAULT_REGION", "ap-northeast-2")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "local")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "local")
+# Ports / listener priorities come from the allocator table, as in the deployed Lambda
+os.environ["PORT_ALLOCATION_TABLE"] = "bench-resource-allocations"
+# Task right-sizing reads the file stand-in instead of CloudWatch
+os.environ["TASK_SIZING_SOURCE"] = "file:" + os.path.join(os.path.dirname(__file__), "utilization_samples.json")
+
+import handler  # noqa: E402
+from local_stubs import LocalDynamoDB, LocalS3, LocalSSM, OpenAIStub  # noqa: E402
+
+# Wrapped in order of execution; template_specs stands for the fast path's generation step
+STAGES = [
+    ("cache_lookup", "_lookup_cached_analysis"),
+    ("prefetch", "_run_parallel_stages"),
+    ("analysis", "_analyze_project_with_gpt5"),
+    ("specs", "_generate_deployment_specs"),
+    ("template_specs", "generate_template_specs"),
+    ("upload", "_upload_specs_to_s3"),
+    ("store", "_store_analysis_results"),
+    ("serve_cached", "_serve_cached_analysis"),
+]
+
+FILE_LIST = [
+    "README.md", "requirements.txt", "app/__init__.py", "app/main.py", "app/routes/items.py",
+    "app/models.py", "tests/test_items.py", ".gitignore",
+]
+FILE_SAMPLES = {
+    "requirements.txt": "fastapi==0.110.0\nuvicorn[standard]==0.29.0\npydantic==2.6.4\n",
+    "app/main.py": "from fastapi import FastAPI\n\napp = FastAPI()\n\n\n@app.get('/health')\ndef health():\n"
+                   "    return {'status': 'ok'}\n",
+}
+README = "# {name}\n\nItems API.\n\n## Running\n```\nuvicorn app.main:app --host 0.0.0.0 --port 8000\n```\n"
+
+SCENARIOS = [
+    # label, handler overrides, event overrides, repeat same repository+commit (cache hit)
+    ("llm blocking", {"OPENAI_STREAMING": False, "LLM_CACHE_ENABLED": False}, {"fast_path": False}, False),
+    ("llm streaming", {"OPENAI_STREAMING": True, "LLM_CACHE_ENABLED": False}, {"fast_path": False}, False),
+    ("llm cache hit", {"OPENAI_STREAMING": True, "LLM_CACHE_ENABLED": True}, {"fast_path": False}, False),
+    ("template fast path", {"TEMPLATE_FAST_PATH": True}, {"fast_path": True}, False),
+    ("analysis cache hit", {"OPENAI_STREAMING": True, "LLM_CACHE_ENABLED": False}, {"fast_path": False}, True),
+    ("llm streaming async", {"OPENAI_STREAMING": True, "LLM_CACHE_ENABLED": False},
+     {"fast_path": False, "async_pipeline": True}, False),
+    ("cache hit async", {"OPENAI_STREAMING": True, "LLM_CACHE_ENABLED": False},
+     {"fast_path": False, "async_pipeline": True}, True),
+]
+
+
+class StageTimer:
+    """Accumulates wall time per stage while installed on the handler module"""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = defaultdict(float)
+        self._originals: Dict[str, Any] = {}
+
+    def install(self) -> None:
+        for stage, attribute in STAGES:
+            original = getattr(handler, attribute)
+            self._originals[attribute] = original
+            setattr(handler, attribute, self._wrap(stage, original))
+
+    def uninstall(self) -> None:
+        for attribute, original in self._originals.items():
+            setattr(handler, attribute, original)
+
+    def _wrap(self, stage: str, fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.timings[stage] += time.perf_counter() - start
+        return timed
+
+
+def setup_local_backends(stub: OpenAIStub) -> LocalS3:
+    s3 = LocalS3()
+    handler._aws_clients.update({
+        "s3": s3,
+        "ssm": LocalSSM({handler.OPENAI_API_KEY_PARAM: "sk-local"}),
+        "dynamodb": LocalDynamoDB({
+            "delightful-deploy-ai-analysis": "analysis_id",
+            handler.PORT_ALLOCATION_TABLE: "resource",
+        }),
+    })
+    handler.OPENAI_BASE_URL = stub.base_url
+    handler.OPENAI_MODEL = "stub-model"
+    # Fresh containers: no warm secrets, HTTP sessions or caches from an earlier scenario
+    handler._secret_cache.clear()
+    for session in handler._http_sessions.values():
+        session.close()
+    handler._http_sessions.clear()
+    handler._llm_cache = None
+    handler._github_cache = None
+    handler.spec_store._published_digests.clear()
+    handler._openai_guard.breaker.record_success()
+    handler._openai_guard.latencies = handler.llm_guard.LatencyTracker()
+    return s3
+
+
+def run_scenario(label: str, overrides: Dict[str, Any], event_overrides: Dict[str, Any],
+                 repeat: bool, stub: OpenAIStub, round_index: int, verbose: bool) -> Dict[str, float]:
+    setup_local_backends(stub)
+    for name, value in overrides.items():
+        setattr(handler, name, value)
+
+    def event(repository: str, commit_sha: str) -> Dict[str, Any]:
+        return dict({
+            "repository": repository,
+            "commit_sha": commit_sha,
+            "branch": "main",
+            "analysis_id": f"{commit_sha}-{time.perf_counter_ns()}",
+            "file_list": FILE_LIST,
+            "readme_content": README.format(name=repository.rpartition("/")[2]),
+            "file_samples": FILE_SAMPLES,
+        }, **event_overrides)
+
+    slug = label.replace(" ", "-")
+    commit = f"{round_index:02d}{abs(hash(slug)) % 10**10:010d}"
+    # Warm-up invocation: fills the caches the measured one is supposed to hit
+    if repeat or label == "llm cache hit":
+        first_repository = f"bench/{slug}" if repeat else f"bench/{slug}-warm"
+        with _quiet(verbose):
+            handler.lambda_handler(event(first_repository, commit), None)
+
+    timer = StageTimer()
+    timer.install()
+    requests_before = len(stub.requests)
+    try:
+        start = time.perf_counter()
+        with _quiet(verbose):
+            response = handler.lambda_handler(event(f"bench/{slug}", commit), None)
+        total = time.perf_counter() - start
+    finally:
+        timer.uninstall()
+
+    body = json.loads(response["body"])
+    if response["statusCode"] != 200:
+        raise RuntimeError(f"{label}: lambda_handler returned {response['statusCode']}: {body}")
+    timings = dict(timer.timings, total=total)
+    timings["llm_requests"] = len(stub.requests) - requests_before
+    if "first_byte_ms" in body.get("generation_metrics", {}):
+        timings["stream_first_byte"] = body["generation_metrics"]["first_byte_ms"] / 1000
+    return timings
+
+
+@contextlib.contextmanager
+def _quiet(verbose: bool):
+    if verbose:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--first-byte", type=float, default=0.5, help="stub time to first byte (s)")
+    parser.add_argument("--chars-per-second", type=float, default=2000.0, help="stub generation rate")
+    parser.add_argument("--verbose", action="store_true", help="show lambda_handler logs")
+    args = parser.parse_args()
+
+    defaults = {name: getattr(handler, name) for name in ("OPENAI_STREAMING", "LLM_CACHE_ENABLED", "TEMPLATE_FAST_PATH")}
+    columns = [stage for stage, _ in STAGES] + ["total"]
+
+    print(f"\n{'='*100}")
+    print(f"🧪 Analyzer end-to-end benchmark (stub first byte {args.first_byte}s, "
+          f"{args.chars_per_second:.0f} chars/s, median of {args.rounds} rounds, ms)")
+    print(f"{'='*100}\n")
+
+    with OpenAIStub(first_byte_s=args.first_byte, chars_per_second=args.chars_per_second) as stub:
+        results: List[tuple] = []
+        for label, overrides, event_overrides, repeat in SCENARIOS:
+            rounds = [
+                run_scenario(label, overrides, event_overrides, repeat, stub, index, args.verbose)
+                for index in range(args.rounds)
+            ]
+            for name, value in defaults.items():
+                setattr(handler, name, value)
+            median = {
+                column: statistics.median(r.get(column, 0.0) for r in rounds)
+                for column in columns + ["llm_requests", "stream_first_byte"]
+            }
+            results.append((label, median))
+
+    short = {"cache_lookup": "lookup", "template_specs": "template", "serve_cached": "serve"}
+    print(f"{'Scenario':<20}" + "".join(f"{short.get(c, c):>10}" for c in columns) + f"{'LLM req':>9}")
+    for label, median in results:
+        cells = "".join(
+            f"{median[c] * 1000:>10.0f}" if median[c] else f"{'-':>10}" for c in columns
+        )
+        print(f"{label:<20}{cells}{median['llm_requests']:>9.0f}")
+
+    streamed = dict(results).get("llm streaming", {})
+    if streamed.get("stream_first_byte"):
+        print(f"\nStreaming: first spec byte after {streamed['stream_first_byte'] * 1000:.0f} ms")
+    print()
+
+
+if __name__ == "__main__":
+    main()
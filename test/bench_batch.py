@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Batch analysis benchmark
+Analyzes N repositories against the local stand-ins in local_stubs.py two ways:
+  - one lambda_handler invocation per repository (each a fresh container:
+    secrets, HTTP sessions and caches start cold)
+  - one {"action": "analyze_batch"} invocation with bounded concurrency
+and reports wall time, throughput and the SSM / OpenAI request counts.
+
+Usage: python test/bench_batch.py [--repositories 12] [--concurrency 4] [--first-byte 0.3]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import bench_analyzer_e2e as e2e  # noqa: E402  (sets up the handler import path and env)
+from bench_analyzer_e2e import handler  # noqa: E402
+from local_stubs import OpenAIStub  # noqa: E402
+
+
+def repository_events(count: int, run: str):
+    return [{
+        "repository": f"bench/batch-{run}-{index}",
+        "commit_sha": f"{run}{index:04d}",
+        "analysis_id": f"batch-{run}-{index}",
+        "file_list": e2e.FILE_LIST,
+        "readme_content": e2e.README.format(name=f"batch-{index}"),
+        "file_samples": e2e.FILE_SAMPLES,
+        # LLM path: the template fast path would make both modes trivially fast
+        "fast_path": False,
+    } for index in range(count)]
+
+
+def ssm_requests() -> int:
+    return len(handler._get_aws_client("ssm").calls)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repositories", type=int, default=12)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--first-byte", type=float, default=0.3, help="stub time to first byte (s)")
+    args = parser.parse_args()
+    handler.LLM_CACHE_ENABLED = False
+
+    print(f"\n{'='*70}")
+    print(f"📚 Batch analysis benchmark ({args.repositories} repositories, stub first byte {args.first_byte}s)")
+    print(f"{'='*70}\n")
+
+    rows = []
+    with OpenAIStub(first_byte_s=args.first_byte) as stub:
+        e2e.setup_local_backends(stub)
+        started = time.perf_counter()
+        requests_before = len(stub.requests)
+        ssm_total = 0
+        for event in repository_events(args.repositories, "single"):
+            e2e.setup_local_backends(stub)
+            with contextlib.redirect_stdout(io.StringIO()):
+                response = handler.lambda_handler(event, None)
+            assert response["statusCode"] == 200, response
+            ssm_total += ssm_requests()
+        rows.append(("one invocation each", time.perf_counter() - started, len(stub.requests) - requests_before,
+                     ssm_total, None))
+
+        e2e.setup_local_backends(stub)
+        started = time.perf_counter()
+        requests_before = len(stub.requests)
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = handler.lambda_handler({
+                "action": "analyze_batch",
+                "repositories": repository_events(args.repositories, "batch"),
+                "max_concurrency": args.concurrency,
+            }, None)
+        summary = json.loads(response["body"])["summary"]
+        rows.append((f"batch x{args.concurrency}", time.perf_counter() - started, len(stub.requests) - requests_before,
+                     ssm_requests(), summary))
+
+    print(f"{'Mode':<24}{'wall ms':>10}{'repos/min':>12}{'LLM req':>10}{'SSM req':>10}")
+    for label, wall, llm_requests, ssm, _ in rows:
+        print(f"{label:<24}{wall * 1000:>10.0f}{args.repositories / wall * 60:>12.1f}{llm_requests:>10}{ssm:>10}")
+
+    summary = rows[-1][-1]
+    print(f"\nBatch summary: {summary['succeeded']} succeeded, {summary['failed']} failed, "
+          f"p50 {summary['duration_ms']['p50']:.0f} ms, p95 {summary['duration_ms']['p95']:.0f} ms per repository\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Analyzer cold-start benchmark
+Every measurement runs in a fresh interpreter, like a new Lambda container:
+  - `python -X importtime -c "import handler"`, parsed into a per-package report
+    (cumulative import time of handler, top-level packages, slowest modules)
+  - the same run with the analyzer sources uncompiled (what a zip without
+    .pyc files costs: Lambda cannot write __pycache__, so every cold start compiles)
+  - first-use AWS client construction (boto3 client / resource per service)
+  - the first template fast path invocation against the local stand-ins
+With --max-import-ms the script exits non-zero when the median handler import
+exceeds the budget, so CI can catch cold-start regressions.
+
+Usage: python test/bench_cold_start.py [--rounds 5] [--top 12] [--max-import-ms 400]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+LAMBDA_DIR = os.path.join(TEST_DIR, "..", "lambda", "ai_code_analyzer")
+
+# Runs in the child interpreter: times import, client creation and a first invocation
+CHILD_SCRIPT = r"""
+import contextlib, io, json, os, sys, time
+sys.path.insert(0, {lambda_dir!r})
+sys.path.insert(0, {test_dir!r})
+started = time.perf_counter()
+import handler
+timings = {{"import_ms": (time.perf_counter() - started) * 1000}}
+
+for service in ("s3", "dynamodb", "ssm"):
+    started = time.perf_counter()
+    handler._get_aws_client(service)
+    timings[f"client_{{service}}_ms"] = (time.perf_counter() - started) * 1000
+
+import bench_analyzer_e2e as e2e
+from local_stubs import OpenAIStub
+with OpenAIStub(first_byte_s=0) as stub:
+    e2e.setup_local_backends(stub)
+    event = {{
+        "repository": "bench/cold-start", "commit_sha": "c0ffee", "analysis_id": "cold-start",
+        "file_list": e2e.FILE_LIST, "readme_content": e2e.README.format(name="cold-start"),
+        "file_samples": e2e.FILE_SAMPLES, "fast_path": True,
+    }}
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = handler.lambda_handler(event, None)
+    timings["first_invocation_ms"] = (time.perf_counter() - started) * 1000
+    assert response["statusCode"] == 200, response
+print(json.dumps(timings))
+"""
+
+
+def _child_env(write_bytecode: bool = True) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("AWS_DEFAULT_REGION", "ap-northeast-2")
+    env.setdefault("AWS_ACCESS_KEY_ID", "local")
+    env.setdefault("AWS_SECRET_ACCESS_KEY", "local")
+    env["PORT_ALLOCATION_TABLE"] = "bench-resource-allocations"
+    env["TASK_SIZING_SOURCE"] = "file:" + os.path.join(TEST_DIR, "utilization_samples.json")
+    if not write_bytecode:
+        env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def import_profile() -> List[Tuple[int, int, str]]:
+    """(self us, cumulative us, module) rows of -X importtime for `import handler`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import handler"],
+        cwd=LAMBDA_DIR, env=_child_env(), capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def cold_invocation(compiled: bool) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as workdir:
+        lambda_dir = LAMBDA_DIR
+        if not compiled:
+            # Sources only; libraries keep their bytecode, as in the Lambda runtime
+            lambda_dir = os.path.join(workdir, "ai_code_analyzer")
+            shutil.copytree(LAMBDA_DIR, lambda_dir, ignore=shutil.ignore_patterns("__pycache__", "package"))
+        script = CHILD_SCRIPT.format(lambda_dir=lambda_dir, test_dir=TEST_DIR)
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=lambda_dir, env=_child_env(write_bytecode=compiled),
+            capture_output=True, text=True
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"cold start child failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def package_report(rows: List[Tuple[int, int, str]]) -> Dict[str, int]:
+    """Self time summed per top-level package (us)"""
+    totals: Dict[str, int] = defaultdict(int)
+    for self_us, _, name in rows:
+        totals[name.strip().split(".")[0]] += self_us
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12, help="packages / modules to list")
+    parser.add_argument("--max-import-ms", type=float, default=None,
+                        help="fail when the median handler import exceeds this")
+    args = parser.parse_args()
+
+    print(f"\n{'='*70}")
+    print(f"🧊 Analyzer cold-start benchmark (fresh interpreter per run, median of {args.rounds})")
+    print(f"{'='*70}\n")
+
+    # Warm-up run writes the regular __pycache__ entries
+    cold_invocation(compiled=True)
+    profiles = [import_profile() for _ in range(args.rounds)]
+    compiled = [cold_invocation(compiled=True) for _ in range(args.rounds)]
+    uncompiled = [cold_invocation(compiled=False) for _ in range(args.rounds)]
+
+    # The profile with the median handler import represents the run
+    profiles.sort(key=lambda rows: next(c for _, c, name in rows if name.strip() == "handler"))
+    rows = profiles[len(profiles) // 2]
+    handler_us = next(c for _, c, name in rows if name.strip() == "handler")
+
+    print(f"-X importtime: import handler {handler_us / 1000:.0f} ms, {len(rows)} modules\n")
+    print(f"{'Package (self time)':<40}{'ms':>10}")
+    packages = sorted(package_report(rows).items(), key=lambda item: item[1], reverse=True)
+    for name, self_us in packages[:args.top]:
+        print(f"{name:<40}{self_us / 1000:>10.1f}")
+
+    print(f"\n{'Slowest modules (self time)':<40}{'ms':>10}")
+    for self_us, _, name in sorted(rows, reverse=True)[:args.top]:
+        print(f"{name.strip():<40}{self_us / 1000:>10.1f}")
+
+    def median(runs: List[Dict[str, float]], key: str) -> float:
+        return statistics.median(run[key] for run in runs)
+
+    print(f"\n{'Cold start stage':<40}{'with .pyc':>12}{'no .pyc':>12}")
+    for key in ("import_ms", "client_s3_ms", "client_dynamodb_ms", "client_ssm_ms", "first_invocation_ms"):
+        label = key[:-3].replace("_", " ")
+        print(f"{label:<40}{median(compiled, key):>12.1f}{median(uncompiled, key):>12.1f}")
+    print()
+
+    import_ms = median(compiled, "import_ms")
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        print(f"❌ handler import {import_ms:.0f} ms exceeds the {args.max_import_ms:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
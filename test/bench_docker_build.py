@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Docker build benchmark
+Builds test/demo_app and test/fastapi_demo with their Dockerfile as written
+and as rewritten by generators/dockerfile_optimizer.py, and reports:
+  - cold: docker build --no-cache (BuildKit cache mounts start empty after --prune)
+  - warm: rebuild after an application-code edit (main.py), the common push
+Needs a local Docker daemon with BuildKit (Docker 23+ or DOCKER_BUILDKIT=1).
+
+Usage: python test/bench_docker_build.py [--apps demo_app fastapi_demo] [--prune] [--show]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lambda", "ai_code_analyzer"))
+
+from generators.dockerfile_optimizer import optimize_dockerfile  # noqa: E402
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+APPS = ["demo_app", "fastapi_demo"]
+
+
+def docker_available() -> bool:
+    if not shutil.which("docker"):
+        return False
+    return subprocess.run(["docker", "info"], capture_output=True).returncode == 0
+
+
+def build(context_dir: str, tag: str, no_cache: bool = False) -> float:
+    command = ["docker", "build", "-q", "-t", tag, context_dir]
+    if no_cache:
+        command.insert(2, "--no-cache")
+    started = time.perf_counter()
+    result = subprocess.run(command, capture_output=True, text=True, env={**os.environ, "DOCKER_BUILDKIT": "1"})
+    if result.returncode != 0:
+        raise RuntimeError(f"docker build {tag} failed:\n{result.stderr[-2000:]}")
+    return time.perf_counter() - started
+
+
+def prepare(app: str, variant: str, workdir: str) -> str:
+    """Copy of the app whose Dockerfile is the original or the optimized one"""
+    source = os.path.join(TEST_DIR, app)
+    target = os.path.join(workdir, f"{app}-{variant}")
+    shutil.copytree(source, target, ignore=shutil.ignore_patterns("__pycache__"))
+    if variant == "optimized":
+        path = os.path.join(target, "Dockerfile")
+        with open(path) as f:
+            original = f.read()
+        file_list = sorted(os.path.relpath(os.path.join(root, name), target).replace(os.sep, "/")
+                           for root, _, names in os.walk(target) for name in names)
+        samples = {name: open(os.path.join(target, name)).read()
+                   for name in ("requirements.txt", "package.json") if os.path.exists(os.path.join(target, name))}
+        with open(path, "w") as f:
+            f.write(optimize_dockerfile(original, file_list, samples))
+    return target
+
+
+def touch_source(context_dir: str, run: int) -> None:
+    with open(os.path.join(context_dir, "main.py"), "a") as f:
+        f.write(f"\n# bench edit {run}\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--apps", nargs="+", default=APPS, choices=APPS)
+    parser.add_argument("--warm-runs", type=int, default=3)
+    parser.add_argument("--prune", action="store_true", help="docker builder prune -af first (empty cache mounts)")
+    parser.add_argument("--show", action="store_true", help="print the optimized Dockerfiles")
+    args = parser.parse_args()
+
+    print(f"\n{'='*70}")
+    print("🐳 Docker build benchmark (original vs optimized Dockerfile)")
+    print(f"{'='*70}\n")
+
+    if not docker_available():
+        print("⚠️ Docker daemon not available - nothing to benchmark")
+        return
+    if args.prune:
+        subprocess.run(["docker", "builder", "prune", "-af"], capture_output=True)
+
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="bench-docker-") as workdir:
+        for app in args.apps:
+            for variant in ("original", "optimized"):
+                context_dir = prepare(app, variant, workdir)
+                if args.show and variant == "optimized":
+                    print(f"--- {app} (optimized) ---")
+                    with open(os.path.join(context_dir, "Dockerfile")) as f:
+                        print(f.read())
+                tag = f"bench-{app.replace('_', '-')}:{variant}"
+                cold = build(context_dir, tag, no_cache=True)
+                warm = []
+                for run in range(args.warm_runs):
+                    touch_source(context_dir, run)
+                    warm.append(build(context_dir, tag))
+                rows.append((app, variant, cold, sorted(warm)[len(warm) // 2]))
+
+    print(f"{'App':<16}{'Dockerfile':<12}{'cold s':>10}{'warm s':>10}")
+    for app, variant, cold, warm in rows:
+        print(f"{app:<16}{variant:<12}{cold:>10.1f}{warm:>10.1f}")
+    print("\nwarm = median rebuild after editing main.py\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Dockerfile post-processing benchmark
+Runs the tokenizer + rewrite passes (handler._postprocess_dockerfile) on
+synthetic multi-stage Dockerfiles of growing size. Time per line should stay
+flat: heredocs (including unterminated ones), continuations and stage tracking
+are all resolved in one pass.
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lambda", "ai_code_analyzer"))
+os.environ.setdefault("AWS_DEFAULT_REGION", "ap-northeast-2")
+
+import handler  # noqa: E402
+from generators.dockerfile_parser import parse_dockerfile  # noqa: E402
+
+STAGE = [
+    "FROM Python 3.11 AS stage{i}",
+    "WORKDIR /app",
+    "COPY requirements.txt .",
+    "RUN pip install --no-cache-dir -r requirements.txt",
+    "RUN apt-get update && \\",
+    "    apt-get install -y --no-install-recommends curl && \\",
+    "    rm -rf /var/lib/apt/lists/*",
+    "COPY <<EOF /app/start{i}.sh",
+    "#!/bin/sh",
+    "exec python main.py",
+    "EOF",
+    "RUN cat <<NOT_TERMINATED > /tmp/notes",
+    "COPY . .",
+    "COPY --from=builder /install /usr/local",
+    "RUN useradd -m appuser",
+    "USER appuser",
+    "HEALTHCHECK --interval=30s \\",
+    "    CMD curl -f http://localhost:8000/health || exit 1",
+    'CMD ["python", "app.py"]',
+    "",
+]
+
+PROJECT_INFO = {"primary_language": "Python"}
+FILE_LIST = ["main.py", "requirements.txt", "app/routes.py"]
+
+
+def build_dockerfile(stages: int) -> str:
+    return "\n".join(line.format(i=i) for i in range(stages) for line in STAGE)
+
+
+def _best_of(fn, rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(rounds: int = 3) -> None:
+    print(f"\n{'='*60}")
+    print("🐳 Dockerfile parser / rewrite benchmark")
+    print(f"{'='*60}\n")
+    print(f"{'Stages':>8} {'Lines':>8} {'Parse':>10} {'Parse+fix':>11} {'µs/line':>9}")
+
+    for stages in (10, 100, 1000, 5000):
+        dockerfile = build_dockerfile(stages)
+        lines = dockerfile.count("\n") + 1
+        parse = _best_of(lambda: parse_dockerfile(dockerfile), rounds)
+        full = _best_of(lambda: handler._postprocess_dockerfile(dockerfile, PROJECT_INFO, FILE_LIST), rounds)
+        print(f"{stages:>8} {lines:>8} {parse * 1000:>8.1f}ms {full * 1000:>9.1f}ms {full / lines * 1e6:>9.2f}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
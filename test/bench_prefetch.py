@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Pre-analysis I/O fan-out benchmark
+Compares the old sequential prefetch (SSM → DynamoDB → GitHub) with the
+concurrent fan-out in lambda_handler, using stubbed endpoints with fixed latency.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lambda", "ai_code_analyzer"))
+os.environ.setdefault("AWS_DEFAULT_REGION", "ap-northeast-2")
+
+import handler  # noqa: E402
+
+# Simulated endpoint latencies (seconds) - roughly what we see from Lambda in ap-northeast-2
+STUB_LATENCY = {
+    "api_key": 0.08,               # SSM GetParameter (cold client)
+    "existing_deployments": 0.25,  # DynamoDB scan, 50 items
+    "github": 0.60,                # tree + README + token lookup
+}
+
+
+def _stub(name: str, result):
+    def call():
+        time.sleep(STUB_LATENCY[name])
+        return result
+    return call
+
+
+STAGES = {
+    "api_key": _stub("api_key", "sk-test"),
+    "existing_deployments": _stub("existing_deployments", []),
+    "github": _stub("github", {"file_list": ["main.py"], "readme_content": "", "tree_sha": "abc"}),
+}
+
+
+def run_sequential() -> float:
+    start = time.perf_counter()
+    for fn in STAGES.values():
+        fn()
+    return time.perf_counter() - start
+
+
+def run_parallel() -> float:
+    start = time.perf_counter()
+    handler._run_parallel_stages(STAGES, handler.PREFETCH_DEADLINES)
+    return time.perf_counter() - start
+
+
+def main(rounds: int = 5) -> None:
+    print(f"\n{'='*60}")
+    print("⏱️  Prefetch benchmark (stubbed endpoints)")
+    print(f"{'='*60}\n")
+
+    sequential = [run_sequential() for _ in range(rounds)]
+    parallel = [run_parallel() for _ in range(rounds)]
+
+    seq_avg = sum(sequential) / rounds
+    par_avg = sum(parallel) / rounds
+
+    print(f"\n{'Sequential (sum of stages)':<32} {seq_avg * 1000:>8.1f} ms")
+    print(f"{'Parallel (max of stages)':<32} {par_avg * 1000:>8.1f} ms")
+    print(f"{'Expected lower bound':<32} {max(STUB_LATENCY.values()) * 1000:>8.1f} ms")
+    print(f"{'Saving':<32} {(seq_avg - par_avg) * 1000:>8.1f} ms ({(1 - par_avg / seq_avg) * 100:.0f}%)\n")
+
+
+if __name__ == "__main__":
+    main()
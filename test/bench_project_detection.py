@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Local project detection benchmark
+Compares the old _fallback_project_detection loop (every file x every pattern)
+with the single-pass RepoIndex detector on a synthetic 100k-file monorepo.
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lambda", "ai_code_analyzer"))
+
+from analyzers.project_detector import detect_project  # noqa: E402
+
+FILE_COUNT = 100_000
+EXTENSIONS = [".py", ".ts", ".tsx", ".js", ".json", ".md", ".css", ".png", ".yaml"]
+
+
+def build_monorepo(file_count: int = FILE_COUNT, seed: int = 7):
+    """Backend service at services/api, plus a frontend with vendored node_modules"""
+    rng = random.Random(seed)
+    files = [
+        "README.md",
+        "services/api/pyproject.toml",
+        "services/api/poetry.lock",
+        "services/api/app/main.py",
+        "web/package.json",
+        "web/yarn.lock",
+    ]
+    while len(files) < file_count:
+        top = rng.choice(["services/api/app", "web/src", "web/node_modules", "docs", "packages/shared"])
+        depth = "/".join(f"d{rng.randint(0, 40)}" for _ in range(rng.randint(1, 4)))
+        name = f"f{len(files)}{rng.choice(EXTENSIONS)}"
+        if top == "web/node_modules" and rng.random() < 0.05:
+            name = "package.json"
+        files.append(f"{top}/{depth}/{name}")
+    rng.shuffle(files)
+    return files
+
+
+SAMPLES = {
+    "services/api/pyproject.toml": (
+        '[tool.poetry]\nname = "api"\n\n[tool.poetry.dependencies]\n'
+        'python = "^3.11"\nfastapi = "^0.110"\nuvicorn = "^0.29"\nasyncpg = "^0.29"\n'
+    ),
+    "services/api/app/main.py": "from fastapi import FastAPI\napp = FastAPI()\n",
+}
+
+
+def old_fallback_detection(files):
+    """Verbatim copy of the previous handler._fallback_project_detection loop"""
+    project_info = {"languages": [], "primary_language": "Unknown", "runtime": "Unknown", "package_managers": []}
+    file_patterns = {
+        "package.json": {"lang": "JavaScript", "runtime": "Node.js 20", "pkg_mgr": "npm"},
+        "requirements.txt": {"lang": "Python", "runtime": "Python 3.11", "pkg_mgr": "pip"},
+        "go.mod": {"lang": "Go", "runtime": "Go 1.21", "pkg_mgr": "go modules"},
+        "Cargo.toml": {"lang": "Rust", "runtime": "Rust 1.75", "pkg_mgr": "cargo"},
+        "pom.xml": {"lang": "Java", "runtime": "Java 17", "build": "Maven"},
+        "Gemfile": {"lang": "Ruby", "runtime": "Ruby 3.2", "pkg_mgr": "bundler"},
+    }
+    for file in files:
+        for pattern, info in file_patterns.items():
+            if pattern in file.lower():
+                if "lang" in info:
+                    project_info["primary_language"] = info["lang"]
+                    project_info["languages"].append(info["lang"])
+                if "runtime" in info:
+                    project_info["runtime"] = info["runtime"]
+                if "pkg_mgr" in info:
+                    project_info["package_managers"].append(info["pkg_mgr"])
+    return project_info
+
+
+def _best_of(fn, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main(rounds: int = 5) -> None:
+    print(f"\n{'='*60}")
+    print(f"🔍 Project detection benchmark ({FILE_COUNT:,} files)")
+    print(f"{'='*60}\n")
+
+    files = build_monorepo()
+    old_time, old_info = _best_of(lambda: old_fallback_detection(files), rounds)
+    new_time, new_info = _best_of(lambda: detect_project(files, SAMPLES), rounds)
+
+    print(f"{'Old pattern loop':<28} {old_time * 1000:>8.1f} ms  "
+          f"-> {old_info['primary_language']}, {len(old_info['languages'])} language entries")
+    print(f"{'Single-pass detector':<28} {new_time * 1000:>8.1f} ms  "
+          f"-> {new_info['primary_language']} / {new_info['primary_framework']} "
+          f"(root={new_info['app_root']}, entrypoint={new_info['entrypoint']}, "
+          f"confidence={new_info['confidence']} {new_info['confidence_score']})")
+    print(f"{'Speedup':<28} {old_time / new_time:>8.1f}x\n")
+
+
+if __name__ == "__main__":
+    main()
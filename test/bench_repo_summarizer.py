@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Prompt context benchmark
+Compares the old character cuts of the analysis prompt (file_list[:100],
+readme[:3000], samples[:500]) with the token-budgeted summarizer: estimated
+tokens, how many key files (manifests, lockfiles, entrypoints) make it into
+the prompt, and how long summarizing takes.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lambda", "ai_code_analyzer"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from analyzers.repo_summarizer import estimate_tokens, file_relevance, summarize_repository  # noqa: E402
+from bench_project_detection import SAMPLES, build_monorepo  # noqa: E402
+
+BUDGET = 3000
+
+README = "\n\n".join([
+    "# Shop API\nBackend and storefront for the shop.",
+    "## Features\n" + "- feature line with a longer description of what it does\n" * 120,
+    "## Installation\n```\npoetry install\ncd web && yarn\n```",
+    "## Running\n```\nuvicorn app.main:app --host 0.0.0.0 --port 8000\n```",
+    "## License\nMIT",
+])
+
+SMALL_REPO = ["main.py", "requirements.txt", "README.md", "app/routes.py", "app/models.py", "tests/test_api.py"]
+SMALL_SAMPLES = {
+    "requirements.txt": "fastapi==0.110.0\nuvicorn[standard]==0.29.0\nsqlalchemy==2.0.29\n" * 3,
+    "main.py": "from fastapi import FastAPI\n\napp = FastAPI()\n\n\n" + "@app.get('/items')\ndef items():\n    return []\n\n" * 30,
+}
+
+
+def old_context(file_list, readme, samples):
+    """What the previous _analyze_project_with_gpt5 put into the prompt"""
+    parts = ["\n".join(file_list[:100]), readme[:3000]]
+    parts += [content[:500] for content in samples.values()]
+    return "\n".join(parts), file_list[:100]
+
+
+def key_files(file_list):
+    return {path for path in file_list if file_relevance(path) >= 50}
+
+
+def main() -> None:
+    print(f"\n{'='*72}")
+    print(f"🧮 Prompt context benchmark (budget {BUDGET} tokens)")
+    print(f"{'='*72}\n")
+    print(f"{'Repository':<22} {'Files':>7} {'Old tok':>8} {'New tok':>8} "
+          f"{'Old keys':>9} {'New keys':>9} {'Time':>8}")
+
+    repos = [
+        ("small service", SMALL_REPO, "# Demo\nRun with uvicorn main:app", SMALL_SAMPLES),
+        ("monorepo 10k", build_monorepo(10_000), README, SAMPLES),
+        ("monorepo 100k", build_monorepo(100_000), README, SAMPLES),
+    ]
+    for label, files, readme, samples in repos:
+        old_text, old_listed = old_context(files, readme, samples)
+        start = time.perf_counter()
+        summary = summarize_repository(files, readme, samples, budget=BUDGET)
+        elapsed = time.perf_counter() - start
+
+        wanted = key_files(files)
+        old_keys = len(wanted & set(old_listed))
+        new_keys = sum(1 for path in wanted if path in summary["file_structure"].split("\n"))
+        print(f"{label:<22} {len(files):>7} {estimate_tokens(old_text):>8} "
+              f"{sum(summary['tokens'].values()):>8} {old_keys:>4}/{len(wanted):<4} "
+              f"{new_keys:>4}/{len(wanted):<4} {elapsed * 1000:>6.0f}ms")
+    print()
+
+
+if __name__ == "__main__":
+    main()
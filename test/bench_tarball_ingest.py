@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tarball ingestion benchmark
+Streams synthetic GitHub-style archives (source, vendored node_modules,
+binaries) through services/github_tarball.ingest_archive and reports time,
+throughput and peak Python memory. Peak memory should track the kept
+samples, not the archive size.
+"""
+import io
+import os
+import random
+import sys
+import tarfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lambda", "ai_code_analyzer"))
+
+from services.github_tarball import _BoundedStream, ingest_archive  # noqa: E402
+
+SOURCE = b"def handler(event, context):\n    return {'statusCode': 200}\n" * 40
+
+
+def build_archive(file_count: int, seed: int = 3) -> bytes:
+    rng = random.Random(seed)
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz", compresslevel=6) as tar:
+        def add(path: str, body: bytes) -> None:
+            info = tarfile.TarInfo(f"owner-repo-abc1234/{path}")
+            info.size = len(body)
+            tar.addfile(info, io.BytesIO(body))
+
+        add("README.md", b"# Repo\n\n## Running\nuvicorn app.main:app --port 8000\n")
+        add("requirements.txt", b"fastapi\nuvicorn\n")
+        add("app/main.py", b"from fastapi import FastAPI\napp = FastAPI()\n")
+        add("Dockerfile", b"FROM python:3.11-slim\n")
+        for idx in range(file_count):
+            kind = rng.random()
+            if kind < 0.1:
+                add(f"assets/img{idx}.png", rng.randbytes(rng.randint(20_000, 200_000)))
+            elif kind < 0.4:
+                add(f"web/node_modules/pkg{idx % 300}/index{idx}.js", SOURCE)
+            else:
+                add(f"app/module{idx % 50}/file{idx}.py", SOURCE)
+    return buffer.getvalue()
+
+
+def main() -> None:
+    print(f"\n{'='*72}")
+    print("📦 Tarball ingestion benchmark")
+    print(f"{'='*72}\n")
+    print(f"{'Files':>7} {'Archive':>10} {'Time':>9} {'MiB/s':>8} {'Peak mem':>10} {'Samples':>8}")
+
+    for file_count in (1_000, 5_000, 20_000):
+        archive = build_archive(file_count)
+        tracemalloc.start()
+        start = time.perf_counter()
+        info = ingest_archive(_BoundedStream(io.BytesIO(archive), len(archive) + 1))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        size_mib = len(archive) / (1024 * 1024)
+        print(f"{info['repo_stats']['file_count']:>7} {size_mib:>8.1f}Mi {elapsed * 1000:>7.0f}ms "
+              f"{size_mib / elapsed:>8.1f} {peak / (1024 * 1024):>8.1f}Mi {len(info['file_samples']):>8}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for the analyzer's upstreams
+  - OpenAIStub: OpenAI-compatible /chat/completions server (canned responses,
+    configurable time-to-first-byte, streaming rate)
+  - LocalSSM / LocalDynamoDB / LocalS3: in-memory versions of the boto3 calls
+    the analyzer makes, each with a fixed per-call latency
+Lets lambda_handler run end to end offline (see bench_analyzer_e2e.py).
+
+Standalone:  python test/local_stubs.py --port 8089
+             OPENAI_BASE_URL=http://127.0.0.1:8089/v1 python ...
+"""
+import argparse
+import io
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from botocore.exceptions import ClientError
+
+ANALYSIS_RESPONSE = {
+    "languages": ["Python"],
+    "primary_language": "Python",
+    "frameworks": ["FastAPI"],
+    "primary_framework": "FastAPI",
+    "build_tools": ["pip"],
+    "package_managers": ["pip"],
+    "runtime": "Python 3.11",
+    "app_type": "web-api",
+    "app_port": 8000,
+    "database_needed": False,
+    "database_type": "none",
+    "external_services": [],
+    "containerizable": True,
+    "deployment_complexity": "simple",
+    "confidence": "high",
+    "notes": "Served by uvicorn",
+}
+
+SPECS_RESPONSE = """---DOCKERFILE---
+FROM python:3.11-slim
+WORKDIR /app
+COPY requirements.txt .
+RUN pip install --no-cache-dir -r requirements.txt
+COPY . .
+EXPOSE 8000
+HEALTHCHECK CMD curl -f http://localhost:8000/health || exit 1
+CMD ["uvicorn", "app.main:app", "--host", "0.0.0.0", "--port", "8000"]
+
+---TERRAFORM---
+resource "aws_ecs_task_definition" "app" {
+  family                   = "app"
+  requires_compatibilities = ["FARGATE"]
+  cpu                      = 256
+  memory                   = 512
+}
+
+---APPSPEC---
+version: 0.0
+Resources:
+  - TargetService:
+      Type: AWS::ECS::Service
+
+---BUILDSPEC---
+version: 0.2
+phases:
+  build:
+    commands:
+      - docker build -t app .
+
+---RECOMMENDATIONS---
+## Deployment
+- Run behind the shared ALB on port 8000
+- Scale on CPU above 70%
+"""
+
+
+class _QuietServer(ThreadingHTTPServer):
+    """Clients dropping keep-alive connections is normal here, not an error"""
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address) -> None:
+        if not isinstance(sys.exc_info()[1], (ConnectionError, TimeoutError)):
+            super().handle_error(request, client_address)
+
+
+class OpenAIStub:
+    """
+    Minimal OpenAI-compatible chat completions server on 127.0.0.1.
+    Requests with response_format get analysis_response (JSON), the rest get
+    specs_response. Each request waits first_byte_s, then streams the content
+    in chunk_chars pieces at chars_per_second (stream=true) or returns it whole
+    after the equivalent generation time.
+    Outages: the next fail_next requests (or all of them, fail_next=-1) get
+    fail_status after first_byte_s.
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        first_byte_s: float = 0.5,
+        chars_per_second: float = 2000.0,
+        chunk_chars: int = 40,
+        analysis_response: Optional[Dict[str, Any]] = None,
+        specs_response: str = SPECS_RESPONSE,
+        fail_next: int = 0,
+        fail_status: int = 503
+    ):
+        self.first_byte_s = first_byte_s
+        self.chars_per_second = chars_per_second
+        self.chunk_chars = chunk_chars
+        self.analysis_response = analysis_response or ANALYSIS_RESPONSE
+        self.specs_response = specs_response
+        self.fail_next = fail_next
+        self.fail_status = fail_status
+        self.requests: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._server = _QuietServer(("127.0.0.1", port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def start(self) -> "OpenAIStub":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "OpenAIStub":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    @staticmethod
+    def _usage(payload: Dict[str, Any], content: str) -> Dict[str, int]:
+        # Rough 4 characters per token, like the real tokenizer on English text
+        prompt_tokens = sum(len(m.get("content", "")) for m in payload.get("messages", [])) // 4
+        completion_tokens = len(content) // 4
+        return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens}
+
+    def _content_for(self, payload: Dict[str, Any]) -> str:
+        if payload.get("response_format"):
+            return json.dumps(self.analysis_response)
+        return self.specs_response
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            if self.fail_next == 0:
+                return False
+            if self.fail_next > 0:
+                self.fail_next -= 1
+            return True
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                with stub._lock:
+                    stub.requests.append(payload)
+
+                content = stub._content_for(payload)
+                time.sleep(stub.first_byte_s)
+                if stub._should_fail():
+                    self._send_json({"error": {"message": "stub outage", "type": "server_error"}},
+                                    status=stub.fail_status)
+                elif payload.get("stream"):
+                    self._stream(payload, content)
+                else:
+                    time.sleep(len(content) / stub.chars_per_second)
+                    self._send_json({
+                        "id": "chatcmpl-stub",
+                        "object": "chat.completion",
+                        "model": payload.get("model"),
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }],
+                        "usage": stub._usage(payload, content),
+                    })
+
+            def _send_json(self, body: Dict[str, Any], status: int = 200) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, payload: Dict[str, Any], content: str) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                delay = stub.chunk_chars / stub.chars_per_second
+                for start in range(0, len(content), stub.chunk_chars):
+                    event = {
+                        "id": "chatcmpl-stub",
+                        "object": "chat.completion.chunk",
+                        "model": payload.get("model"),
+                        "choices": [{"index": 0, "delta": {"content": content[start:start + stub.chunk_chars]}}],
+                    }
+                    self._write_chunk(f"data: {json.dumps(event)}\n\n")
+                    time.sleep(delay)
+                if (payload.get("stream_options") or {}).get("include_usage"):
+                    event = {"id": "chatcmpl-stub", "object": "chat.completion.chunk",
+                             "choices": [], "usage": stub._usage(payload, content)}
+                    self._write_chunk(f"data: {json.dumps(event)}\n\n")
+                self._write_chunk("data: [DONE]\n\n")
+                self._write_chunk("")
+
+            def _write_chunk(self, text: str) -> None:
+                data = text.encode()
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def _not_found(operation: str, code: str = "NoSuchKey") -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": "Not Found"}}, operation)
+
+
+class LocalSSM:
+    """get_parameter over a dict of parameter values"""
+
+    def __init__(self, parameters: Optional[Dict[str, str]] = None, latency_s: float = 0.03):
+        self.parameters = dict(parameters or {})
+        self.latency_s = latency_s
+        self.calls: List[str] = []
+
+    def get_parameter(self, Name: str, WithDecryption: bool = False) -> Dict[str, Any]:
+        self.calls.append(Name)
+        time.sleep(self.latency_s)
+        if Name not in self.parameters:
+            raise _not_found("GetParameter", "ParameterNotFound")
+        return {"Parameter": {"Name": Name, "Value": self.parameters[Name]}}
+
+
+class LocalS3:
+    """put_object / get_object / head_object / delete_object on an in-memory bucket map"""
+
+    def __init__(self, latency_s: float = 0.02):
+        self.latency_s = latency_s
+        self.objects: Dict[tuple, Dict[str, Any]] = {}
+        self.calls = {"put": 0, "get": 0, "head": 0, "delete": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, op: str) -> None:
+        with self._lock:
+            self.calls[op] += 1
+
+    def put_object(self, Bucket: str, Key: str, Body=b"", Metadata=None, ContentType=None, **kwargs) -> Dict[str, Any]:
+        time.sleep(self.latency_s)
+        self._count("put")
+        body = Body.encode() if isinstance(Body, str) else bytes(Body)
+        with self._lock:
+            self.objects[(Bucket, Key)] = {"Body": body, "Metadata": dict(Metadata or {}), "ContentType": ContentType}
+        return {}
+
+    def get_object(self, Bucket: str, Key: str, **kwargs) -> Dict[str, Any]:
+        time.sleep(self.latency_s)
+        self._count("get")
+        obj = self.objects.get((Bucket, Key))
+        if obj is None:
+            raise _not_found("GetObject")
+        return {"Body": io.BytesIO(obj["Body"]), "Metadata": obj["Metadata"], "ContentLength": len(obj["Body"])}
+
+    def head_object(self, Bucket: str, Key: str, **kwargs) -> Dict[str, Any]:
+        time.sleep(self.latency_s)
+        self._count("head")
+        obj = self.objects.get((Bucket, Key))
+        if obj is None:
+            # What HeadObject returns without s3:ListBucket
+            raise _not_found("HeadObject", "403")
+        return {"Metadata": obj["Metadata"], "ContentLength": len(obj["Body"])}
+
+    def delete_object(self, Bucket: str, Key: str, **kwargs) -> Dict[str, Any]:
+        time.sleep(self.latency_s)
+        self._count("delete")
+        with self._lock:
+            self.objects.pop((Bucket, Key), None)
+        return {}
+
+
+def _matches(condition, item: Dict[str, Any]) -> bool:
+    """Evaluate the simple Key(...).eq / Attr(...).eq conditions the analyzer builds"""
+    if condition is None or isinstance(condition, str):
+        return True
+    expression = condition.get_expression()
+    if expression["operator"] == "AND":
+        return all(_matches(part, item) for part in expression["values"])
+    attribute, value = expression["values"]
+    return item.get(attribute.name) == value
+
+
+class LocalTable:
+    """Single DynamoDB table: put/get/delete by hash key, query and scan by filtering"""
+
+    def __init__(self, name: str, key: str, latency_s: float):
+        self.name = name
+        self.key = key
+        self.latency_s = latency_s
+        self.items: Dict[Any, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _condition_holds(current: Optional[Dict[str, Any]], condition: Optional[str], kwargs) -> bool:
+        """The port allocator's conditions: attribute_not_exists(...) OR #name = :value"""
+        if not condition:
+            return True
+        names = kwargs.get("ExpressionAttributeNames", {})
+        values = kwargs.get("ExpressionAttributeValues", {})
+        for clause in condition.split(" OR "):
+            clause = clause.strip()
+            if clause.startswith("attribute_not_exists"):
+                if current is None:
+                    return True
+            elif "=" in clause:
+                name, _, value = (part.strip() for part in clause.partition("="))
+                if current is not None and current.get(names.get(name, name)) == values.get(value):
+                    return True
+        return False
+
+    def put_item(self, Item: Dict[str, Any], ConditionExpression=None, **kwargs) -> Dict[str, Any]:
+        time.sleep(self.latency_s)
+        with self._lock:
+            if not self._condition_holds(self.items.get(Item[self.key]), ConditionExpression, kwargs):
+                raise _not_found("PutItem", "ConditionalCheckFailedException")
+            self.items[Item[self.key]] = dict(Item)
+        return {}
+
+    def get_item(self, Key: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        time.sleep(self.latency_s)
+        item = self.items.get(Key[self.key])
+        return {"Item": dict(item)} if item is not None else {}
+
+    def delete_item(self, Key: Dict[str, Any], ConditionExpression=None, **kwargs) -> Dict[str, Any]:
+        time.sleep(self.latency_s)
+        with self._lock:
+            if not self._condition_holds(self.items.get(Key[self.key]), ConditionExpression, kwargs):
+                raise _not_found("DeleteItem", "ConditionalCheckFailedException")
+            self.items.pop(Key[self.key], None)
+        return {}
+
+    def query(self, KeyConditionExpression=None, FilterExpression=None, ScanIndexForward=True, **kwargs):
+        time.sleep(self.latency_s)
+        items = [
+            dict(item) for item in list(self.items.values())
+            if _matches(KeyConditionExpression, item) and _matches(FilterExpression, item)
+        ]
+        items.sort(key=lambda item: item.get("timestamp", ""), reverse=not ScanIndexForward)
+        return {"Items": items}
+
+    def scan(self, Limit: Optional[int] = None, **kwargs) -> Dict[str, Any]:
+        time.sleep(self.latency_s)
+        items = [dict(item) for item in list(self.items.values())]
+        return {"Items": items[:Limit] if Limit else items}
+
+
+class LocalDynamoDB:
+    """boto3.resource("dynamodb") stand-in; tables are created on first use"""
+
+    def __init__(self, keys: Optional[Dict[str, str]] = None, latency_s: float = 0.01):
+        self.keys = dict(keys or {})
+        self.latency_s = latency_s
+        self.tables: Dict[str, LocalTable] = {}
+
+    def Table(self, name: str) -> LocalTable:
+        if name not in self.tables:
+            key = self.keys.get(name, "analysis_id")
+            self.tables[name] = LocalTable(name, key, self.latency_s)
+        return self.tables[name]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the OpenAI-compatible stub server")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--first-byte", type=float, default=0.5, help="seconds before the first byte")
+    parser.add_argument("--chars-per-second", type=float, default=2000.0)
+    args = parser.parse_args()
+
+    stub = OpenAIStub(args.port, first_byte_s=args.first_byte, chars_per_second=args.chars_per_second)
+    print(f"🧪 OpenAI stub listening on {stub.base_url} (Ctrl+C to stop)")
+    stub.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+change_impact.assess: which specs a change between two analyses regenerates
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lambda", "ai_code_analyzer"))
+
+from analyzers.change_impact import assess, deployment_shape  # noqa: E402
+
+SHAPE = deployment_shape({
+    "primary_language": "Python", "primary_framework": "FastAPI", "runtime": "python:3.11-slim",
+    "package_managers": ["pip"], "entrypoint": "app/main.py", "app_server": "uvicorn", "app_port": 8000,
+})
+
+
+def test_application_code_change_reuses_previous_specs():
+    impact = assess(["app/routes/items.py"], SHAPE, dict(SHAPE))
+    assert impact["mode"] == "reuse"
+    assert impact["specs"] == []
+
+
+def test_shape_change_from_unclassified_path_regenerates_its_specs():
+    # The port moved in src/settings.py, which is not a deployment-relevant path
+    impact = assess(["src/settings.py"], SHAPE, dict(SHAPE, app_port=9000))
+    assert impact["relevant_paths"] == {}
+    assert impact["shape_changes"] == ["app_port"]
+    assert impact["mode"] == "regenerate"
+    assert {"dockerfile", "appspec", "terraform_ecs"} <= set(impact["specs"])
+
+
+def test_package_manager_change_regenerates_build_specs():
+    impact = assess(["app/main.py"], SHAPE, dict(SHAPE, package_managers=["poetry"]))
+    assert impact["mode"] == "regenerate"
+    assert {"dockerfile", "buildspec"} <= set(impact["specs"])
+
+
+def test_identity_change_needs_full_analysis():
+    impact = assess(["package.json"], SHAPE, dict(SHAPE, primary_language="JavaScript"))
+    assert impact["mode"] == "full"
+
+
+def test_dockerfile_edit_regenerates_dockerfile_without_shape_change():
+    impact = assess(["Dockerfile"], SHAPE, dict(SHAPE))
+    assert impact["mode"] == "regenerate"
+    assert impact["specs"] == ["dockerfile"]
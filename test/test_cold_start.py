@@ -0,0 +1,33 @@
+"""
+Cold-start budget: `import handler` in a fresh interpreter, like a new Lambda container.
+The full report (per-package import time, clients, first invocation) is bench_cold_start.py.
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_cold_start import LAMBDA_DIR, _child_env  # noqa: E402
+
+# Generous on purpose: catches an eagerly imported SDK or a module-level network call, not noise
+IMPORT_BUDGET_MS = float(os.getenv("COLD_START_IMPORT_BUDGET_MS", "1500"))
+ROUNDS = 3
+
+IMPORT_SCRIPT = "import time; started = time.perf_counter(); import handler; " \
+                "print((time.perf_counter() - started) * 1000)"
+
+
+def import_ms() -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        cwd=LAMBDA_DIR, env=_child_env(), capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def test_handler_import_fits_cold_start_budget():
+    import_ms()  # writes __pycache__, as the packaged zip ships bytecode
+    median = statistics.median(import_ms() for _ in range(ROUNDS))
+    assert median < IMPORT_BUDGET_MS, f"handler import {median:.0f} ms exceeds {IMPORT_BUDGET_MS:.0f} ms"
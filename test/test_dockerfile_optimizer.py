@@ -0,0 +1,76 @@
+"""
+dockerfile_optimizer.add_cache_mounts: which RUNs get BuildKit cache mounts
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lambda", "ai_code_analyzer"))
+
+from generators.dockerfile_optimizer import add_cache_mounts, merge_run_layers, optimize_dockerfile  # noqa: E402
+from generators.dockerfile_parser import parse_dockerfile  # noqa: E402
+
+
+def mounted(dockerfile: str):
+    parsed = parse_dockerfile(dockerfile)
+    add_cache_mounts(parsed, {"cache_mounts": True})
+    return [ins.first_line.strip() for ins in parsed if ins.keyword == "RUN" and "--mount" in ins.text]
+
+
+def test_root_install_gets_cache_mount():
+    assert mounted("FROM python:3.11-slim\nRUN pip install --no-cache-dir -r requirements.txt\n") == [
+        "RUN --mount=type=cache,target=/root/.cache/pip pip install -r requirements.txt"
+    ]
+
+
+def test_install_after_non_root_user_is_left_alone():
+    dockerfile = (
+        "FROM node:20-slim\n"
+        "RUN npm ci\n"
+        "USER node\n"
+        "RUN npm install\n"
+    )
+    assert mounted(dockerfile) == ["RUN --mount=type=cache,target=/root/.npm npm ci"]
+
+
+def test_user_is_tracked_per_stage():
+    dockerfile = (
+        "FROM python:3.11-slim AS base\n"
+        "USER app\n"
+        "FROM base AS deps\n"
+        "RUN pip install -r requirements.txt\n"
+        "FROM python:3.11-slim\n"
+        "USER 0:0\n"
+        "RUN pip install -r requirements.txt\n"
+        "USER $APP_USER\n"
+        "RUN pip install gunicorn\n"
+    )
+    # deps inherits base's non-root user; the last stage is root until USER $APP_USER
+    assert mounted(dockerfile) == ["RUN --mount=type=cache,target=/root/.cache/pip pip install -r requirements.txt"]
+
+
+def merged(dockerfile: str):
+    parsed = parse_dockerfile(dockerfile)
+    merge_run_layers(parsed, {})
+    return [ins.text.strip() for ins in parsed if ins.keyword == "RUN"]
+
+
+def test_independent_runs_are_merged():
+    assert merged("FROM debian:12\nRUN apt-get update\nRUN apt-get install -y curl\n") == [
+        "RUN apt-get update && \\\n    apt-get install -y curl"
+    ]
+
+
+@pytest.mark.parametrize("first", [
+    "cd frontend", "export FOO=1", "FOO=1", ". ./env.sh", "source ./env.sh", "set -e", "umask 077",
+    "apt-get update && cd /src",
+])
+def test_run_after_shell_state_change_is_not_merged(first):
+    # The second RUN starts from the image state, not the first RUN's shell
+    assert merged(f"FROM debian:12\nRUN {first}\nRUN make build\n") == [f"RUN {first}", "RUN make build"]
+
+
+def test_optimizer_keeps_run_after_cd_in_its_own_layer():
+    dockerfile = optimize_dockerfile("FROM node:20\nWORKDIR /app\nCOPY . .\nRUN cd frontend\nRUN make build\n")
+    assert "RUN cd frontend\nRUN make build" in dockerfile
@@ -0,0 +1,94 @@
+"""
+llm_guard: circuit breaker bookkeeping for failed calls
+"""
+import json
+import os
+import sys
+import time
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lambda", "ai_code_analyzer"))
+
+from services.llm_guard import CircuitBreaker, LatencyTracker, LLMCallGuard  # noqa: E402
+
+
+def half_open_guard() -> LLMCallGuard:
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0.0)
+    breaker.record_failure()
+    assert breaker.state == "half_open"
+    return LLMCallGuard(max_attempts=1, breaker=breaker)
+
+
+def http_error(status: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status}", response=response)
+
+
+def test_malformed_body_leaves_half_open_circuit_unchanged():
+    guard = half_open_guard()
+
+    def malformed(timeout):
+        return json.loads("<html>Bad Gateway</html>")
+
+    with pytest.raises(ValueError):
+        guard.call(malformed, "analysis")
+    assert guard.breaker.state == "half_open"
+    # The probe slot is released: the next call may still probe the provider
+    assert guard.call(lambda timeout: "ok", "analysis") == "ok"
+    assert guard.breaker.state == "closed"
+
+
+def test_malformed_body_does_not_reset_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60.0)
+    guard = LLMCallGuard(max_attempts=1, breaker=breaker, backoff_base=0)
+    breaker.record_failure()
+
+    with pytest.raises(KeyError):
+        guard.call(lambda timeout: {}["choices"], "analysis")
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_client_error_response_closes_half_open_circuit():
+    guard = half_open_guard()
+
+    def unauthorized(timeout):
+        raise http_error(401)
+
+    with pytest.raises(requests.HTTPError):
+        guard.call(unauthorized, "analysis")
+    assert guard.breaker.state == "closed"
+
+
+def test_server_error_reopens_half_open_circuit():
+    guard = half_open_guard()
+
+    def unavailable(timeout):
+        # Long enough that the reopened circuit is still open when checked
+        guard.breaker.cooldown = 60.0
+        raise http_error(503)
+
+    with pytest.raises(requests.HTTPError):
+        guard.call(unavailable, "analysis")
+    assert guard.breaker.state == "open"
+
+
+def test_streaming_call_is_not_hedged():
+    latencies = LatencyTracker()
+    for _ in range(20):
+        latencies.record("stream_first_byte", 0.001)
+    guard = LLMCallGuard(max_attempts=1, hedge=True, latencies=latencies)
+    parts = []
+
+    def stream(timeout):
+        # Far slower than the first-byte p95 a hedge would wait for
+        for index in range(5):
+            parts.append(index)
+            time.sleep(0.01)
+
+    guard.call(stream, "stream_first_byte", observe=False, hedge=False)
+    assert parts == [0, 1, 2, 3, 4]
+    assert guard.stats["hedged"] == 0
@@ -0,0 +1,53 @@
+"""
+spec_store.publish_specs against the in-memory S3 in local_stubs.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lambda", "ai_code_analyzer"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from local_stubs import LocalS3  # noqa: E402
+from services import spec_store  # noqa: E402
+
+BUCKET = "artifacts"
+
+
+def setup_function():
+    spec_store._published_digests.clear()
+
+
+def keys(s3: LocalS3):
+    return sorted(key for bucket, key in s3.objects)
+
+
+def test_sections_streamed_before_a_fallback_are_removed():
+    s3 = LocalS3(latency_s=0)
+    # Streamed while the LLM was still generating, then the stream failed
+    for name, content in (("buildspec", "llm buildspec"), ("terraform_ecs", "llm ecs")):
+        spec_store.put_if_changed(s3, BUCKET, spec_store.spec_key("a1", name), content.encode())
+
+    fallback = {"dockerfile": "FROM python:3.11-slim\n", "terraform_ecs": "fallback ecs"}
+    urls = spec_store.publish_specs(
+        s3, BUCKET, "a1", fallback,
+        published={"buildspec": "llm buildspec", "terraform_ecs": "llm ecs"}, bundle=False
+    )
+
+    assert keys(s3) == ["analysis/a1/dockerfile", "analysis/a1/terraform_ecs"]
+    assert s3.objects[(BUCKET, "analysis/a1/terraform_ecs")]["Body"] == b"fallback ecs"
+    assert sorted(urls) == ["dockerfile", "terraform_ecs"]
+
+
+def test_unchanged_streamed_sections_are_kept_without_another_put():
+    s3 = LocalS3(latency_s=0)
+    spec_store.put_if_changed(s3, BUCKET, spec_store.spec_key("a2", "appspec"), b"appspec")
+    puts = s3.calls["put"]
+
+    spec_store.publish_specs(
+        s3, BUCKET, "a2", {"dockerfile": "FROM node:20\n", "appspec": "appspec"},
+        published={"appspec": "appspec"}, bundle=False
+    )
+
+    assert keys(s3) == ["analysis/a2/appspec", "analysis/a2/dockerfile"]
+    assert s3.calls["put"] == puts + 1
+    assert s3.calls["delete"] == 0
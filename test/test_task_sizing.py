@@ -0,0 +1,103 @@
+"""
+task_sizing: Fargate size from observed utilization, and where its samples come from
+"""
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lambda", "ai_code_analyzer"))
+
+from config.resource_config import STARTING_TASK_SIZES, get_task_size  # noqa: E402
+from services.task_sizing import CloudWatchMetricsSource, FileMetricsSource, recommend_task_size  # noqa: E402
+
+SAMPLES_FILE = os.path.join(os.path.dirname(__file__), "utilization_samples.json")
+
+
+def steady(cpu_units: float, memory_mib: float, count: int = 24):
+    return [{"cpu_units": cpu_units, "memory_mib": memory_mib} for _ in range(count)]
+
+
+def test_cheapest_size_that_keeps_usage_under_target():
+    # 180 units / 70% needs 257 CPU -> 512; 600 MiB / 80% needs 750 MiB -> 1024
+    size = recommend_task_size(steady(180, 600), cpu_target_percent=70, memory_target_percent=80)
+    assert (size["cpu"], size["memory"]) == (512, 1024)
+    assert not size["capped"]
+
+
+def test_light_service_gets_the_smallest_size():
+    size = recommend_task_size(FileMetricsSource(SAMPLES_FILE).samples("examples/small-api"))
+    assert (size["cpu"], size["memory"]) == (256, 512)
+
+
+def test_too_few_samples_keep_the_starting_size():
+    assert recommend_task_size(steady(900, 3000, count=11), min_samples=12) is None
+    project_info = {"deployment_complexity": "simple", "task_size": None}
+    assert get_task_size(project_info) == STARTING_TASK_SIZES["simple"]
+
+
+def test_demand_beyond_the_largest_task_is_capped():
+    size = recommend_task_size(steady(5000, 40000))
+    assert (size["cpu"], size["memory"]) == (4096, 30720)
+    assert size["capped"]
+    # CPU over the limit alone: the cheapest memory of the largest CPU
+    size = recommend_task_size(steady(5000, 600))
+    assert (size["cpu"], size["memory"]) == (4096, 8192)
+
+
+class FakeTagging:
+    def __init__(self, resources):
+        self.resources = resources
+
+    def get_paginator(self, name):
+        return self
+
+    def paginate(self, TagFilters, ResourceTypeFilters):
+        kind = ResourceTypeFilters[0].split(":")[-1]
+        yield {"ResourceTagMappingList": [
+            {"ResourceARN": arn, "Tags": [{"Key": k, "Value": v} for k, v in tags.items()]}
+            for arn, tags in self.resources if kind in arn
+        ]}
+
+
+class FakeCloudWatch:
+    def __init__(self, values):
+        self.values = values
+        self.queries = []
+
+    def get_paginator(self, name):
+        return self
+
+    def paginate(self, MetricDataQueries, StartTime, EndTime):
+        self.queries.extend(MetricDataQueries)
+        yield {"MetricDataResults": [
+            {"Id": query["Id"], "Timestamps": [timestamp], "Values": [self.values(query)]}
+            for query in MetricDataQueries
+        ]}
+
+
+timestamp = datetime.now(timezone.utc) - timedelta(hours=1)
+
+
+def test_each_service_gets_its_own_target_groups_requests():
+    repo = "https://github.com/org/shop"
+    tagging = FakeTagging([
+        ("arn:aws:ecs:r:1:service/apps/shop-api", {"Repository": repo, "AppName": "shop-api"}),
+        ("arn:aws:ecs:r:1:service/apps/shop-worker", {"Repository": repo}),
+        ("arn:aws:elasticloadbalancing:r:1:targetgroup/shop-api-tg/aaa", {"Repository": repo, "AppName": "shop-api"}),
+        ("arn:aws:elasticloadbalancing:r:1:targetgroup/shop-worker-tg/bbb", {"Repository": repo}),
+        ("arn:aws:elasticloadbalancing:r:1:targetgroup/shop-admin-tg/ccc", {"Repository": repo}),
+    ])
+
+    def values(query):
+        metric = query["MetricStat"]["Metric"]
+        if metric["MetricName"] == "RequestCountPerTarget":
+            return {"targetgroup/shop-api-tg/aaa": 3000.0, "targetgroup/shop-worker-tg/bbb": 300.0}[
+                metric["Dimensions"][0]["Value"]]
+        return 1.0 if metric["MetricName"] == "RunningTaskCount" else 100.0
+
+    cloudwatch = FakeCloudWatch(values)
+    samples = CloudWatchMetricsSource(cloudwatch, tagging, "apps", period=300).samples("org/shop")
+
+    assert [sample["requests_per_second"] for sample in samples] == [10.0, 1.0]
+    # The admin target group belongs to no tagged service and is not queried
+    assert sum(query["Id"].startswith("requests") for query in cloudwatch.queries) == 2
@@ -0,0 +1,39 @@
+"""
+telemetry: per-item records for work running concurrently inside one invocation
+"""
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lambda", "ai_code_analyzer"))
+
+from services import telemetry  # noqa: E402
+
+
+def test_concurrent_scopes_keep_their_own_properties():
+    batch = telemetry.start({"pipeline": "batch"}, enabled=False)
+    # Both items are inside their scope before either writes
+    barrier = Barrier(2)
+
+    def item(repository: str) -> telemetry.Invocation:
+        with telemetry.scope({"pipeline": "batch_item"}, enabled=False) as invocation:
+            barrier.wait()
+            telemetry.current().set_property("repository", repository)
+            telemetry.current().add("analysis_cache_hits", 1)
+            return invocation
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first, second = pool.map(item, ["org/a", "org/b"])
+
+    assert (first.properties["repository"], second.properties["repository"]) == ("org/a", "org/b")
+    assert first.metrics == second.metrics == {"analysis_cache_hits": 1}
+    assert "repository" not in batch.properties and batch.metrics == {}
+    assert telemetry.current() is batch
+
+
+def test_carry_records_pool_work_in_the_callers_scope():
+    telemetry.start(enabled=False)
+    with telemetry.scope(enabled=False) as invocation, ThreadPoolExecutor(max_workers=1) as pool:
+        pool.submit(telemetry.carry(lambda: telemetry.current().add("utilization_samples", 12))).result()
+    assert invocation.metrics == {"utilization_samples": 12}